@@ -0,0 +1 @@
+"""Benchmarks del dungeon generator (se ejecutan con `python -m benchmarks.<modulo>`)."""
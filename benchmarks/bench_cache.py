@@ -0,0 +1,45 @@
+"""
+Compara generar un mapa con leerlo de la caché en disco a distintos tamaños.
+
+Uso: python -m benchmarks.bench_cache [n_habitaciones ...]
+"""
+
+import math
+import os
+import sys
+import tempfile
+
+from dungeon_generator import CacheMapas
+from .comun import cronometro, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5]
+
+
+def main(tamanos: list[int]):
+    filas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheMapas(directorio)
+        for n in tamanos:
+            lado = math.isqrt(2 * n) + 1
+            tiempos = {}
+            with cronometro(tiempos, "fallo"):
+                cache.obtener(lado, lado, n, semilla=0)
+            with cronometro(tiempos, "acierto"):
+                cache.obtener(lado, lado, n, semilla=0)
+            tamano = os.path.getsize(cache._ruta(cache.clave(lado, lado, n, 0)))
+            filas.append([
+                n,
+                f"{tiempos['fallo'] * 1000:.1f}",
+                f"{tiempos['acierto'] * 1000:.1f}",
+                f"{tiempos['fallo'] / tiempos['acierto']:.1f}x",
+                f"{tamano / 1024:.1f}",
+                f"{tamano / n:.1f}",
+            ])
+    imprimir_tabla(
+        ["habitaciones", "generar (ms)", "caché (ms)", "aceleración", "archivo (KiB)", "B/hab"],
+        filas
+    )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
@@ -0,0 +1,46 @@
+"""
+Compara tamaño y tiempos de guardado/carga de cada códec de compresión.
+
+Uso: python -m benchmarks.bench_compresion [n_habitaciones ...]
+"""
+
+import os
+import sys
+import tempfile
+
+from dungeon_generator import guardar_partida, cargar_partida
+from .comun import crear_mapa_grande, crear_explorador, cronometro, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5, 10**6]
+FORMATOS = [
+    ("json", "partida.json"),
+    ("gzip", "partida.json.gz"),
+    ("bz2", "partida.json.bz2"),
+    ("lzma", "partida.json.xz"),
+]
+
+
+def main(tamanos: list[int]):
+    filas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for n in tamanos:
+            explorador = crear_explorador(crear_mapa_grande(n))
+            for nombre, archivo in FORMATOS:
+                ruta = os.path.join(directorio, archivo)
+                tiempos = {}
+                with cronometro(tiempos, "guardar"):
+                    guardar_partida(explorador, ruta)
+                with cronometro(tiempos, "cargar"):
+                    cargado = cargar_partida(ruta)
+                assert cargado is not None and len(cargado.mapa.habitaciones) == n
+                filas.append([
+                    n, nombre,
+                    f"{os.path.getsize(ruta) / 1024:.1f}",
+                    f"{tiempos['guardar']:.3f}",
+                    f"{tiempos['cargar']:.3f}",
+                ])
+    imprimir_tabla(["habitaciones", "códec", "KiB", "guardar (s)", "cargar (s)"], filas)
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
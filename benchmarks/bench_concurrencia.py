@@ -0,0 +1,140 @@
+"""
+Prueba de estrés del modo concurrente: muchos hilos explorando el mismo mapa.
+
+Comprueba que ningún tesoro se recoge dos veces, que lo recogido más lo que
+queda en el mapa coincide con lo que había, que ningún monstruo derrotado
+sigue en su habitación y que `reclamar_contenido` entrega cada contenido a
+un solo hilo. Después mide el rendimiento con 1, 2, 4... hilos repartiendo
+el mismo número total de pasos. Con el GIL activo el escalado es ~1x; en
+una compilación sin GIL (python3.13t o posterior) debería ser casi lineal.
+
+Uso: python -m benchmarks.bench_concurrencia [max_hilos] [pasos_totales]
+"""
+
+import math
+import random
+import sys
+import threading
+import time
+
+from dungeon_generator import Explorador, Tesoro, Jefe, Monstruo
+from dungeon_generator.lote import generar_mapa
+from .comun import imprimir_tabla
+
+N_HABITACIONES = 20_000
+
+
+def crear_mapa(semilla: int = 0):
+    lado = math.isqrt(2 * N_HABITACIONES) + 1
+    mapa = generar_mapa(lado, lado, N_HABITACIONES, semilla)
+    mapa.activar_concurrencia()
+    return mapa
+
+
+def recompensas(mapa) -> set[int]:
+    """Identidad de cada objeto que se puede recoger en el mapa."""
+    ids = set()
+    for hab in mapa.habitaciones.values():
+        if isinstance(hab.contenido, Tesoro):
+            ids.add(id(hab.contenido.recompensa))
+        elif isinstance(hab.contenido, Jefe) and hab.contenido.recompensa_especial:
+            ids.add(id(hab.contenido.recompensa_especial))
+    return ids
+
+
+def explorar(mapa, pasos: int, semilla: int, exploradores: list):
+    rng = random.Random(semilla)
+    explorador = Explorador(mapa=mapa, vida=10**9)
+    explorador.posicion = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+    exploradores.append(explorador)
+    for _ in range(pasos):
+        explorador.explorar_habitacion()
+        explorador.mover(rng.choice(explorador.obtener_habitaciones_adyacentes()))
+
+
+def en_hilos(hilos: int, objetivo, *argumentos) -> float:
+    """Lanza `hilos` hilos con `objetivo(*argumentos, i)` y retorna los segundos."""
+    trabajadores = [threading.Thread(target=objetivo, args=(*argumentos, i)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    return time.perf_counter() - inicio
+
+
+def verificar_exploracion(hilos: int, pasos: int) -> list[str]:
+    mapa = crear_mapa()
+    iniciales = recompensas(mapa)
+    exploradores = []
+    en_hilos(hilos, lambda i: explorar(mapa, pasos, i, exploradores))
+
+    errores = []
+    recogidas = [id(obj) for e in exploradores for obj in e.inventario]
+    if len(recogidas) != len(set(recogidas)):
+        errores.append(f"{len(recogidas) - len(set(recogidas))} objetos recogidos dos veces")
+    if not set(recogidas) <= iniciales:
+        errores.append("se recogieron objetos que no estaban en el mapa")
+    restantes = recompensas(mapa)
+    if len(restantes) + len(recogidas) != len(iniciales):
+        errores.append(f"recogidos {len(recogidas)} + restantes {len(restantes)} != {len(iniciales)}")
+    muertos = sum(1 for h in mapa.habitaciones.values()
+                  if isinstance(h.contenido, Monstruo) and h.contenido.vida <= 0)
+    if muertos:
+        errores.append(f"{muertos} monstruos derrotados siguen en su habitación")
+    return errores
+
+
+def verificar_reclamos(hilos: int) -> list[str]:
+    mapa = crear_mapa()
+    esperados = sum(1 for h in mapa.habitaciones.values() if h.contenido is not None)
+    posiciones = list(mapa.habitaciones)
+    reclamados: list[list] = [[] for _ in range(hilos)]
+
+    def reclamar(i):
+        orden = posiciones[:]
+        random.Random(i).shuffle(orden)
+        reclamados[i] = [c for c in map(mapa.reclamar_contenido, orden) if c is not None]
+
+    en_hilos(hilos, reclamar)
+    todos = [id(c) for lista in reclamados for c in lista]
+    if len(todos) != esperados or len(set(todos)) != esperados:
+        return [f"reclamados {len(todos)} ({len(set(todos))} distintos), esperados {esperados}"]
+    return []
+
+
+def main(max_hilos: int, pasos_totales: int):
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'activo' if gil else 'desactivado'}")
+
+    # Cambios de hilo mucho más frecuentes para provocar carreras también con GIL
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        errores = verificar_exploracion(max_hilos, pasos_totales // max_hilos)
+        errores += verificar_reclamos(max_hilos)
+    finally:
+        sys.setswitchinterval(intervalo)
+    for error in errores:
+        print(f"❌ {error}")
+    if not errores:
+        print(f"✅ Resultados correctos con {max_hilos} hilos")
+
+    filas = []
+    base = None
+    hilos = 1
+    while hilos <= max_hilos:
+        mapa = crear_mapa()
+        segundos = en_hilos(hilos, lambda i: explorar(mapa, pasos_totales // hilos, i, []))
+        base = base or segundos
+        filas.append([hilos, f"{segundos:.2f}", f"{pasos_totales / segundos:,.0f}", f"{base / segundos:.2f}x"])
+        hilos *= 2
+    imprimir_tabla(["hilos", "tiempo (s)", "pasos/s", "escalado"], filas)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200_000,
+    ))
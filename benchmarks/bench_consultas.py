@@ -0,0 +1,69 @@
+"""
+Compara resolver consultas de camino una a una con `generar_camino_minimo`
+frente a las funciones por lotes, en consultas por segundo.
+
+Casos: entrada → cada tesoro, cada habitación → jefe (muestra) y pares al azar.
+
+Uso: python -m benchmarks.bench_consultas [n_habitaciones ...]
+"""
+
+import random
+import sys
+import time
+
+from dungeon_generator import (
+    Jefe, Tesoro, generar_camino_minimo, calcular_caminos_lote, calcular_distancias_lote
+)
+from .comun import crear_mapa_grande, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**4, 10**5]
+CONSULTAS = 2000
+# Consultas individuales que se cronometran para estimar su rendimiento
+MUESTRA_INDIVIDUAL = 20
+
+
+def _casos(mapa, rng: random.Random) -> dict[str, list]:
+    posiciones = list(mapa.habitaciones)
+    entrada = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+    tesoros = [p for p, h in mapa.habitaciones.items() if isinstance(h.contenido, Tesoro)]
+    jefe = next(p for p, h in mapa.habitaciones.items() if isinstance(h.contenido, Jefe))
+    return {
+        "entrada→tesoros": [(entrada, t) for t in tesoros[:CONSULTAS]],
+        "habitación→jefe": [(rng.choice(posiciones), jefe) for _ in range(CONSULTAS)],
+        "pares al azar": [(rng.choice(posiciones), rng.choice(posiciones)) for _ in range(CONSULTAS // 10)],
+    }
+
+
+def main(tamanos: list[int]):
+    filas = []
+    for n in tamanos:
+        mapa = crear_mapa_grande(n)
+        for caso, consultas in _casos(mapa, random.Random(0)).items():
+            muestra = consultas[:MUESTRA_INDIVIDUAL]
+            inicio = time.perf_counter()
+            for a, b in muestra:
+                generar_camino_minimo(mapa, a, b)
+            individual = len(muestra) / (time.perf_counter() - inicio)
+
+            caminos = calcular_caminos_lote(mapa, consultas)
+            distancias = calcular_distancias_lote(mapa, consultas)
+            filas.append([
+                n,
+                caso,
+                len(consultas),
+                caminos.recorridos,
+                f"{individual:.0f}",
+                f"{caminos.consultas_por_segundo:.0f}",
+                f"{distancias.consultas_por_segundo:.0f}",
+                f"{caminos.consultas_por_segundo / individual:.0f}x",
+            ])
+        del mapa
+    imprimir_tabla(
+        ["habitaciones", "caso", "consultas", "BFS", "individual (q/s)",
+         "caminos lote (q/s)", "distancias lote (q/s)", "aceleración"],
+        filas
+    )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
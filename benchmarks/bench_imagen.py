@@ -0,0 +1,43 @@
+"""
+Mide el rendimiento (mapas/segundo) de la exportación a PNG.
+
+Uso: python -m benchmarks.bench_imagen [n_habitaciones ...]
+"""
+
+import io
+import sys
+import time
+
+from dungeon_generator import exportar_mapa_png
+from .comun import crear_mapa_grande, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**2, 10**3, 10**4, 10**5]
+DURACION_MINIMA = 1.0
+
+
+def main(tamanos: list[int]):
+    filas = []
+    for n in tamanos:
+        mapa = crear_mapa_grande(n)
+        repeticiones = 0
+        bytes_png = 0
+        inicio = time.perf_counter()
+        while True:
+            buffer = io.BytesIO()
+            exportar_mapa_png(mapa, buffer)
+            bytes_png = buffer.tell()
+            repeticiones += 1
+            transcurrido = time.perf_counter() - inicio
+            if transcurrido >= DURACION_MINIMA:
+                break
+        filas.append([
+            n, f"{mapa.ancho}x{mapa.alto}",
+            f"{bytes_png / 1024:.1f}",
+            f"{transcurrido / repeticiones * 1000:.1f}",
+            f"{repeticiones / transcurrido:.2f}",
+        ])
+    imprimir_tabla(["habitaciones", "mapa", "KiB", "ms/mapa", "mapas/s"], filas)
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
@@ -0,0 +1,65 @@
+"""
+Mide el tiempo de importación en frío de la API sin interfaz gráfica.
+
+Usa `python -X importtime` en un proceso nuevo y falla (código de salida 1)
+si se supera el presupuesto o si se carga rich.
+
+Uso: python -m benchmarks.bench_importacion [presupuesto_ms]
+"""
+
+import statistics
+import subprocess
+import sys
+
+PRESUPUESTO_MS = 60.0
+REPETICIONES = 7
+CODIGO_SIN_INTERFAZ = (
+    "import sys\n"
+    "from dungeon_generator import Mapa, Explorador, verificar_conectividad_mapa, "
+    "guardar_partida, cargar_partida\n"
+    "assert 'rich' not in sys.modules, 'rich se importó en modo sin interfaz'\n"
+)
+
+
+def _importaciones(codigo: str) -> dict[str, int]:
+    """Ejecuta `codigo` con -X importtime y retorna {módulo: µs acumulados} de primer nivel."""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    
+    tiempos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        if not acumulado.strip().isdigit():
+            continue  # cabecera
+        if nombre.startswith("  "):
+            continue  # submódulo anidado, ya incluido en el acumulado
+        tiempos[nombre.strip()] = int(acumulado)
+    return tiempos
+
+
+def medir_importacion(codigo: str = CODIGO_SIN_INTERFAZ) -> float:
+    """Retorna los milisegundos de importación atribuibles a `codigo`."""
+    arranque = set(_importaciones("pass"))
+    tiempos = _importaciones(codigo)
+    return sum(us for nombre, us in tiempos.items() if nombre not in arranque) / 1000
+
+
+def main(presupuesto_ms: float):
+    muestras = [medir_importacion() for _ in range(REPETICIONES)]
+    mediana = statistics.median(muestras)
+    print(f"Importación sin interfaz: mediana {mediana:.1f} ms "
+          f"(mín {min(muestras):.1f}, máx {max(muestras):.1f}), presupuesto {presupuesto_ms:.1f} ms")
+    if mediana > presupuesto_ms:
+        print("❌ Presupuesto superado")
+        sys.exit(1)
+    print("✅ Dentro del presupuesto")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else PRESUPUESTO_MS)
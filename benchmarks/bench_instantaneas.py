@@ -0,0 +1,97 @@
+"""
+Compara copiar el estado de juego con `copy.deepcopy` frente a las
+instantáneas de `Simulacion`: crear la copia, capturar, jugar y volver atrás,
+y la memoria de cada copia o rama (según `perfilar_mapa`).
+
+Uso: python -m benchmarks.bench_instantaneas [n_habitaciones ...]
+"""
+
+import copy
+import random
+import sys
+import threading
+import time
+
+from dungeon_generator import Simulacion, crear_explorador_en, perfilar_mapa
+from .comun import crear_mapa_grande, cronometro, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5]
+CICLOS = 1000
+PASOS_POR_CICLO = 5
+# deepcopy recorre el grafo de habitaciones de forma recursiva: necesita una
+# pila y un límite de recursión mucho mayores que los de por defecto
+PILA_DEEPCOPY = 1024 * 1024 * 1024
+
+
+def _jugar(simulacion: Simulacion, rng: random.Random):
+    """Unos pasos al azar explorando cada habitación."""
+    explorador = simulacion.explorador
+    for _ in range(PASOS_POR_CICLO):
+        direcciones = list(simulacion.mapa.habitaciones[explorador.posicion].conexiones)
+        explorador.mover(rng.choice(direcciones))
+        explorador.explorar_habitacion()
+
+
+def _medir_deepcopy(explorador) -> tuple[float, int]:
+    """Segundos y bytes de copiar el explorador (y su mapa) con deepcopy."""
+    resultado = []
+
+    def copiar():
+        limite = sys.getrecursionlimit()
+        sys.setrecursionlimit(10**7)
+        try:
+            inicio = time.perf_counter()
+            copia = copy.deepcopy(explorador)
+            resultado.append((time.perf_counter() - inicio, perfilar_mapa(copia.mapa, copia).total))
+        finally:
+            sys.setrecursionlimit(limite)
+
+    tamano_pila = threading.stack_size(PILA_DEEPCOPY)
+    try:
+        hilo = threading.Thread(target=copiar)
+        hilo.start()
+        hilo.join()
+    finally:
+        threading.stack_size(tamano_pila)
+    return resultado[0]
+
+
+def main(tamanos: list[int]):
+    filas = []
+    for n in tamanos:
+        mapa = crear_mapa_grande(n)
+        explorador = crear_explorador_en(mapa, vida=10**6)
+        segundos_deepcopy, memoria_deepcopy = _medir_deepcopy(explorador)
+
+        tiempos = {}
+        with cronometro(tiempos, "simulacion"):
+            simulacion = Simulacion(explorador)
+        rng = random.Random(0)
+        inicio = time.perf_counter()
+        for _ in range(CICLOS):
+            antes = simulacion.instantanea()
+            _jugar(simulacion, rng)
+            simulacion.restaurar(antes)
+        ciclo = (time.perf_counter() - inicio) / CICLOS
+        _jugar(simulacion, rng)
+        rama = simulacion.ramificar()
+        memoria_rama = perfilar_mapa(rama.mapa, rama.explorador).total
+
+        filas.append([
+            n,
+            f"{segundos_deepcopy * 1000:.1f}",
+            f"{tiempos['simulacion'] * 1000:.2f}",
+            f"{ciclo * 1e6:.0f}",
+            f"{memoria_deepcopy / 1024:.0f}",
+            f"{memoria_rama / 1024:.1f}",
+        ])
+        del mapa, explorador, simulacion, rama
+    imprimir_tabla(
+        ["habitaciones", "deepcopy (ms)", "Simulacion (ms)",
+         f"instantánea+{PASOS_POR_CICLO} pasos+restaurar (µs)", "deepcopy (KiB)", "rama (KiB)"],
+        filas
+    )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
@@ -0,0 +1,62 @@
+"""
+Memoria por habitación de mapas generados, desglosada por componente.
+
+Falla (código de salida 1) si algún tamaño supera el presupuesto de bytes
+por habitación.
+
+Uso: python -m benchmarks.bench_memoria [--presupuesto BYTES] [--detalle] [n_habitaciones ...]
+"""
+
+import argparse
+import sys
+
+from dungeon_generator.memoria import (
+    COMPONENTES, PRESUPUESTO_BYTES_POR_HABITACION, perfilar_generacion
+)
+from .comun import imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**2, 10**3, 10**4, 10**5]
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_memoria")
+    parser.add_argument("tamanos", type=int, nargs="*", default=TAMANOS_POR_DEFECTO)
+    parser.add_argument("--presupuesto", type=float, default=PRESUPUESTO_BYTES_POR_HABITACION,
+                        help="Bytes por habitación permitidos")
+    parser.add_argument("--detalle", action="store_true",
+                        help="Muestra el desglose completo del mayor tamaño")
+    args = parser.parse_args(argv)
+
+    perfiles = [perfilar_generacion(n) for n in args.tamanos]
+    filas = []
+    for perfil in perfiles:
+        n = perfil.n_habitaciones
+        filas.append(
+            [n, f"{perfil.total / 1024:.1f}", f"{perfil.bytes_por_habitacion:.0f}"]
+            + [f"{perfil.componentes[c] / n:.0f}" for c in COMPONENTES
+               if c not in ("inventario", "estado_jugador")]
+        )
+    imprimir_tabla(
+        ["habitaciones", "KiB", "B/hab"]
+        + [f"{c} B/hab" for c in COMPONENTES if c not in ("inventario", "estado_jugador")],
+        filas
+    )
+    if args.detalle and perfiles:
+        print()
+        print(perfiles[-1].reporte())
+
+    excedidos = 0
+    for perfil in perfiles:
+        try:
+            perfil.verificar_presupuesto(args.presupuesto)
+        except AssertionError as error:
+            print(f"❌ {error}")
+            excedidos += 1
+    if excedidos:
+        return 1
+    print(f"✅ Todos los tamaños dentro del presupuesto ({args.presupuesto:.0f} B/hab)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
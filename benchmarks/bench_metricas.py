@@ -0,0 +1,56 @@
+"""
+Mide el coste de la instrumentación: la misma carga con DUNGEON_METRICAS
+desactivada y activada, cada una en un proceso nuevo (la decisión de
+instrumentar se toma al importar el paquete).
+
+Uso: python -m benchmarks.bench_metricas [repeticiones]
+"""
+
+import os
+import subprocess
+import sys
+
+from .comun import imprimir_tabla
+
+CARGA = """
+import random
+import time
+from dungeon_generator import Mapa, verificar_conectividad_mapa
+from dungeon_generator.metricas import ACTIVAS
+inicio = time.perf_counter()
+for semilla in range({repeticiones}):
+    random.seed(semilla)
+    mapa = Mapa(ancho=30, alto=30)
+    mapa.generar_estructura(300)
+    mapa.colocar_contenido()
+    verificar_conectividad_mapa(mapa)
+print(ACTIVAS, time.perf_counter() - inicio)
+"""
+
+
+def medir_carga(activas: bool, repeticiones: int) -> float:
+    entorno = dict(os.environ, DUNGEON_METRICAS="1" if activas else "0")
+    salida = subprocess.run(
+        [sys.executable, "-c", CARGA.format(repeticiones=repeticiones)],
+        env=entorno, capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert salida[0] == str(activas)
+    return float(salida[1])
+
+
+def main(repeticiones: int):
+    # Mejor de tres para reducir el ruido del arranque
+    desactivadas = min(medir_carga(False, repeticiones) for _ in range(3))
+    activadas = min(medir_carga(True, repeticiones) for _ in range(3))
+    imprimir_tabla(
+        ["métricas", "mapas", "tiempo (s)", "sobrecoste"],
+        [
+            ["desactivadas", repeticiones, f"{desactivadas:.3f}", "-"],
+            ["activadas", repeticiones, f"{activadas:.3f}",
+             f"{(activadas / desactivadas - 1) * 100:+.1f}%"],
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
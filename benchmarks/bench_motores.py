@@ -0,0 +1,43 @@
+"""
+Compara los motores de generación de estructura a distintos tamaños.
+
+Uso: python -m benchmarks.bench_motores [n_habitaciones ...]
+"""
+
+import math
+import sys
+
+from dungeon_generator import Mapa, verificar_conectividad_mapa
+from dungeon_generator.motores import MOTORES
+from .comun import cronometro, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5, 10**6]
+# Por encima de este tamaño no se comprueba la conectividad (solo se mide)
+MAX_TAMANO_VERIFICADO = 10**5
+
+
+def main(tamanos: list[int]):
+    filas = []
+    for n in tamanos:
+        lado = math.isqrt(2 * n) + 1
+        for nombre in MOTORES:
+            mapa = Mapa(ancho=lado, alto=lado)
+            tiempos = {}
+            with cronometro(tiempos, "generar"):
+                resultado = mapa.generar_estructura(n, motor=nombre, semilla=0)
+            if resultado.startswith("Error"):
+                filas.append([n, nombre, "-", "-", resultado])
+                continue
+            conectado = verificar_conectividad_mapa(mapa) if n <= MAX_TAMANO_VERIFICADO else None
+            filas.append([
+                n, nombre,
+                f"{tiempos['generar']:.3f}",
+                f"{n / tiempos['generar']:,.0f}",
+                {True: "sí", False: "NO", None: "-"}[conectado],
+            ])
+            del mapa
+    imprimir_tabla(["habitaciones", "motor", "tiempo (s)", "habitaciones/s", "conectado"], filas)
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
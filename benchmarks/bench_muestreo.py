@@ -0,0 +1,66 @@
+"""
+Compara el muestreo ponderado de contenido: tablas de alias frente a
+`random.choices` con pesos y pesos acumulados + bisect.
+
+Uso: python -m benchmarks.bench_muestreo [n_tipos] [n_extracciones ...]
+"""
+
+import bisect
+import itertools
+import random
+import sys
+
+from dungeon_generator.muestreo import TablaAlias
+from .comun import cronometro, imprimir_tabla
+
+TIPOS_POR_DEFECTO = 500
+EXTRACCIONES_POR_DEFECTO = [10**5, 10**6]
+
+
+def main(n_tipos: int, extracciones: list[int]):
+    rng = random.Random(0)
+    # Rareza muy desigual, como un catálogo real (pocos comunes, muchos raros)
+    pesos = [1.0 / (i + 1) for i in range(n_tipos)]
+    acumulados = list(itertools.accumulate(pesos))
+    total = acumulados[-1]
+
+    tiempos = {}
+    with cronometro(tiempos, "construir"):
+        tabla = TablaAlias(pesos)
+
+    filas = []
+    for n in extracciones:
+        with cronometro(tiempos, "choices"):
+            rng.choices(range(n_tipos), weights=pesos, k=n)
+        with cronometro(tiempos, "choices_individual"):
+            # Una llamada por habitación: recalcula los acumulados cada vez, O(n)
+            poblacion = range(n_tipos)
+            [rng.choices(poblacion, weights=pesos)[0] for _ in range(n // 10)]
+        with cronometro(tiempos, "bisect"):
+            aleatorio = rng.random
+            [bisect.bisect(acumulados, aleatorio() * total) for _ in range(n)]
+        with cronometro(tiempos, "alias"):
+            tabla.muestrear_lote(n, rng)
+        with cronometro(tiempos, "alias_individual"):
+            [tabla.muestrear(rng) for _ in range(n)]
+        filas.append([
+            n_tipos, n,
+            f"{tiempos['choices']:.3f}",
+            f"{tiempos['choices_individual'] * 10:.3f}",
+            f"{tiempos['bisect']:.3f}",
+            f"{tiempos['alias']:.3f}",
+            f"{tiempos['alias_individual']:.3f}",
+        ])
+
+    print(f"Construcción de la tabla de alias: {tiempos['construir'] * 1000:.2f} ms")
+    imprimir_tabla(
+        ["tipos", "extracciones", "choices lote (s)", "choices 1x1 (s)*", "bisect (s)", "alias lote (s)", "alias 1x1 (s)"],
+        filas
+    )
+    print("* estimado a partir de n/10 extracciones")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:]]
+    main(argumentos[0] if argumentos else TIPOS_POR_DEFECTO,
+         argumentos[1:] or EXTRACCIONES_POR_DEFECTO)
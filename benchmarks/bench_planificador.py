@@ -0,0 +1,56 @@
+"""
+Mide el planificador de rutas: matriz de distancias (primera llamada), plan
+repetido (memoizado) y calidad de la heurística frente al óptimo exacto.
+
+Uso: python -m benchmarks.bench_planificador [n_habitaciones ...]
+"""
+
+import math
+import sys
+
+from dungeon_generator import Explorador, Jefe, PlanificadorRutas, generar_camino_minimo
+from dungeon_generator.lote import generar_mapa
+from .comun import cronometro, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5]
+# Presupuesto de pasos respecto al camino directo hasta el jefe
+HOLGURA_PRESUPUESTO = 1.5
+
+
+def main(tamanos: list[int]):
+    filas = []
+    for n in tamanos:
+        lado = math.isqrt(2 * n) + 1
+        mapa = generar_mapa(lado, lado, n, semilla=0)
+        explorador = Explorador(mapa=mapa, vida=10**6)  # Ningún monstruo bloquea
+        explorador.posicion = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+        jefe = next(p for p, h in mapa.habitaciones.items() if isinstance(h.contenido, Jefe))
+        directo = len(generar_camino_minimo(mapa, explorador.posicion, jefe)) - 1
+        presupuesto = int(directo * HOLGURA_PRESUPUESTO)
+
+        tiempos = {}
+        planificador = PlanificadorRutas(mapa)
+        with cronometro(tiempos, "frio"):
+            plan = planificador.planificar(explorador, presupuesto)
+        with cronometro(tiempos, "memoizado"):
+            planificador.planificar(explorador, presupuesto)
+
+        # Calidad: con pocos tesoros se puede comparar con el óptimo
+        exacto = PlanificadorRutas(mapa, max_tesoros=10).planificar(explorador, presupuesto)
+        heuristico = PlanificadorRutas(mapa, max_tesoros=10, max_exacto=0).planificar(explorador, presupuesto)
+        filas.append([
+            n,
+            f"{tiempos['frio'] * 1000:.1f}",
+            f"{tiempos['memoizado'] * 1e6:.1f}",
+            f"{plan.valor} / {plan.pasos} / {presupuesto}",
+            f"{heuristico.valor / exacto.valor * 100:.1f}%" if exacto.valor else "-",
+        ])
+    imprimir_tabla(
+        ["habitaciones", "primer plan (ms)", "memoizado (µs)",
+         "valor / pasos / presupuesto", "heurística vs exacto"],
+        filas
+    )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
@@ -0,0 +1,63 @@
+"""
+Compara la latencia de obtener un mapa de la reserva con generarlo en el
+momento, y mide la tasa de relleno de la cola con pedidos continuos.
+
+Uso: python -m benchmarks.bench_reserva [n_habitaciones ...]
+"""
+
+import math
+import statistics
+import sys
+import time
+
+from dungeon_generator import ReservaMapas, PerfilMapa
+from dungeon_generator.lote import generar_mapa
+from .comun import imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5]
+PEDIDOS = 8
+
+
+def _ms(tiempos: list[float]) -> str:
+    return f"{statistics.median(tiempos) * 1000:.2f}"
+
+
+def main(tamanos: list[int]):
+    filas = []
+    for n in tamanos:
+        lado = math.isqrt(2 * n) + 1
+        directo = []
+        for semilla in range(PEDIDOS):
+            inicio = time.perf_counter()
+            generar_mapa(lado, lado, n, semilla)
+            directo.append(time.perf_counter() - inicio)
+
+        with ReservaMapas({"bench": PerfilMapa(lado, lado, n)}, profundidad=PEDIDOS) as reserva:
+            reserva.esperar_llena(600)
+            servidos = []
+            for _ in range(PEDIDOS):
+                inicio = time.perf_counter()
+                reserva.obtener("bench")
+                servidos.append(time.perf_counter() - inicio)
+            # Se deja que la cola se vuelva a llenar para medir el relleno
+            reserva.esperar_llena(600)
+            estado = reserva.estadisticas()["bench"]
+
+        filas.append([
+            n,
+            _ms(directo),
+            _ms(servidos),
+            f"{statistics.median(directo) / statistics.median(servidos):.0f}x",
+            estado["profundidad"],
+            estado["fallos"],
+            f"{estado['relleno_por_segundo']:.1f}",
+        ])
+    imprimir_tabla(
+        ["habitaciones", "generar (ms)", "reserva (ms)", "aceleración", "profundidad",
+         "fallos", "relleno (mapas/s)"],
+        filas
+    )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
@@ -0,0 +1,58 @@
+"""
+Compara el BFS de `generar_camino_minimo` con la búsqueda jerárquica de
+`RutasJerarquicas` entre pares de habitaciones al azar.
+
+Uso: python -m benchmarks.bench_rutas [n_habitaciones ...]
+"""
+
+import random
+import sys
+import time
+
+from dungeon_generator import RutasJerarquicas, generar_camino_minimo
+from .comun import crear_mapa_grande, cronometro, imprimir_tabla
+
+TAMANOS_POR_DEFECTO = [10**4, 10**5, 10**6]
+CONSULTAS = 10
+
+
+def main(tamanos: list[int]):
+    filas = []
+    for n in tamanos:
+        mapa = crear_mapa_grande(n)
+        rng = random.Random(0)
+        posiciones = list(mapa.habitaciones)
+        pares = [(rng.choice(posiciones), rng.choice(posiciones)) for _ in range(CONSULTAS)]
+
+        tiempos = {}
+        with cronometro(tiempos, "bfs"):
+            minimos = [generar_camino_minimo(mapa, a, b) for a, b in pares]
+        rutas = RutasJerarquicas(mapa)
+        with cronometro(tiempos, "frio"):
+            rutas.camino(*pares[0])  # Calcula bajo demanda los bloques que toca
+        with cronometro(tiempos, "precalcular"):
+            rutas.precalcular()
+        inicio = time.perf_counter()
+        caminos = [rutas.camino(a, b) for a, b in pares]
+        tiempos["jerarquico"] = time.perf_counter() - inicio
+
+        exceso = max(len(c) / len(m) for c, m in zip(caminos, minimos)) - 1
+        filas.append([
+            n,
+            f"{tiempos['bfs'] / CONSULTAS * 1000:.1f}",
+            f"{tiempos['frio'] * 1000:.1f}",
+            f"{tiempos['precalcular']:.2f}",
+            f"{tiempos['jerarquico'] / CONSULTAS * 1000:.1f}",
+            f"{tiempos['bfs'] / tiempos['jerarquico']:.1f}x",
+            f"{exceso * 100:.1f}%",
+        ])
+        del mapa, rutas
+    imprimir_tabla(
+        ["habitaciones", "BFS (ms)", "1ª consulta (ms)", "precálculo (s)",
+         "jerárquico (ms)", "aceleración", "exceso máx."],
+        filas
+    )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
@@ -0,0 +1,73 @@
+"""
+Prueba de carga del servidor multi-sesión en local.
+
+Abre muchas conexiones concurrentes, cada una con su propia sesión, envía
+comandos y mide el rendimiento y la latencia de extremo a extremo.
+
+Uso: python -m benchmarks.bench_servidor [sesiones] [comandos_por_sesion]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from dungeon_generator import calcular_percentil
+from servidor import ServidorJuego, FIN_RESPUESTA
+
+COMANDOS = ["n", "s", "e", "o", "explorar", "stats", "inv", "m"]
+
+
+async def _cliente(puerto: int, n_comandos: int, latencias: list[float], semilla: int):
+    rng = random.Random(semilla)
+    reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+
+    async def enviar(linea: str) -> bool:
+        writer.write((linea + "\n").encode())
+        await writer.drain()
+        while True:
+            respuesta = await reader.readline()
+            if not respuesta:
+                return False
+            if respuesta.decode().rstrip("\n") == FIN_RESPUESTA:
+                return True
+
+    await enviar("nueva 30 30 200")
+    for _ in range(n_comandos):
+        inicio = time.perf_counter()
+        if not await enviar(rng.choice(COMANDOS)):
+            break
+        latencias.append(time.perf_counter() - inicio)
+    writer.close()
+
+
+async def _main(n_sesiones: int, n_comandos: int):
+    with tempfile.TemporaryDirectory() as directorio:
+        juego = ServidorJuego(directorio)
+        servidor = await juego.iniciar("127.0.0.1", 0)
+        puerto = servidor.sockets[0].getsockname()[1]
+
+        latencias: list[float] = []
+        inicio_cpu = time.process_time()
+        inicio = time.perf_counter()
+        await asyncio.gather(*[
+            _cliente(puerto, n_comandos, latencias, i) for i in range(n_sesiones)
+        ])
+        duracion = time.perf_counter() - inicio
+        cpu = time.process_time() - inicio_cpu
+        servidor.close()
+
+    print(f"Sesiones concurrentes: {n_sesiones} (1 proceso, {os.cpu_count()} CPU)")
+    print(f"Comandos: {len(latencias)} en {duracion:.2f} s -> {len(latencias) / duracion:.0f} comandos/s")
+    print(f"Latencia extremo a extremo: p50={calcular_percentil(latencias, 50) * 1000:.2f} ms, "
+          f"p99={calcular_percentil(latencias, 99) * 1000:.2f} ms")
+    print(f"Latencia en el servidor: {juego.estadisticas()}")
+    print(f"Tiempo de CPU por comando: {cpu / max(1, len(latencias)) * 1000:.3f} ms "
+          "(cliente y servidor comparten proceso)")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(_main(*(argumentos + [200, 50][len(argumentos):])))
@@ -0,0 +1,73 @@
+"""Funciones compartidas por los benchmarks."""
+
+import math
+import random
+import time
+from contextlib import contextmanager
+
+from dungeon_generator import Mapa, Explorador, Habitacion, OPUESTO
+
+
+def crear_mapa_grande(n_habitaciones: int, semilla: int = 0) -> Mapa:
+    """
+    Crea un mapa de `n_habitaciones` rellenando una cuadrícula casi cuadrada.
+    
+    Las habitaciones se conectan en serpentina más algunos atajos verticales,
+    lo que permite construir mapas de 10^6 habitaciones en segundos (el
+    algoritmo de `Mapa.generar_estructura` no está pensado para esos tamaños).
+    """
+    random.seed(semilla)
+    lado = math.isqrt(n_habitaciones)
+    if lado * lado < n_habitaciones:
+        lado += 1
+    mapa = Mapa(ancho=lado, alto=lado)
+    
+    anterior = None
+    for i in range(n_habitaciones):
+        y, resto = divmod(i, lado)
+        x = resto if y % 2 == 0 else lado - 1 - resto
+        hab = Habitacion(id=i, x=x, y=y, inicial=(i == 0))
+        mapa.habitaciones[(x, y)] = hab
+        if anterior is not None:
+            if anterior.y == y:
+                direccion = "este" if x > anterior.x else "oeste"
+            else:
+                direccion = "sur"
+            anterior.conexiones[direccion] = hab
+            hab.conexiones[OPUESTO[direccion]] = anterior
+        arriba = mapa.habitaciones.get((x, y - 1))
+        if arriba is not None and "norte" not in hab.conexiones and random.random() < 0.3:
+            hab.conexiones["norte"] = arriba
+            arriba.conexiones["sur"] = hab
+        anterior = hab
+    
+    mapa.habitacion_inicial = mapa.habitaciones[(0, 0)]
+    mapa.colocar_contenido()
+    return mapa
+
+
+def crear_explorador(mapa: Mapa) -> Explorador:
+    """Crea un explorador situado en la entrada del mapa."""
+    explorador = Explorador(mapa=mapa)
+    explorador.posicion = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+    mapa.habitacion_inicial.visitada = True
+    return explorador
+
+
+@contextmanager
+def cronometro(resultados: dict, clave: str):
+    """Mide el tiempo de un bloque y lo guarda en `resultados[clave]`."""
+    inicio = time.perf_counter()
+    yield
+    resultados[clave] = time.perf_counter() - inicio
+
+
+def imprimir_tabla(cabeceras: list[str], filas: list[list]):
+    """Imprime una tabla de texto alineada."""
+    textos = [[str(c) for c in fila] for fila in filas]
+    anchos = [max(len(h), *(len(f[i]) for f in textos)) if textos else len(h)
+              for i, h in enumerate(cabeceras)]
+    print(" | ".join(h.ljust(a) for h, a in zip(cabeceras, anchos)))
+    print("-+-".join("-" * a for a in anchos))
+    for fila in textos:
+        print(" | ".join(c.rjust(a) for c, a in zip(fila, anchos)))
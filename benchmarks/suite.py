@@ -0,0 +1,272 @@
+"""
+Suite de benchmarks: generación, colocación de contenido, caminos, E/S y
+renderizado a distintos tamaños de mapa, con tiempo y memoria pico por caso.
+
+Uso:
+    python -m benchmarks.suite ejecutar [--tamanos 100 1000 ...] [--salida resultados.json]
+    python -m benchmarks.suite comparar base.json nuevo.json [--umbral 0.25]
+
+`ejecutar` imprime una tabla por caso (el tiempo por habitación deja ver cómo
+escala) y guarda los resultados en JSON. `comparar` marca como regresión todo
+caso que sea más lento (o use más memoria) que la línea base por encima del
+umbral relativo, y termina con código 1 si hay alguna.
+
+Los tiempos se miden en una pasada sin tracemalloc y la memoria en otra con
+él, para que el rastreo de memoria no infle los tiempos.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Optional
+
+from rich.console import Console
+from dungeon_generator import (
+    Mapa, Visualizador, guardar_partida, cargar_partida,
+    verificar_conectividad_mapa, generar_camino_minimo,
+    obtener_habitacion_mas_lejana, mostrar_mapa_simple
+)
+from dungeon_generator.visualizador import ANCHO_CELDA
+from .comun import crear_explorador, imprimir_tabla
+
+VERSION_RESULTADOS = 1
+TAMANOS_POR_DEFECTO = [10**2, 10**3, 10**4, 10**5]
+UMBRAL_POR_DEFECTO = 0.25
+# Por debajo de este tiempo la medida es casi todo ruido y no se compara
+TIEMPO_MINIMO_COMPARABLE = 0.001
+# Repeticiones por caso (se toma el mínimo): más en tamaños pequeños y
+# una sola a partir de MAX_TAMANO_REPETIDO, donde cada caso ya tarda segundos
+OPERACIONES_POR_CASO = 10**4
+MIN_REPETICIONES = 3
+MAX_REPETICIONES = 20
+MAX_TAMANO_REPETIDO = 10**5
+
+
+# --- Casos ---
+# Cada caso recibe el estado compartido del tamaño actual y puede dejar en él
+# lo que necesiten los casos siguientes (el mapa, el explorador, etc.).
+
+def caso_generar_estructura(estado: dict):
+    n = estado["n"]
+    random.seed(0)
+    lado = math.isqrt(2 * n) + 1
+    mapa = Mapa(ancho=lado, alto=lado)
+    resultado = mapa.generar_estructura(n)
+    if resultado.startswith("Error"):
+        raise RuntimeError(resultado)
+    estado["mapa"] = mapa
+
+
+def caso_colocar_contenido(estado: dict):
+    random.seed(0)
+    estado["mapa"].colocar_contenido()
+
+
+def caso_verificar_conectividad(estado: dict):
+    if not verificar_conectividad_mapa(estado["mapa"]):
+        raise RuntimeError("mapa no conectado")
+
+
+def caso_camino_minimo(estado: dict):
+    mapa = estado["mapa"]
+    inicio = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+    # El destino se busca una sola vez: solo se mide el camino
+    if "fin" not in estado:
+        estado["fin"] = obtener_habitacion_mas_lejana(mapa, inicio)
+    if not generar_camino_minimo(mapa, inicio, estado["fin"]):
+        raise RuntimeError("sin camino")
+
+
+def caso_guardar_partida(estado: dict):
+    if "explorador" not in estado:
+        estado["explorador"] = crear_explorador(estado["mapa"])
+    resultado = guardar_partida(estado["explorador"], estado["archivo"])
+    if resultado.startswith("Error"):
+        raise RuntimeError(resultado)
+
+
+def caso_cargar_partida(estado: dict):
+    if cargar_partida(estado["archivo"]) is None:
+        raise RuntimeError("no se pudo cargar")
+
+
+def caso_mostrar_mapa_simple(estado: dict):
+    mostrar_mapa_simple(estado["mapa"], estado.get("explorador"))
+
+
+def caso_mostrar_mapa_completo(estado: dict):
+    mapa = estado["mapa"]
+    visualizador = estado.get("visualizador")
+    if visualizador is None or visualizador.mapa is not mapa:
+        # Un visualizador por mapa; el anterior deja de observar su mapa
+        if visualizador is not None:
+            visualizador.cerrar()
+        consola = Console(file=estado["nulo"], width=mapa.ancho * ANCHO_CELDA + 8,
+                          color_system="truecolor")
+        visualizador = estado["visualizador"] = Visualizador(mapa, consola)
+    visualizador.mostrar_mapa_completo(estado.get("explorador"))
+
+
+CASOS: list[tuple[str, Callable[[dict], None]]] = [
+    ("generar_estructura", caso_generar_estructura),
+    ("colocar_contenido", caso_colocar_contenido),
+    ("verificar_conectividad", caso_verificar_conectividad),
+    ("camino_minimo", caso_camino_minimo),
+    ("guardar_partida", caso_guardar_partida),
+    ("cargar_partida", caso_cargar_partida),
+    ("mostrar_mapa_simple", caso_mostrar_mapa_simple),
+    ("mostrar_mapa_completo", caso_mostrar_mapa_completo),
+]
+
+
+# --- Ejecución ---
+
+def _pasada(n: int, casos: list, memoria: bool, directorio: str, nulo) -> dict[str, float]:
+    """Ejecuta todos los casos para un tamaño. Retorna segundos o bytes pico por caso."""
+    estado = {"n": n, "archivo": os.path.join(directorio, f"partida_{n}.json"), "nulo": nulo}
+    if memoria or n > MAX_TAMANO_REPETIDO:
+        repeticiones = 1
+    else:
+        repeticiones = max(MIN_REPETICIONES, min(MAX_REPETICIONES, OPERACIONES_POR_CASO // n))
+    medidas = {}
+    for nombre, caso in casos:
+        gc.collect()
+        if memoria:
+            tracemalloc.start()
+            caso(estado)
+            medidas[nombre] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            mejor = math.inf
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                caso(estado)
+                mejor = min(mejor, time.perf_counter() - inicio)
+            medidas[nombre] = mejor
+    if "visualizador" in estado:
+        estado["visualizador"].cerrar()
+    return medidas
+
+
+def ejecutar(tamanos: list[int], casos: Optional[list[str]] = None, medir_memoria: bool = True) -> dict:
+    """Ejecuta la suite y retorna los resultados en el formato del JSON."""
+    seleccion = [(n, c) for n, c in CASOS if casos is None or n in casos]
+    resultados: dict[str, dict[str, dict]] = {nombre: {} for nombre, _ in seleccion}
+    with tempfile.TemporaryDirectory() as directorio, open(os.devnull, "w") as nulo:
+        for n in tamanos:
+            print(f"· {n} habitaciones...", file=sys.stderr)
+            tiempos = _pasada(n, seleccion, False, directorio, nulo)
+            picos = _pasada(n, seleccion, True, directorio, nulo) if medir_memoria else {}
+            for nombre, _ in seleccion:
+                resultados[nombre][str(n)] = {
+                    "tiempo_s": tiempos[nombre],
+                    "memoria_pico_kib": round(picos[nombre] / 1024, 1) if nombre in picos else None,
+                }
+    return {
+        "version": VERSION_RESULTADOS,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+
+def imprimir_resultados(datos: dict):
+    for nombre, por_tamano in datos["resultados"].items():
+        print(f"\n{nombre}")
+        filas = []
+        for n, medida in sorted(por_tamano.items(), key=lambda e: int(e[0])):
+            memoria = medida["memoria_pico_kib"]
+            filas.append([
+                n,
+                f"{medida['tiempo_s'] * 1000:.3f}",
+                f"{medida['tiempo_s'] / int(n) * 1e6:.3f}",
+                "-" if memoria is None else f"{memoria:.1f}",
+            ])
+        imprimir_tabla(["habitaciones", "tiempo (ms)", "µs/habitación", "memoria pico (KiB)"], filas)
+
+
+# --- Comparación ---
+
+def comparar(base: dict, nuevo: dict, umbral: float = UMBRAL_POR_DEFECTO) -> list[str]:
+    """
+    Compara dos resultados y retorna la lista de regresiones (texto).
+    Solo se comparan los casos y tamaños presentes en ambos.
+    """
+    regresiones = []
+    filas = []
+    for nombre, por_tamano in nuevo["resultados"].items():
+        for n, medida in sorted(por_tamano.items(), key=lambda e: int(e[0])):
+            anterior = base["resultados"].get(nombre, {}).get(n)
+            if anterior is None:
+                continue
+            metricas = [("tiempo", anterior["tiempo_s"], medida["tiempo_s"])]
+            if anterior.get("memoria_pico_kib") and medida.get("memoria_pico_kib"):
+                metricas.append(("memoria", anterior["memoria_pico_kib"], medida["memoria_pico_kib"]))
+            for metrica, valor_base, valor_nuevo in metricas:
+                cambio = valor_nuevo / valor_base - 1 if valor_base else 0.0
+                ruido = metrica == "tiempo" and valor_nuevo < TIEMPO_MINIMO_COMPARABLE
+                regresion = cambio > umbral and not ruido
+                filas.append([nombre, n, metrica, f"{cambio * 100:+.1f}%", "REGRESIÓN" if regresion else ""])
+                if regresion:
+                    regresiones.append(f"{nombre} ({n} habitaciones): {metrica} {cambio * 100:+.1f}%")
+    imprimir_tabla(["caso", "habitaciones", "métrica", "cambio", ""], filas)
+    return regresiones
+
+
+def _leer(archivo: str) -> dict:
+    with open(archivo, encoding="utf-8") as f:
+        datos = json.load(f)
+    if datos.get("version") != VERSION_RESULTADOS:
+        raise ValueError(f"{archivo}: versión de resultados no soportada")
+    return datos
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n")[1])
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_ejecutar = subcomandos.add_parser("ejecutar", help="Ejecuta la suite y guarda los resultados")
+    p_ejecutar.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS_POR_DEFECTO,
+                            help="Número de habitaciones (p. ej. 100 1000 10000 100000 1000000)")
+    p_ejecutar.add_argument("--casos", nargs="+", choices=[n for n, _ in CASOS], default=None)
+    p_ejecutar.add_argument("--salida", default="resultados_benchmarks.json")
+    p_ejecutar.add_argument("--sin-memoria", action="store_true",
+                            help="No medir la memoria pico (la suite tarda la mitad)")
+
+    p_comparar = subcomandos.add_parser("comparar", help="Compara resultados con una línea base")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("nuevo")
+    p_comparar.add_argument("--umbral", type=float, default=UMBRAL_POR_DEFECTO,
+                            help="Empeoramiento relativo tolerado (0.25 = 25%%)")
+
+    args = parser.parse_args(argv)
+    if args.comando == "ejecutar":
+        datos = ejecutar(args.tamanos, args.casos, not args.sin_memoria)
+        imprimir_resultados(datos)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+        return 0
+
+    regresiones = comparar(_leer(args.base), _leer(args.nuevo), args.umbral)
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresiones por encima del {args.umbral:.0%}:")
+        for regresion in regresiones:
+            print(f"  - {regresion}")
+        return 1
+    print(f"\n✅ Sin regresiones por encima del {args.umbral:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
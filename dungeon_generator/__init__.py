@@ -1,26 +1,141 @@
 """Dungeon Generator - Sistema de generación de mapas para dungeons"""
 
-from .models import Habitacion, Objeto
-from .contenido import ContenidoHabitacion, Tesoro, Monstruo, Jefe, Evento
-from .mapa import Mapa, DIRECCIONES, OPUESTO
-from .explorador import Explorador
-from .serializacion import guardar_partida, cargar_partida
-from .visualizador import Visualizador
-from .utils import (
-    generar_monstruos_desde_yaml, 
-    mostrar_mapa_simple,
-    calcular_valor_total_inventario, 
-    obtener_habitacion_mas_lejana,
-    contar_habitaciones_por_tipo, 
-    verificar_conectividad_mapa,
-    generar_camino_minimo, 
-    crear_mapa_ejemplo,
-    obtener_estadisticas_explorador,
-    generar_reporte_exploracion,
-    calcular_dificultad_habitacion,
-    obtener_habitaciones_sin_visitar,
-    calcular_porcentaje_completado,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+# Los submódulos se importan bajo demanda (ver __getattr__), de modo que
+# `import dungeon_generator` no carga rich si no se usa el Visualizador.
+_ATRIBUTOS_PEREZOSOS = {
+    # Modelos
+    "Habitacion": "models",
+    "Objeto": "models",
+    
+    # Contenido
+    "ContenidoHabitacion": "contenido",
+    "Tesoro": "contenido",
+    "Monstruo": "contenido",
+    "Jefe": "contenido",
+    "Evento": "contenido",
+    
+    # Catálogo de contenido
+    "Catalogo": "catalogo",
+    "cargar_catalogo": "catalogo",
+    
+    # Mapa
+    "Mapa": "mapa",
+    "DIRECCIONES": "mapa",
+    "OPUESTO": "mapa",
+    "MapaJugador": "plantilla",
+    "MotorGeneracion": "motores",
+    "registrar_motor": "motores",
+    "CacheMapas": "cache_mapas",
+    "RutasJerarquicas": "rutas",
+    "PlanificadorRutas": "planificador",
+    "PlanRuta": "planificador",
+    "ReservaMapas": "reserva",
+    "PerfilMapa": "reserva",
+    "Simulacion": "instantaneas",
+    "Instantanea": "instantaneas",
+    
+    # Explorador
+    "Explorador": "explorador",
+    "RegistroVisitas": "visitas",
+    "crear_explorador_en": "visitas",
+    
+    # Serialización
+    "guardar_partida": "serializacion",
+    "cargar_partida": "serializacion",
+    "GestorPartidas": "ranuras",
+    "MetadatosPartida": "ranuras",
+    
+    # Visualización
+    "Visualizador": "visualizador",
+    "exportar_mapa_png": "imagen",
+    
+    # Métricas
+    "RegistroMetricas": "metricas",
+    "PerfilMemoria": "memoria",
+    "perfilar_mapa": "memoria",
+    "perfilar_generacion": "memoria",
+    
+    # Utilidades
+    "generar_monstruos_desde_yaml": "utils",
+    "mostrar_mapa_simple": "utils",
+    "exportar_mapa_texto": "utils",
+    "calcular_valor_total_inventario": "utils",
+    "obtener_habitacion_mas_lejana": "utils",
+    "contar_habitaciones_por_tipo": "utils",
+    "verificar_conectividad_mapa": "utils",
+    "generar_camino_minimo": "utils",
+    "calcular_caminos_lote": "utils",
+    "calcular_distancias_lote": "utils",
+    "ResultadoConsultas": "utils",
+    "crear_mapa_ejemplo": "utils",
+    "obtener_estadisticas_explorador": "utils",
+    "generar_reporte_exploracion": "utils",
+    "calcular_dificultad_habitacion": "utils",
+    "obtener_habitaciones_sin_visitar": "utils",
+    "calcular_porcentaje_completado": "utils",
+    "contar_habitaciones_visitadas": "utils",
+    "calcular_percentil": "utils",
+}
+
+if TYPE_CHECKING:
+    from .models import Habitacion, Objeto
+    from .contenido import ContenidoHabitacion, Tesoro, Monstruo, Jefe, Evento
+    from .catalogo import Catalogo, cargar_catalogo
+    from .mapa import Mapa, DIRECCIONES, OPUESTO
+    from .plantilla import MapaJugador
+    from .motores import MotorGeneracion, registrar_motor
+    from .cache_mapas import CacheMapas
+    from .rutas import RutasJerarquicas
+    from .planificador import PlanificadorRutas, PlanRuta
+    from .reserva import ReservaMapas, PerfilMapa
+    from .instantaneas import Simulacion, Instantanea
+    from .explorador import Explorador
+    from .visitas import RegistroVisitas, crear_explorador_en
+    from .serializacion import guardar_partida, cargar_partida
+    from .ranuras import GestorPartidas, MetadatosPartida
+    from .visualizador import Visualizador
+    from .imagen import exportar_mapa_png
+    from .metricas import RegistroMetricas
+    from .memoria import PerfilMemoria, perfilar_mapa, perfilar_generacion
+    from .utils import (
+        generar_monstruos_desde_yaml, 
+        mostrar_mapa_simple,
+        exportar_mapa_texto,
+        calcular_valor_total_inventario, 
+        obtener_habitacion_mas_lejana,
+        contar_habitaciones_por_tipo, 
+        verificar_conectividad_mapa,
+        generar_camino_minimo, 
+        calcular_caminos_lote,
+        calcular_distancias_lote,
+        ResultadoConsultas,
+        crear_mapa_ejemplo,
+        obtener_estadisticas_explorador,
+        generar_reporte_exploracion,
+        calcular_dificultad_habitacion,
+        obtener_habitaciones_sin_visitar,
+        calcular_porcentaje_completado,
+        contar_habitaciones_visitadas,
+        calcular_percentil,
+    )
+
+
+def __getattr__(nombre: str):
+    """Importa el submódulo que define `nombre` la primera vez que se usa."""
+    modulo = _ATRIBUTOS_PEREZOSOS.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(f".{modulo}", __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_ATRIBUTOS_PEREZOSOS))
+
 
 __all__ = [
     # Modelos
@@ -34,35 +149,67 @@ __all__ = [
     "Jefe", 
     "Evento", 
     
+    # Catálogo de contenido
+    "Catalogo",
+    "cargar_catalogo",
+    
     # Mapa
     "Mapa", 
     "DIRECCIONES", 
     "OPUESTO", 
+    "MapaJugador",
+    "MotorGeneracion",
+    "registrar_motor",
+    "CacheMapas",
+    "RutasJerarquicas",
+    "PlanificadorRutas",
+    "PlanRuta",
+    "ReservaMapas",
+    "PerfilMapa",
+    "Simulacion",
+    "Instantanea",
     
     # Explorador
     "Explorador",
+    "RegistroVisitas",
+    "crear_explorador_en",
     
     # Serialización
     "guardar_partida", 
     "cargar_partida", 
+    "GestorPartidas",
+    "MetadatosPartida",
     
     # Visualización
     "Visualizador",
+    "exportar_mapa_png",
+    
+    # Métricas
+    "RegistroMetricas",
+    "PerfilMemoria",
+    "perfilar_mapa",
+    "perfilar_generacion",
     
     # Utilidades
     "generar_monstruos_desde_yaml", 
     "mostrar_mapa_simple",
+    "exportar_mapa_texto",
     "calcular_valor_total_inventario", 
     "obtener_habitacion_mas_lejana",
     "contar_habitaciones_por_tipo", 
     "verificar_conectividad_mapa",
     "generar_camino_minimo", 
+    "calcular_caminos_lote",
+    "calcular_distancias_lote",
+    "ResultadoConsultas",
     "crear_mapa_ejemplo",
     "obtener_estadisticas_explorador",
     "generar_reporte_exploracion",
     "calcular_dificultad_habitacion",
     "obtener_habitaciones_sin_visitar",
     "calcular_porcentaje_completado",
+    "contar_habitaciones_visitadas",
+    "calcular_percentil",
 ]
 
 __version__ = "1.0.0"
@@ -0,0 +1,291 @@
+"""
+Caché en disco de mapas ya generados (estructura y contenido).
+
+La clave son los parámetros de generación (ancho, alto, habitaciones,
+semilla, motor y el contenido del catálogo) junto con la versión del
+generador, así que pedir dos veces el mismo mapa solo lo genera la primera
+y un cambio en el algoritmo no sirve mapas antiguos. Los mapas se guardan en un formato
+binario compacto (columnas de enteros comprimidas con zlib) que se
+reconstruye varias veces más rápido de lo que cuesta generarlo.
+
+El tamaño total del directorio está acotado: al superar `max_bytes` se
+borran los mapas usados hace más tiempo (LRU según la fecha de acceso, que se
+actualiza en cada acierto). El directorio solo se recorre cuando el contador
+de bytes escritos supera el límite o cada `REVISION_CADA` escrituras (para
+contar lo que escriben otros procesos), no en cada guardado. Varios procesos pueden compartir el directorio:
+las escrituras son atómicas (archivo temporal + os.replace) y un archivo que
+otro proceso borra o deja a medias cuenta como fallo y se regenera.
+"""
+
+import gc
+import os
+import zlib
+from array import array
+from typing import Optional
+from .models import Habitacion, Objeto
+from .contenido import Tesoro, Monstruo, Jefe, Evento
+from .mapa import Mapa, VERSION_GENERADOR
+from .metricas import contar
+
+VERSION_FORMATO = 1
+EXTENSION = ".mapa"
+MAX_BYTES_POR_DEFECTO = 256 * 1024 * 1024
+# Escrituras entre recorridos del directorio aunque el contador no llegue al límite
+REVISION_CADA = 256
+
+# Bit de cada dirección en la máscara de conexiones
+_BITS_DIRECCION = (("norte", 1, 0, -1), ("sur", 2, 0, 1), ("este", 4, 1, 0), ("oeste", 8, -1, 0))
+
+
+def empaquetar_mapa(mapa: Mapa) -> bytes:
+    """
+    Serializa el mapa en columnas: ids, x, y, máscara de conexiones y
+    contenidos. También sirve para pasar mapas entre procesos, mucho más
+    rápido que hacer pickle del grafo de habitaciones.
+    """
+    import pickle
+
+    habitaciones = list(mapa.habitaciones.values())
+    ids = array("q", (h.id for h in habitaciones))
+    xs = array("q", (h.x for h in habitaciones))
+    ys = array("q", (h.y for h in habitaciones))
+    mascaras = bytearray(len(habitaciones))
+    contenidos = []
+    for i, hab in enumerate(habitaciones):
+        mascara = 0
+        for direccion, bit, _, _ in _BITS_DIRECCION:
+            if direccion in hab.conexiones:
+                mascara |= bit
+        mascaras[i] = mascara
+
+        c = hab.contenido
+        if c is None:
+            continue
+        if isinstance(c, Jefe):
+            r = c.recompensa_especial
+            contenidos.append((i, "J", c.id, c.nombre, c.vida, c.dano,
+                               (r.nombre, r.descripcion, r.valor) if r else None))
+        elif isinstance(c, Monstruo):
+            contenidos.append((i, "M", c.id, c.nombre, c.vida, c.dano))
+        elif isinstance(c, Tesoro):
+            r = c.recompensa
+            contenidos.append((i, "T", r.nombre, r.descripcion, r.valor))
+        elif isinstance(c, Evento):
+            contenidos.append((i, "E", c.nombre_evento, c.descripcion_evento, c.efecto, c.valor_efecto))
+
+    inicial = habitaciones.index(mapa.habitacion_inicial) if mapa.habitacion_inicial else -1
+    datos = (VERSION_FORMATO, mapa.ancho, mapa.alto, inicial,
+             ids.tobytes(), xs.tobytes(), ys.tobytes(), bytes(mascaras), contenidos)
+    return zlib.compress(pickle.dumps(datos, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def desempaquetar_mapa(datos: bytes) -> Mapa:
+    """
+    Reconstruye el mapa. El recolector de ciclos se pausa mientras tanto:
+    crear cientos de miles de habitaciones seguidas dispara colecciones
+    completas que recorren el mapa a medio construir y casi duplican el tiempo.
+    """
+    estaba_activo = gc.isenabled()
+    gc.disable()
+    try:
+        return _reconstruir(datos)
+    finally:
+        if estaba_activo:
+            gc.enable()
+
+
+def _reconstruir(datos: bytes) -> Mapa:
+    import pickle
+
+    version, ancho, alto, inicial, ids_b, xs_b, ys_b, mascaras, contenidos = pickle.loads(zlib.decompress(datos))
+    if version != VERSION_FORMATO:
+        raise ValueError(f"versión de formato {version} no soportada")
+    ids, xs, ys = array("q"), array("q"), array("q")
+    ids.frombytes(ids_b)
+    xs.frombytes(xs_b)
+    ys.frombytes(ys_b)
+
+    habitaciones = [Habitacion(i, x, y) for i, x, y in zip(ids, xs, ys)]
+    posiciones = dict(zip(zip(xs, ys), habitaciones))
+    for hab, mascara in zip(habitaciones, mascaras):
+        if not mascara:
+            continue
+        conexiones = hab.conexiones
+        for direccion, bit, dx, dy in _BITS_DIRECCION:
+            if mascara & bit:
+                conexiones[direccion] = posiciones[(hab.x + dx, hab.y + dy)]
+
+    for i, tipo, *campos in contenidos:
+        if tipo == "J":
+            id_, nombre, vida, dano, recompensa = campos
+            contenido = Jefe(id_, nombre, vida, dano, Objeto(*recompensa) if recompensa else None)
+        elif tipo == "M":
+            contenido = Monstruo(*campos)
+        elif tipo == "T":
+            contenido = Tesoro(recompensa=Objeto(*campos))
+        else:
+            contenido = Evento(*campos)
+        habitaciones[i].contenido = contenido
+
+    mapa = Mapa(ancho=ancho, alto=alto, habitaciones=posiciones)
+    if inicial >= 0:
+        mapa.habitacion_inicial = habitaciones[inicial]
+        mapa.habitacion_inicial.inicial = True
+    return mapa
+
+
+class CacheMapas:
+    """Caché LRU de mapas generados en un directorio compartible entre procesos."""
+
+    def __init__(self, directorio: str = "cache_mapas", max_bytes: int = MAX_BYTES_POR_DEFECTO):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojados = 0
+        # Bytes en el directorio según el último recorrido más lo escrito desde entonces
+        self._bytes: Optional[int] = None
+        self._escrituras_sin_revisar = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def clave(self, ancho: int, alto: int, n_habitaciones: int, semilla: int,
+              motor: str = "caminata", catalogo: Optional[str] = None) -> str:
+        """Identificador del mapa: hash de los parámetros y del contenido del catálogo."""
+        import hashlib
+
+        resumen_catalogo = ""
+        if catalogo:
+            with open(catalogo, "rb") as f:
+                resumen_catalogo = hashlib.sha256(f.read()).hexdigest()
+        texto = (f"{VERSION_FORMATO}|{VERSION_GENERADOR}|{ancho}|{alto}|{n_habitaciones}"
+                 f"|{semilla}|{motor}|{resumen_catalogo}")
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:32]
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave + EXTENSION)
+
+    def obtener(self, ancho: int, alto: int, n_habitaciones: int, semilla: int,
+                motor: str = "caminata", catalogo: Optional[str] = None) -> Mapa:
+        """
+        Retorna el mapa de esos parámetros, leyéndolo de la caché o
+        generándolo (y guardándolo) si no está. Igual que `generar_mapa`,
+        lanza ValueError si los parámetros no permiten generar el mapa.
+        """
+        clave = self.clave(ancho, alto, n_habitaciones, semilla, motor, catalogo)
+        mapa = self.leer(clave)
+        if mapa is not None:
+            return mapa
+
+        from .lote import generar_mapa
+        mapa = generar_mapa(ancho, alto, n_habitaciones, semilla, catalogo, motor)
+        self.guardar(clave, mapa)
+        return mapa
+
+    def leer(self, clave: str) -> Optional[Mapa]:
+        """Retorna el mapa guardado con esa clave o None (y cuenta el acierto o fallo)."""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as f:
+                mapa = desempaquetar_mapa(f.read())
+            os.utime(ruta)  # Marca de uso para el LRU
+        except FileNotFoundError:
+            mapa = None
+        except Exception:
+            # Archivo dañado o de otra versión: se descarta y se regenera
+            mapa = None
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+        if mapa is None:
+            self.fallos += 1
+            contar("cache.fallos")
+        else:
+            self.aciertos += 1
+            contar("cache.aciertos")
+        return mapa
+
+    def guardar(self, clave: str, mapa: Mapa) -> str:
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        datos = empaquetar_mapa(mapa)
+        try:
+            with open(temporal, "wb") as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            return f"Error: {e}"
+        self._escrituras_sin_revisar += 1
+        if self._bytes is not None:
+            self._bytes += len(datos)
+        if (self._bytes is None or self._bytes > self.max_bytes
+                or self._escrituras_sin_revisar >= REVISION_CADA):
+            self.desalojar()
+        return f"Mapa guardado en caché ({clave})"
+
+    def _entradas(self) -> list[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.directorio) if e.name.endswith(EXTENSION)]
+        except FileNotFoundError:
+            return []
+
+    def desalojar(self) -> int:
+        """Borra los mapas menos usados hasta que la caché quepa en `max_bytes`."""
+        entradas = []
+        for entrada in self._entradas():
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue  # Otro proceso lo acaba de borrar
+            entradas.append((info.st_mtime_ns, info.st_size, entrada.path))
+        total = sum(tam for _, tam, _ in entradas)
+        borrados = 0
+        for _, tam, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+                borrados += 1
+            except FileNotFoundError:
+                pass
+            total -= tam
+        self._bytes = total
+        self._escrituras_sin_revisar = 0
+        self.desalojados += borrados
+        if borrados:
+            contar("cache.desalojados", borrados)
+        return borrados
+
+    def limpiar(self) -> int:
+        """Borra todos los mapas de la caché. Retorna cuántos se borraron."""
+        borrados = 0
+        for entrada in self._entradas():
+            try:
+                os.remove(entrada.path)
+                borrados += 1
+            except FileNotFoundError:
+                pass
+        self._bytes = 0
+        return borrados
+
+    def estadisticas(self) -> dict:
+        entradas = self._entradas()
+        tamano = 0
+        for entrada in entradas:
+            try:
+                tamano += entrada.stat().st_size
+            except FileNotFoundError:
+                pass
+        consultas = self.aciertos + self.fallos
+        return {
+            "mapas": len(entradas),
+            "bytes": tamano,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "desalojados": self.desalojados,
+        }
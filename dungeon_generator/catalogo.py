@@ -0,0 +1,289 @@
+"""
+Catálogo de contenido (monstruos, jefes, tesoros y eventos) cargado desde YAML.
+
+El YAML se parsea con el cargador en C de PyYAML cuando está disponible y el
+resultado se guarda ya compilado (pickle) junto al archivo, de modo que los
+siguientes arranques no vuelven a parsearlo mientras no cambie.
+
+Formato del YAML (todas las secciones son opcionales):
+
+    monstruos:
+      - {nombre: Goblin, vida: [20, 50], dano: [5, 15]}
+    jefes:
+      - nombre: Señor Oscuro
+        vida: [50, 100]
+        dano: [15, 30]
+        recompensa: {nombre: Corona, descripcion: Victoria, valor: 1000}
+    tesoros:
+      - {nombre: Oro, descripcion: Tesoro valioso, valor: [50, 200]}
+    eventos:
+      - {nombre: Trampa, descripcion: ¡Trampa activada!, efecto: trampa, valor: [1, 3]}
+
+Cualquier entrada acepta `peso` (rareza): un número, o `[entrada, fondo]` para
+que el peso varíe con la profundidad (distancia relativa a la entrada). Los
+catálogos con pesos se muestrean con tablas de alias por banda de profundidad.
+"""
+
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+from .muestreo import MuestreadorPorProfundidad
+
+VERSION_CACHE = 2
+SECCIONES = ("monstruos", "jefes", "tesoros", "eventos")
+
+
+@dataclass(frozen=True)
+class PlantillaMonstruo:
+    """Tipo de monstruo con rangos de estadísticas (se escalan con la distancia)."""
+    nombre: str
+    vida_min: int
+    vida_max: int
+    dano_min: int
+    dano_max: int
+    peso: float = 1.0
+    peso_profundo: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class PlantillaJefe(PlantillaMonstruo):
+    recompensa_nombre: str = "Corona del Conquistador"
+    recompensa_descripcion: str = "Victoria"
+    recompensa_valor: int = 1000
+
+
+@dataclass(frozen=True)
+class PlantillaTesoro:
+    nombre: str
+    descripcion: str
+    valor_min: int
+    valor_max: int
+    peso: float = 1.0
+    peso_profundo: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class PlantillaEvento:
+    nombre: str
+    descripcion: str
+    efecto: str
+    valor_min: int = 0
+    valor_max: int = 0
+    peso: float = 1.0
+    peso_profundo: Optional[float] = None
+
+
+@dataclass
+class Catalogo:
+    """Conjunto de plantillas de contenido usado por `Mapa.colocar_contenido`."""
+    monstruos: list[PlantillaMonstruo] = field(default_factory=list)
+    jefes: list[PlantillaJefe] = field(default_factory=list)
+    tesoros: list[PlantillaTesoro] = field(default_factory=list)
+    eventos: list[PlantillaEvento] = field(default_factory=list)
+    _muestreadores: dict = field(default_factory=dict, repr=False, compare=False)
+    _ponderadas: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def __getstate__(self) -> dict:
+        # Las tablas de alias se reconstruyen al usarse; no se guardan en caché
+        estado = self.__dict__.copy()
+        estado["_muestreadores"] = {}
+        estado["_ponderadas"] = {}
+        return estado
+
+    def es_ponderado(self, seccion: str) -> bool:
+        """Indica si alguna entrada de la sección tiene peso distinto de 1 (se calcula una vez)."""
+        ponderada = self._ponderadas.get(seccion)
+        if ponderada is None:
+            ponderada = any(p.peso != 1.0 or p.peso_profundo is not None
+                            for p in getattr(self, seccion))
+            self._ponderadas[seccion] = ponderada
+        return ponderada
+
+    def _muestreador(self, seccion: str) -> MuestreadorPorProfundidad:
+        """Tablas de alias de la sección, construidas una sola vez."""
+        muestreador = self._muestreadores.get(seccion)
+        if muestreador is None:
+            muestreador = MuestreadorPorProfundidad(getattr(self, seccion), peso_en_profundidad)
+            self._muestreadores[seccion] = muestreador
+        return muestreador
+
+    def elegir(self, seccion: str, profundidad: float, rng: random.Random = random):
+        """Elige una plantilla de la sección para una habitación a esa profundidad (0-1)."""
+        if not self.es_ponderado(seccion):
+            return rng.choice(getattr(self, seccion))
+        return self._muestreador(seccion).muestrear(profundidad, rng)
+
+    def elegir_lote(self, seccion: str, profundidades: Sequence[float], rng: random.Random = random) -> list:
+        """Elige una plantilla por cada profundidad en una sola llamada."""
+        if not self.es_ponderado(seccion):
+            plantillas = getattr(self, seccion)
+            return [rng.choice(plantillas) for _ in profundidades]
+        return self._muestreador(seccion).muestrear_lote(profundidades, rng)
+
+
+def peso_en_profundidad(plantilla, profundidad: float) -> float:
+    """Peso de la plantilla interpolado entre la entrada (0) y el fondo (1)."""
+    if plantilla.peso_profundo is None:
+        return plantilla.peso
+    return plantilla.peso + (plantilla.peso_profundo - plantilla.peso) * profundidad
+
+
+# Equivale al contenido que colocar_contenido usaba de forma fija
+CATALOGO_POR_DEFECTO = Catalogo(
+    monstruos=[
+        PlantillaMonstruo(nombre, 20, 50, 5, 15)
+        for nombre in ["Goblin", "Orco", "Esqueleto", "Zombi", "Araña"]
+    ],
+    jefes=[PlantillaJefe("Señor Oscuro", 50, 100, 15, 30)],
+    tesoros=[
+        PlantillaTesoro(nombre, "Tesoro valioso", 50, 200)
+        for nombre in ["Oro", "Gema", "Espada", "Armadura", "Poción"]
+    ],
+    eventos=[
+        PlantillaEvento("Trampa", "¡Trampa activada!", "trampa", 1, 3),
+        PlantillaEvento("Fuente", "Agua cristalina", "curacion", 2, 5),
+        PlantillaEvento("Portal", "Te absorbe", "teletransporte"),
+        PlantillaEvento("Altar", "Aumenta fuerza", "bonificacion", 1, 3),
+    ],
+)
+
+# Catálogos ya cargados en este proceso: ruta -> (mtime_ns, tamaño, catálogo)
+_catalogos_en_memoria: dict[str, tuple[int, int, Catalogo]] = {}
+
+
+def _pesos(entrada: dict) -> dict:
+    """Lee `peso` como número o como [entrada, fondo]."""
+    peso = entrada.get("peso", 1.0)
+    if isinstance(peso, (list, tuple)):
+        inicio, fondo = _rango_real(peso, "peso")
+        return {"peso": inicio, "peso_profundo": fondo}
+    return {"peso": float(peso)}
+
+
+def _rango_real(valor, nombre_campo: str) -> tuple[float, float]:
+    if len(valor) != 2:
+        raise ValueError(f"'{nombre_campo}' debe ser un número o [min, max]")
+    return float(valor[0]), float(valor[1])
+
+
+def _rango(valor, nombre_campo: str) -> tuple[int, int]:
+    """Acepta un número o una lista [min, max]."""
+    if isinstance(valor, (int, float)):
+        return int(valor), int(valor)
+    if isinstance(valor, (list, tuple)) and len(valor) == 2:
+        return int(valor[0]), int(valor[1])
+    raise ValueError(f"'{nombre_campo}' debe ser un número o [min, max]")
+
+
+def compilar_catalogo(datos: Optional[dict]) -> Catalogo:
+    """Convierte el YAML ya parseado en un Catalogo. Las secciones ausentes usan el catálogo por defecto."""
+    datos = datos or {}
+    catalogo = Catalogo()
+
+    for entrada in datos.get("monstruos") or []:
+        vida_min, vida_max = _rango(entrada["vida"], "vida")
+        dano_min, dano_max = _rango(entrada["dano"], "dano")
+        catalogo.monstruos.append(PlantillaMonstruo(
+            nombre=entrada["nombre"], vida_min=vida_min, vida_max=vida_max,
+            dano_min=dano_min, dano_max=dano_max, **_pesos(entrada)
+        ))
+    for entrada in datos.get("jefes") or []:
+        vida_min, vida_max = _rango(entrada["vida"], "vida")
+        dano_min, dano_max = _rango(entrada["dano"], "dano")
+        recompensa = entrada.get("recompensa") or {}
+        catalogo.jefes.append(PlantillaJefe(
+            nombre=entrada["nombre"], vida_min=vida_min, vida_max=vida_max,
+            dano_min=dano_min, dano_max=dano_max, **_pesos(entrada),
+            recompensa_nombre=recompensa.get("nombre", "Corona del Conquistador"),
+            recompensa_descripcion=recompensa.get("descripcion", "Victoria"),
+            recompensa_valor=int(recompensa.get("valor", 1000)),
+        ))
+    for entrada in datos.get("tesoros") or []:
+        valor_min, valor_max = _rango(entrada["valor"], "valor")
+        catalogo.tesoros.append(PlantillaTesoro(
+            nombre=entrada["nombre"], descripcion=entrada.get("descripcion", "Tesoro valioso"),
+            valor_min=valor_min, valor_max=valor_max, **_pesos(entrada)
+        ))
+    for entrada in datos.get("eventos") or []:
+        valor_min, valor_max = _rango(entrada.get("valor", 0), "valor")
+        catalogo.eventos.append(PlantillaEvento(
+            nombre=entrada["nombre"], descripcion=entrada.get("descripcion", ""),
+            efecto=entrada["efecto"], valor_min=valor_min, valor_max=valor_max,
+            **_pesos(entrada)
+        ))
+
+    for seccion in SECCIONES:
+        if not getattr(catalogo, seccion):
+            setattr(catalogo, seccion, list(getattr(CATALOGO_POR_DEFECTO, seccion)))
+    return catalogo
+
+
+def _parsear_yaml(contenido: bytes) -> Optional[dict]:
+    import yaml
+    cargador = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(contenido, Loader=cargador)
+
+
+def ruta_cache(archivo: str) -> str:
+    """Ruta del catálogo compilado: `.nombre.yaml.cache` junto al YAML."""
+    directorio, nombre = os.path.split(os.path.abspath(archivo))
+    return os.path.join(directorio, f".{nombre}.cache")
+
+
+def cargar_catalogo(archivo: str, usar_cache: bool = True) -> Catalogo:
+    """
+    Carga un catálogo desde YAML.
+
+    Se reutiliza la versión compilada si la fecha de modificación y el tamaño
+    coinciden o, si no coinciden, si el hash SHA-256 del contenido es el mismo.
+    Lanza FileNotFoundError si el archivo no existe.
+    """
+    # Importaciones diferidas: mapa.py importa este módulo y no debe
+    # encarecer el arranque cuando no se usan catálogos YAML
+    import hashlib
+    import pickle
+    
+    ruta = os.path.abspath(archivo)
+    info = os.stat(ruta)
+
+    en_memoria = _catalogos_en_memoria.get(ruta)
+    if usar_cache and en_memoria and en_memoria[:2] == (info.st_mtime_ns, info.st_size):
+        return en_memoria[2]
+
+    cache = ruta_cache(ruta)
+    guardado = None
+    if usar_cache:
+        try:
+            with open(cache, "rb") as f:
+                guardado = pickle.load(f)
+            if guardado[0] != VERSION_CACHE:
+                guardado = None
+        except (OSError, pickle.UnpicklingError, EOFError, IndexError, TypeError, AttributeError):
+            guardado = None
+
+    catalogo = None
+    resumen = None
+    if guardado and guardado[1:3] == (info.st_mtime_ns, info.st_size):
+        catalogo = guardado[4]
+    else:
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        resumen = hashlib.sha256(contenido).hexdigest()
+        if guardado and guardado[3] == resumen:
+            catalogo = guardado[4]  # Solo cambió la fecha
+        else:
+            catalogo = compilar_catalogo(_parsear_yaml(contenido))
+
+        if usar_cache:
+            try:
+                temporal = f"{cache}.{os.getpid()}.tmp"
+                with open(temporal, "wb") as f:
+                    pickle.dump((VERSION_CACHE, info.st_mtime_ns, info.st_size, resumen, catalogo),
+                                f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporal, cache)
+            except OSError:
+                pass  # Directorio de solo lectura: se trabaja sin caché en disco
+
+    _catalogos_en_memoria[ruta] = (info.st_mtime_ns, info.st_size, catalogo)
+    return catalogo
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 import random
+from .metricas import medir, contar
 
 if TYPE_CHECKING:
     from .explorador import Explorador
@@ -55,6 +56,7 @@ class Monstruo(ContenidoHabitacion):
     def tipo(self) -> str:
         return "Monstruo"
 
+    @medir("combate.monstruo")
     def interactuar(self, explorador: "Explorador") -> str:
         resultado = [f"¡Te enfrentas a {self.nombre}!"]
         
@@ -72,8 +74,10 @@ class Monstruo(ContenidoHabitacion):
         if self.vida <= 0:
             explorador.mapa.habitaciones[explorador.posicion].contenido = None
             resultado.append(f"¡Derrotaste a {self.nombre}!")
+            contar("combate.victorias")
         elif not explorador.esta_vivo:
             resultado.append(f"Fuiste derrotado por {self.nombre}.")
+            contar("combate.derrotas")
         
         return "\n".join(resultado)
 
@@ -89,6 +93,7 @@ class Jefe(Monstruo):
     def tipo(self) -> str:
         return "Jefe Final"
 
+    @medir("combate.jefe")
     def interactuar(self, explorador: "Explorador") -> str:
         resultado = [f"¡¡¡BATALLA CONTRA {self.nombre.upper()}!!!"]
         
@@ -109,8 +114,10 @@ class Jefe(Monstruo):
             if self.recompensa_especial:
                 explorador.inventario.append(self.recompensa_especial)
                 resultado.append(f"¡Obtuviste: {self.recompensa_especial.nombre}!")
+            contar("combate.victorias")
         elif not explorador.esta_vivo:
             resultado.append(f"Caíste ante {self.nombre}.")
+            contar("combate.derrotas")
         
         return "\n".join(resultado)
 
@@ -131,6 +138,7 @@ class Evento(ContenidoHabitacion):
 
     def interactuar(self, explorador: "Explorador") -> str:
         resultado = [f"¡Evento: {self.nombre_evento}!", self.descripcion_evento]
+        habitacion_evento = explorador.mapa.habitaciones[explorador.posicion]
         
         if self.efecto == "trampa":
             explorador.recibir_dano(self.valor_efecto)
@@ -148,5 +156,6 @@ class Evento(ContenidoHabitacion):
             explorador.dano += self.valor_efecto
             resultado.append(f"Daño aumentado en {self.valor_efecto}. Actual: {explorador.dano}")
         
-        explorador.mapa.habitaciones[explorador.posicion].contenido = None
+        # Se vacía la habitación del evento, no la de destino del teletransporte
+        habitacion_evento.contenido = None
         return "\n".join(resultado)
@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from .mapa import Mapa
     from .models import Objeto
+    from .visitas import RegistroVisitas
 
 @dataclass
 class Explorador:
@@ -12,6 +13,20 @@ class Explorador:
     posicion: tuple[int, int] = (0, 0)
     mapa: "Mapa" = None
     dano: int = 10
+    visitas: Optional["RegistroVisitas"] = None
+
+    def ha_visitado(self, hab) -> bool:
+        """Usa el registro de visitas propio si existe; si no, el indicador global del mapa."""
+        if self.visitas is not None:
+            return hab.id in self.visitas
+        return hab.visitada
+
+    def marcar_visita(self, hab):
+        """Marca la habitación como visitada por este explorador."""
+        if self.visitas is not None:
+            self.visitas.marcar(hab.id)
+        else:
+            hab.visitada = True
 
     def mover(self, direccion: str) -> bool:
         if direccion not in ['norte', 'sur', 'este', 'oeste']:
@@ -23,7 +38,9 @@ class Explorador:
         if direccion in hab_actual.conexiones:
             nueva_hab = hab_actual.conexiones[direccion]
             self.posicion = (nueva_hab.x, nueva_hab.y)
-            nueva_hab.visitada = True
+            self.marcar_visita(nueva_hab)
+            self.mapa.notificar_cambio((hab_actual.x, hab_actual.y))
+            self.mapa.notificar_cambio(self.posicion)
             return True
         return False
 
@@ -32,10 +49,22 @@ class Explorador:
             return "Error: posición inválida"
         
         hab_actual = self.mapa.habitaciones[self.posicion]
-        hab_actual.visitada = True
+        self.marcar_visita(hab_actual)
+        pos_inicial = self.posicion
         
-        if hab_actual.contenido:
-            return hab_actual.contenido.interactuar(self)
+        # En un mapa concurrente el cerrojo de la habitación hace que solo un
+        # explorador a la vez combata o recoja su contenido
+        with self.mapa.cerrojo(pos_inicial):
+            contenido = self.mapa.tomar_contenido(pos_inicial)
+            resultado = contenido.interactuar(self) if contenido else None
+        if contenido:
+            self.mapa.version += 1
+            # El contenido puede vaciar la habitación o teletransportarnos
+            self.mapa.notificar_cambio(pos_inicial)
+            if self.posicion != pos_inicial:
+                self.mapa.notificar_cambio(self.posicion)
+            return resultado
+        self.mapa.notificar_cambio(pos_inicial)
         return "La habitación está vacía."
 
     def obtener_habitaciones_adyacentes(self) -> list[str]:
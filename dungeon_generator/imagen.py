@@ -0,0 +1,131 @@
+"""Exportación del mapa a imagen PNG usando solo zlib y struct."""
+
+import struct
+import zlib
+from typing import TYPE_CHECKING, BinaryIO, Union
+
+if TYPE_CHECKING:
+    from .mapa import Mapa
+    from .explorador import Explorador
+
+# Colores RGB
+COLOR_FONDO = (20, 20, 28)
+COLOR_HABITACION = (90, 90, 100)
+COLOR_VISITADA = (150, 150, 160)
+COLOR_PASILLO = (130, 130, 140)
+COLOR_ENTRADA = (60, 200, 90)
+COLOR_EXPLORADOR = (255, 230, 60)
+COLORES_CONTENIDO = {
+    "Jefe Final": (200, 20, 40),
+    "Monstruo": (230, 90, 70),
+    "Cofre del Tesoro": (240, 200, 40),
+    "Evento": (200, 80, 220),
+}
+
+FIRMA_PNG = b"\x89PNG\r\n\x1a\n"
+TAMANO_IDAT = 1 << 16
+
+
+def _chunk(tipo: bytes, datos: bytes) -> bytes:
+    """Construye un chunk PNG (longitud, tipo, datos, CRC)."""
+    return (struct.pack(">I", len(datos)) + tipo + datos
+            + struct.pack(">I", zlib.crc32(tipo + datos) & 0xFFFFFFFF))
+
+
+def _color_habitacion(hab, explorador: "Explorador" = None) -> tuple[int, int, int]:
+    if explorador and explorador.posicion == (hab.x, hab.y):
+        return COLOR_EXPLORADOR
+    if hab.inicial:
+        return COLOR_ENTRADA
+    if hab.contenido:
+        return COLORES_CONTENIDO.get(hab.contenido.tipo, COLOR_HABITACION)
+    visitada = explorador.ha_visitado(hab) if explorador else hab.visitada
+    return COLOR_VISITADA if visitada else COLOR_HABITACION
+
+
+def _filas_celda(mapa: "Mapa", habitaciones: list, tam_celda: int, explorador: "Explorador" = None):
+    """
+    Genera las líneas de píxeles de una fila de celdas del mapa a partir de
+    las habitaciones de esa fila.
+
+    Cada celda ocupa `tam_celda` píxeles: la habitación ocupa el cuadrado
+    superior izquierdo y la última columna/fila se reserva para los pasillos
+    hacia el este y el sur.
+    """
+    lado = tam_celda - 1
+    ancho_px = mapa.ancho * tam_celda
+    fondo = bytes(COLOR_FONDO) * ancho_px
+    cuerpo = bytearray(fondo)
+    pasillo_sur = bytearray(fondo)
+    pasillo = bytes(COLOR_PASILLO)
+    inicio_pasillo = lado // 2 if lado > 2 else 0
+    fin_pasillo = lado - inicio_pasillo
+
+    filas_con_pasillo_este = range(inicio_pasillo, fin_pasillo)
+    este = []
+
+    for hab in habitaciones:
+        px = hab.x * tam_celda * 3
+        cuerpo[px:px + lado * 3] = bytes(_color_habitacion(hab, explorador)) * lado
+        if "este" in hab.conexiones:
+            este.append(px + lado * 3)
+        if "sur" in hab.conexiones:
+            inicio = px + inicio_pasillo * 3
+            pasillo_sur[inicio:inicio + (fin_pasillo - inicio_pasillo) * 3] = (
+                pasillo * (fin_pasillo - inicio_pasillo)
+            )
+
+    con_pasillo = bytearray(cuerpo)
+    for px in este:
+        con_pasillo[px:px + 3] = pasillo
+
+    for fila in range(lado):
+        yield con_pasillo if fila in filas_con_pasillo_este else cuerpo
+    yield pasillo_sur
+
+
+def exportar_mapa_png(
+    mapa: "Mapa",
+    destino: Union[str, BinaryIO],
+    tam_celda: int = 4,
+    explorador: "Explorador" = None,
+    nivel: int = 6
+) -> tuple[int, int]:
+    """
+    Dibuja el mapa (habitaciones, pasillos y contenido) en un PNG.
+
+    Las líneas de píxeles se generan y comprimen fila a fila, por lo que la
+    memoria usada depende del ancho del mapa y no de su tamaño total.
+    Retorna las dimensiones de la imagen en píxeles.
+    """
+    if tam_celda < 2:
+        raise ValueError("tam_celda debe ser al menos 2")
+
+    ancho_px = mapa.ancho * tam_celda
+    alto_px = mapa.alto * tam_celda
+
+    if isinstance(destino, str):
+        with open(destino, "wb") as f:
+            return exportar_mapa_png(mapa, f, tam_celda, explorador, nivel)
+
+    destino.write(FIRMA_PNG)
+    destino.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", ancho_px, alto_px, 8, 2, 0, 0, 0)))
+
+    # Índice de habitaciones por fila: solo referencias, sin píxeles
+    por_fila: dict[int, list] = {}
+    for hab in mapa.habitaciones.values():
+        por_fila.setdefault(hab.y, []).append(hab)
+
+    compresor = zlib.compressobj(nivel)
+    pendiente = bytearray()
+    for y in range(mapa.alto):
+        for linea in _filas_celda(mapa, por_fila.get(y, []), tam_celda, explorador):
+            pendiente += compresor.compress(b"\x00" + linea)
+            if len(pendiente) >= TAMANO_IDAT:
+                destino.write(_chunk(b"IDAT", bytes(pendiente)))
+                pendiente.clear()
+    pendiente += compresor.flush()
+    destino.write(_chunk(b"IDAT", bytes(pendiente)))
+    destino.write(_chunk(b"IEND", b""))
+
+    return ancho_px, alto_px
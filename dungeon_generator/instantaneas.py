@@ -0,0 +1,100 @@
+"""
+Instantáneas baratas del estado de juego para probar jugadas y descartarlas.
+
+Una `Simulacion` copia un explorador sobre un `MapaJugador` (una capa de
+cambios sobre su mapa, que no se modifica) y permite:
+
+- `instantanea()`: captura el estado en O(1). El mapa congela su capa de
+  cambios y del explorador se guardan sus valores, el inventario y el punto
+  del diario de visitas.
+- `restaurar(inst)`: vuelve a ese estado en tiempo proporcional a los
+  cambios hechos desde entonces.
+- `ramificar(inst)`: otra simulación que parte de ese estado y comparte con
+  esta las capas congeladas.
+
+    simulacion = Simulacion(explorador)
+    antes = simulacion.instantanea()
+    simulacion.explorador.explorar_habitacion()   # combate de prueba
+    gano = simulacion.explorador.esta_vivo
+    simulacion.restaurar(antes)
+
+El mapa original no debe cambiar mientras dure la simulación: las capas solo
+guardan diferencias respecto a él.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+from .explorador import Explorador
+from .plantilla import EstadoJugador, MapaJugador
+
+if TYPE_CHECKING:
+    from .models import Objeto
+
+
+@dataclass(frozen=True)
+class Instantanea:
+    """Estado capturado de una simulación."""
+    capa: EstadoJugador
+    vida: int
+    dano: int
+    posicion: tuple[int, int]
+    # El inventario solo crece durante la partida y tiene pocas decenas de objetos
+    inventario: tuple["Objeto", ...]
+    visitas: Optional[tuple] = None
+
+
+class Simulacion:
+    """Copia de un explorador y su mapa con instantáneas, vuelta atrás y ramas."""
+
+    def __init__(self, explorador: Explorador, _capa: Optional[EstadoJugador] = None):
+        mapa = explorador.mapa
+        if isinstance(mapa, MapaJugador):
+            plantilla = mapa.plantilla
+            if _capa is None:
+                _capa = mapa.instantanea()
+        else:
+            plantilla = mapa
+        self.mapa = MapaJugador.desde_plantilla(plantilla, _capa)
+
+        visitas = None
+        if explorador.visitas is not None:
+            visitas = explorador.visitas.copiar()
+            visitas.activar_diario()
+        self.explorador = Explorador(
+            vida=explorador.vida,
+            inventario=list(explorador.inventario),
+            posicion=explorador.posicion,
+            mapa=self.mapa,
+            dano=explorador.dano,
+            visitas=visitas,
+        )
+
+    def instantanea(self) -> Instantanea:
+        explorador = self.explorador
+        return Instantanea(
+            capa=self.mapa.instantanea(),
+            vida=explorador.vida,
+            dano=explorador.dano,
+            posicion=explorador.posicion,
+            inventario=tuple(explorador.inventario),
+            visitas=explorador.visitas.diario if explorador.visitas is not None else None,
+        )
+
+    def restaurar(self, instantanea: Instantanea):
+        """Vuelve al estado de `instantanea` (de esta simulación o de una de sus ramas)."""
+        self.mapa.restaurar(instantanea.capa)
+        explorador = self.explorador
+        explorador.vida = instantanea.vida
+        explorador.dano = instantanea.dano
+        explorador.posicion = instantanea.posicion
+        explorador.inventario[:] = instantanea.inventario
+        if explorador.visitas is not None and instantanea.visitas is not None:
+            explorador.visitas.volver_a(instantanea.visitas)
+
+    def ramificar(self, instantanea: Optional[Instantanea] = None) -> "Simulacion":
+        """Simulación independiente que parte de `instantanea` (por defecto, del estado actual)."""
+        if instantanea is None:
+            instantanea = self.instantanea()
+        rama = Simulacion(self.explorador, instantanea.capa)
+        rama.restaurar(instantanea)
+        return rama
@@ -0,0 +1,183 @@
+"""Generación de dungeons por lotes, sin interfaz, usando varios procesos."""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+from .mapa import Mapa
+from .explorador import Explorador
+from .serializacion import guardar_partida
+from .catalogo import cargar_catalogo
+from .utils import verificar_conectividad_mapa, exportar_mapa_texto, calcular_percentil
+
+if TYPE_CHECKING:
+    from .cache_mapas import CacheMapas
+
+FORMATOS = ("json", "json.gz", "txt", "png")
+
+
+@dataclass
+class ResultadoMapa:
+    """Resultado de generar un único mapa del lote."""
+    indice: int
+    semilla: int
+    archivo: Optional[str]
+    habitaciones: int
+    conectado: bool
+    segundos: float
+    error: Optional[str] = None
+    desde_cache: bool = False
+
+
+@dataclass
+class ResumenLote:
+    """Estadísticas agregadas de un lote."""
+    resultados: list[ResultadoMapa] = field(default_factory=list)
+    segundos_totales: float = 0.0
+
+    @property
+    def correctos(self) -> int:
+        return sum(1 for r in self.resultados if r.error is None and r.conectado)
+
+    @property
+    def aciertos_cache(self) -> int:
+        return sum(1 for r in self.resultados if r.desde_cache)
+
+    @property
+    def mapas_por_segundo(self) -> float:
+        if self.segundos_totales == 0:
+            return 0.0
+        return len(self.resultados) / self.segundos_totales
+
+    def percentil(self, p: float) -> float:
+        """Latencia (segundos por mapa) en el percentil `p` (0-100)."""
+        return calcular_percentil([r.segundos for r in self.resultados], p)
+
+    def reporte(self, con_cache: bool = False) -> str:
+        lineas = [
+            f"Mapas generados: {len(self.resultados)} ({self.correctos} válidos)",
+            f"Tiempo total: {self.segundos_totales:.2f} s",
+            f"Rendimiento: {self.mapas_por_segundo:.2f} mapas/s",
+            "Latencia por mapa: " + ", ".join(
+                f"p{p}={self.percentil(p) * 1000:.1f} ms" for p in (50, 90, 99)
+            ) + f", máx={self.percentil(100) * 1000:.1f} ms",
+        ]
+        if con_cache and self.resultados:
+            lineas.append(f"Caché: {self.aciertos_cache}/{len(self.resultados)} aciertos "
+                          f"({self.aciertos_cache * 100 / len(self.resultados):.0f}%)")
+        return "\n".join(lineas)
+
+
+def generar_mapa(ancho: int, alto: int, n_habitaciones: int, semilla: int,
+                 catalogo: Optional[str] = None, motor: str = "caminata") -> Mapa:
+    """
+    Genera un mapa completo (estructura y contenido) de forma reproducible.
+    `catalogo` es la ruta opcional de un catálogo YAML de contenido y `motor`
+    el algoritmo de estructura (ver motores.py).
+    """
+    random.seed(semilla)
+    mapa = Mapa(ancho=ancho, alto=alto)
+    resultado = mapa.generar_estructura(n_habitaciones, motor)
+    if resultado.startswith("Error"):
+        raise ValueError(resultado)
+    resultado = mapa.colocar_contenido(cargar_catalogo(catalogo) if catalogo else None)
+    if resultado.startswith("Error"):
+        raise ValueError(resultado)
+    return mapa
+
+
+# Una caché por directorio y proceso: se reutiliza entre los trabajos del pool
+_caches: dict[str, "CacheMapas"] = {}
+
+
+def _cache_de(directorio: str) -> "CacheMapas":
+    cache_mapas = _caches.get(directorio)
+    if cache_mapas is None:
+        from .cache_mapas import CacheMapas
+        cache_mapas = _caches[directorio] = CacheMapas(directorio)
+    return cache_mapas
+
+
+def _trabajo(ancho: int, alto: int, n_habitaciones: int, semilla: int, indice: int,
+             salida: Optional[str], formato: str, catalogo: Optional[str] = None,
+             motor: str = "caminata", cache: Optional[str] = None) -> ResultadoMapa:
+    """
+    Genera, valida y exporta un mapa. Se ejecuta en un proceso del pool.
+    Con `cache` (un directorio) el mapa se lee de la caché si ya se generó.
+    """
+    inicio = time.perf_counter()
+    archivo = None
+    desde_cache = False
+    try:
+        if cache:
+            cache_mapas = _cache_de(cache)
+            aciertos = cache_mapas.aciertos
+            mapa = cache_mapas.obtener(ancho, alto, n_habitaciones, semilla, motor, catalogo)
+            desde_cache = cache_mapas.aciertos > aciertos
+        else:
+            mapa = generar_mapa(ancho, alto, n_habitaciones, semilla, catalogo, motor)
+        conectado = verificar_conectividad_mapa(mapa)
+        if salida:
+            archivo = os.path.join(salida, f"dungeon_{indice:06d}.{formato}")
+            if formato == "txt":
+                exportar_mapa_texto(mapa, archivo, compacto=True)
+            elif formato == "png":
+                from .imagen import exportar_mapa_png
+                exportar_mapa_png(mapa, archivo)
+            else:
+                explorador = Explorador(mapa=mapa)
+                explorador.posicion = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+                mapa.habitacion_inicial.visitada = True
+                guardar_partida(explorador, archivo)
+        return ResultadoMapa(indice, semilla, archivo, len(mapa.habitaciones),
+                             conectado, time.perf_counter() - inicio, desde_cache=desde_cache)
+    except Exception as e:
+        return ResultadoMapa(indice, semilla, archivo, 0, False,
+                             time.perf_counter() - inicio, error=str(e))
+
+
+def _trabajo_tupla(argumentos: tuple) -> ResultadoMapa:
+    return _trabajo(*argumentos)
+
+
+def generar_lote(
+    ancho: int,
+    alto: int,
+    n_habitaciones: int,
+    cantidad: int,
+    semilla: int = 0,
+    procesos: int = 1,
+    salida: Optional[str] = None,
+    formato: str = "json.gz",
+    catalogo: Optional[str] = None,
+    motor: str = "caminata",
+    cache: Optional[str] = None
+) -> ResumenLote:
+    """
+    Genera `cantidad` mapas con semillas consecutivas a partir de `semilla`.
+    Con `procesos` > 1 el trabajo se reparte en un pool de procesos, que
+    pueden compartir el mismo directorio de `cache`.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato}. Opciones: {', '.join(FORMATOS)}")
+    if salida:
+        os.makedirs(salida, exist_ok=True)
+
+    argumentos = [
+        (ancho, alto, n_habitaciones, semilla + i, i, salida, formato, catalogo, motor, cache)
+        for i in range(cantidad)
+    ]
+    resumen = ResumenLote()
+    inicio = time.perf_counter()
+    if procesos <= 1:
+        resumen.resultados = [_trabajo(*args) for args in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resumen.resultados = list(pool.map(
+                _trabajo_tupla, argumentos,
+                chunksize=max(1, cantidad // (procesos * 4))
+            ))
+    resumen.segundos_totales = time.perf_counter() - inicio
+    return resumen
@@ -1,11 +1,24 @@
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Callable, Optional
 import random
 from .models import Habitacion, Objeto
 from .contenido import Tesoro, Monstruo, Jefe, Evento
+from .catalogo import Catalogo, CATALOGO_POR_DEFECTO
+from .metricas import medir
 
 DIRECCIONES = {"norte": (0, -1), "sur": (0, 1), "este": (1, 0), "oeste": (-1, 0)}
 OPUESTO = {"norte": "sur", "sur": "norte", "este": "oeste", "oeste": "este"}
+N_CERROJOS_POR_DEFECTO = 256
+# Subir cuando un cambio en generar_estructura, los motores o colocar_contenido
+# produzca mapas distintos con la misma semilla (invalida las cachés en disco)
+VERSION_GENERADOR = 1
+_SIN_CERROJO = nullcontext()
+
+
+def _escalar(minimo: int, maximo: int, factor: float) -> int:
+    """Interpola un valor entre `minimo` y `maximo` según la lejanía (0-1)."""
+    return int(minimo + (maximo - minimo) * factor)
 
 @dataclass
 class Mapa:
@@ -13,68 +26,159 @@ class Mapa:
     alto: int
     habitaciones: dict[tuple[int, int], Habitacion] = field(default_factory=dict)
     habitacion_inicial: Optional[Habitacion] = None
+    observadores: list[Callable[[tuple[int, int]], None]] = field(
+        default_factory=list, repr=False, compare=False
+    )
+    cerrojos: list = field(default_factory=list, repr=False, compare=False)
+    # Aumenta con cada cambio de estructura o contenido (clave de cachés)
+    version: int = field(default=0, repr=False, compare=False)
+
+    def registrar_observador(self, callback: Callable[[tuple[int, int]], None]):
+        """Registra una función a la que se avisa cuando cambia una habitación."""
+        self.observadores.append(callback)
+
+    def eliminar_observador(self, callback: Callable[[tuple[int, int]], None]):
+        """Deja de avisar a `callback` (no hace nada si no estaba registrado)."""
+        try:
+            self.observadores.remove(callback)
+        except ValueError:
+            pass
+
+    def notificar_cambio(self, pos: tuple[int, int]):
+        """Avisa a los observadores de que la habitación en `pos` cambió."""
+        for callback in self.observadores:
+            callback(pos)
+
+    @property
+    def concurrente(self) -> bool:
+        return bool(self.cerrojos)
+
+    def activar_concurrencia(self, n_cerrojos: int = N_CERROJOS_POR_DEFECTO):
+        """
+        Permite que varios hilos exploren el mapa a la vez. Cada habitación
+        queda protegida por uno de `n_cerrojos` cerrojos (repartidos por
+        posición) que se toma al interactuar con su contenido y al abrir o
+        cerrar pasillos. Cada Explorador debe usarse desde un solo hilo, y la
+        estructura no se puede regenerar mientras haya hilos explorando.
+        """
+        import threading
+
+        if not self.cerrojos:
+            self.cerrojos = [threading.Lock() for _ in range(max(1, n_cerrojos))]
 
-    def generar_estructura(self, n_habitaciones: int) -> str:
+    def cerrojo(self, pos: tuple[int, int]):
+        """Cerrojo de la habitación en `pos` (un contexto vacío si el mapa no es concurrente)."""
+        if not self.cerrojos:
+            return _SIN_CERROJO
+        return self.cerrojos[hash(pos) % len(self.cerrojos)]
+
+    def _cerrojos_de(self, *posiciones: tuple[int, int]) -> list:
+        """Cerrojos distintos de varias habitaciones, en un orden fijo para evitar bloqueos mutuos."""
+        if not self.cerrojos:
+            return []
+        n = len(self.cerrojos)
+        return [self.cerrojos[i] for i in sorted({hash(pos) % n for pos in posiciones})]
+
+    @medir("mapa.generar_estructura")
+    def generar_estructura(self, n_habitaciones: int, motor: str = "caminata",
+                           semilla: Optional[int] = None) -> str:
+        """
+        Genera `n_habitaciones` conectadas con el motor indicado ("caminata",
+        "bsp", "cuevas"; ver motores.py). Con `semilla` el resultado es
+        reproducible sin tocar el generador global de `random`.
+        """
+        from .motores import MOTORES, obtener_motor
+        
         if n_habitaciones < 1 or n_habitaciones > self.ancho * self.alto:
             return f"Error: inválido. Debe ser entre 1 y {self.ancho * self.alto}"
+        generador = obtener_motor(motor)
+        if generador is None:
+            return f"Error: motor desconocido '{motor}'. Opciones: {', '.join(MOTORES)}"
         
         self.habitaciones.clear()
         self.habitacion_inicial = None
-        
-        lado = random.choice(['norte', 'sur', 'este', 'oeste'])
-        if lado == 'norte':
-            x_inicial, y_inicial = random.randint(0, self.ancho - 1), 0
-        elif lado == 'sur':
-            x_inicial, y_inicial = random.randint(0, self.ancho - 1), self.alto - 1
-        elif lado == 'este':
-            x_inicial, y_inicial = self.ancho - 1, random.randint(0, self.alto - 1)
-        else:
-            x_inicial, y_inicial = 0, random.randint(0, self.alto - 1)
-        
-        self.habitacion_inicial = Habitacion(
-            id=0, x=x_inicial, y=y_inicial, inicial=True
-        )
-        self.habitaciones[(x_inicial, y_inicial)] = self.habitacion_inicial
-        
-        id_hab = 1
-        sin_progreso = 0
-        
-        while len(self.habitaciones) < n_habitaciones:
-            pos_actual = random.choice(list(self.habitaciones.keys()))
-            x_actual, y_actual = pos_actual
-            direcciones = list(DIRECCIONES.keys())
-            random.shuffle(direcciones)
-            
-            creada = False
-            for direccion in direcciones:
-                dx, dy = DIRECCIONES[direccion]
-                nx, ny = x_actual + dx, y_actual + dy
-                
-                if 0 <= nx < self.ancho and 0 <= ny < self.alto:
-                    if (nx, ny) not in self.habitaciones:
-                        nueva = Habitacion(id=id_hab, x=nx, y=ny)
-                        self.habitaciones[(nx, ny)] = nueva
-                        
-                        hab_act = self.habitaciones[pos_actual]
-                        hab_act.conexiones[direccion] = nueva
-                        nueva.conexiones[OPUESTO[direccion]] = hab_act
-                        
-                        id_hab += 1
-                        creada = True
-                        sin_progreso = 0
-                        break
-            
-            if not creada:
-                sin_progreso += 1
-                if sin_progreso > 20:
-                    return "Error: no se pudo generar"
-        
-        return "Estructura generada con éxito."
+        self.version += 1
+        rng = random if semilla is None else random.Random(semilla)
+        return generador.generar(self, n_habitaciones, rng)
+
+    def tomar_contenido(self, pos: tuple[int, int]):
+        """
+        Retorna el contenido de la habitación en `pos` para interactuar con él
+        (el contenido puede modificarse durante la interacción).
+        """
+        hab = self.habitaciones.get(pos)
+        return hab.contenido if hab else None
+
+    def reclamar_contenido(self, pos: tuple[int, int]):
+        """
+        Retira el contenido de la habitación y lo retorna de forma atómica:
+        si varios hilos lo reclaman a la vez, solo uno lo recibe.
+        """
+        if pos not in self.habitaciones:
+            return None
+        with self.cerrojo(pos):
+            contenido = self.tomar_contenido(pos)
+            if contenido is not None:
+                self.habitaciones[pos].contenido = None
+                self.version += 1
+        if contenido is not None:
+            self.notificar_cambio(pos)
+        return contenido
+
+    def conectar(self, pos: tuple[int, int], direccion: str) -> str:
+        """Abre un pasillo (en ambos sentidos) entre `pos` y su vecina en `direccion`."""
+        if direccion not in DIRECCIONES:
+            return f"Error: dirección desconocida '{direccion}'"
+        dx, dy = DIRECCIONES[direccion]
+        destino = (pos[0] + dx, pos[1] + dy)
+        hab, vecina = self.habitaciones.get(pos), self.habitaciones.get(destino)
+        if hab is None or vecina is None:
+            return "Error: no hay habitación a ambos lados"
+        cerrojos = self._cerrojos_de(pos, destino)
+        for cerrojo in cerrojos:
+            cerrojo.acquire()
+        try:
+            hab.conexiones[direccion] = vecina
+            vecina.conexiones[OPUESTO[direccion]] = hab
+            self.version += 1
+        finally:
+            for cerrojo in reversed(cerrojos):
+                cerrojo.release()
+        self.notificar_cambio(pos)
+        self.notificar_cambio(destino)
+        return f"Pasillo abierto hacia el {direccion}"
+
+    def desconectar(self, pos: tuple[int, int], direccion: str) -> str:
+        """Cierra el pasillo (en ambos sentidos) de `pos` en `direccion`."""
+        hab = self.habitaciones.get(pos)
+        vecina = hab.conexiones.get(direccion) if hab else None
+        if vecina is None:
+            return "Error: no hay pasillo en esa dirección"
+        cerrojos = self._cerrojos_de(pos, (vecina.x, vecina.y))
+        for cerrojo in cerrojos:
+            cerrojo.acquire()
+        try:
+            hab.conexiones.pop(direccion, None)
+            vecina.conexiones.pop(OPUESTO[direccion], None)
+            self.version += 1
+        finally:
+            for cerrojo in reversed(cerrojos):
+                cerrojo.release()
+        self.notificar_cambio(pos)
+        self.notificar_cambio((vecina.x, vecina.y))
+        return f"Pasillo cerrado hacia el {direccion}"
 
     def calcular_distancia_manhattan(self, pos1, pos2) -> int:
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
-    def colocar_contenido(self):
+    @medir("mapa.colocar_contenido")
+    def colocar_contenido(self, catalogo: Optional[Catalogo] = None):
+        """
+        Coloca jefe, monstruos, tesoros y eventos. Los nombres y rangos de
+        estadísticas salen del catálogo (por defecto, CATALOGO_POR_DEFECTO).
+        """
+        if catalogo is None:
+            catalogo = CATALOGO_POR_DEFECTO
         if not self.habitacion_inicial:
             return "Error: sin habitación inicial"
         
@@ -83,6 +187,7 @@ class Mapa:
         
         if not hab_disp:
             return "Error: sin habitaciones suficientes"
+        self.version += 1
         
         distancias = {p: self.calcular_distancia_manhattan(pos_inicial, p) for p in hab_disp}
         max_dist = max(distancias.values()) if distancias else 1
@@ -91,12 +196,19 @@ class Mapa:
         hab_disp.remove(pos_jefe)
         
         factor = distancias[pos_jefe] / max_dist if max_dist > 0 else 1
-        vida_jefe = int(50 + 50 * factor)
-        dano_jefe = int(15 + 15 * factor)
         
+        # Con un único jefe no se consume el RNG (mantiene los mapas con semilla)
+        plantilla_jefe = (catalogo.jefes[0] if len(catalogo.jefes) == 1
+                          else catalogo.elegir("jefes", factor))
         self.habitaciones[pos_jefe].contenido = Jefe(
-            id=9999, nombre="Señor Oscuro", vida=vida_jefe, dano=dano_jefe,
-            recompensa_especial=Objeto("Corona del Conquistador", "Victoria", 1000)
+            id=9999, nombre=plantilla_jefe.nombre,
+            vida=_escalar(plantilla_jefe.vida_min, plantilla_jefe.vida_max, factor),
+            dano=_escalar(plantilla_jefe.dano_min, plantilla_jefe.dano_max, factor),
+            recompensa_especial=Objeto(
+                plantilla_jefe.recompensa_nombre,
+                plantilla_jefe.recompensa_descripcion,
+                plantilla_jefe.recompensa_valor
+            )
         )
         
         n_rest = len(hab_disp)
@@ -106,40 +218,43 @@ class Mapa:
         
         random.shuffle(hab_disp)
         
-        for i in range(min(n_mons, len(hab_disp))):
-            pos = hab_disp[i]
-            fac = distancias[pos] / max_dist if max_dist > 0 else 0.5
+        def profundidad(pos):
+            return distancias[pos] / max_dist if max_dist > 0 else 0.5
+        
+        # Monstruos y tesoros se eligen en lote (tablas de alias si hay pesos)
+        pos_mons = hab_disp[:min(n_mons, len(hab_disp))]
+        fac_mons = [profundidad(pos) for pos in pos_mons]
+        plantillas = catalogo.elegir_lote("monstruos", fac_mons)
+        for i, (pos, fac, plantilla) in enumerate(zip(pos_mons, fac_mons, plantillas)):
             self.habitaciones[pos].contenido = Monstruo(
                 id=1000+i,
-                nombre=random.choice(["Goblin","Orco","Esqueleto","Zombi","Araña"]),
-                vida=int(20+30*fac), dano=int(5+10*fac)
+                nombre=plantilla.nombre,
+                vida=_escalar(plantilla.vida_min, plantilla.vida_max, fac),
+                dano=_escalar(plantilla.dano_min, plantilla.dano_max, fac)
             )
         
-        for i in range(n_mons, min(n_mons+n_tes, len(hab_disp))):
-            pos = hab_disp[i]
-            fac = distancias[pos] / max_dist if max_dist > 0 else 0.5
+        pos_tes = hab_disp[n_mons:min(n_mons+n_tes, len(hab_disp))]
+        fac_tes = [profundidad(pos) for pos in pos_tes]
+        plantillas = catalogo.elegir_lote("tesoros", fac_tes)
+        for pos, fac, plantilla in zip(pos_tes, fac_tes, plantillas):
             self.habitaciones[pos].contenido = Tesoro(
                 recompensa=Objeto(
-                    random.choice(["Oro","Gema","Espada","Armadura","Poción"]),
-                    "Tesoro valioso", int(50+150*fac)
+                    plantilla.nombre, plantilla.descripcion,
+                    _escalar(plantilla.valor_min, plantilla.valor_max, fac)
                 )
             )
         
         inicio_ev = n_mons + n_tes
         for i in range(inicio_ev, min(inicio_ev+n_ev, len(hab_disp))):
             pos = hab_disp[i]
-            tipo = random.choice(['trampa','curacion','teletransporte','bonificacion'])
+            plantilla = catalogo.elegir("eventos", profundidad(pos))
+            valor = 0
+            if plantilla.valor_min or plantilla.valor_max:
+                valor = random.randint(plantilla.valor_min, plantilla.valor_max)
             
-            if tipo == 'trampa':
-                ev = Evento("Trampa", "¡Trampa activada!", "trampa", random.randint(1,3))
-            elif tipo == 'curacion':
-                ev = Evento("Fuente", "Agua cristalina", "curacion", random.randint(2,5))
-            elif tipo == 'teletransporte':
-                ev = Evento("Portal", "Te absorbe", "teletransporte")
-            else:
-                ev = Evento("Altar", "Aumenta fuerza", "bonificacion", random.randint(1,3))
-            
-            self.habitaciones[pos].contenido = ev
+            self.habitaciones[pos].contenido = Evento(
+                plantilla.nombre, plantilla.descripcion, plantilla.efecto, valor
+            )
         
         return "Contenido colocado."
 
@@ -0,0 +1,190 @@
+"""
+Perfil de memoria de un mapa generado, desglosado por componente.
+
+El total se mide con `tracemalloc` mientras se genera el mapa (memoria que
+sigue viva al terminar, sin temporales). El desglose por componente recorre
+los objetos con `sys.getsizeof`, contando cada objeto una sola vez aunque lo
+compartan varias habitaciones (por ejemplo, nombres de monstruos).
+`getsizeof` no ve el almacenamiento implícito de atributos que CPython usa
+en las instancias sin `__dict__` materializado, así que la suma de
+componentes queda algo por debajo del total medido; la diferencia aparece en
+el reporte como "sin desglosar".
+
+    perfil = perfilar_generacion(10_000)
+    print(perfil.reporte())
+    perfil.verificar_presupuesto()  # AssertionError si se pasa
+"""
+
+import gc
+import math
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .mapa import Mapa
+    from .explorador import Explorador
+
+# Bytes por habitación aceptables para un mapa con contenido y un explorador
+# (medido en CPython de 64 bits: 510-560 B en mapas grandes, ~620 B con 100
+# habitaciones por los costes fijos; se deja margen)
+PRESUPUESTO_BYTES_POR_HABITACION = 1024
+
+COMPONENTES = (
+    "habitaciones", "conexiones", "posiciones", "indice",
+    "contenido", "inventario", "estado_jugador", "otros",
+)
+
+
+@dataclass
+class PerfilMemoria:
+    """Memoria de un mapa por componente, en bytes."""
+    n_habitaciones: int
+    componentes: dict[str, int] = field(default_factory=dict)
+    medido: Optional[int] = None  # Total según tracemalloc (None si no se midió)
+
+    @property
+    def total_componentes(self) -> int:
+        return sum(self.componentes.values())
+
+    @property
+    def total(self) -> int:
+        """Total medido con tracemalloc si existe; si no, la suma de componentes."""
+        return self.medido if self.medido is not None else self.total_componentes
+
+    @property
+    def bytes_por_habitacion(self) -> float:
+        return self.total / self.n_habitaciones if self.n_habitaciones else 0.0
+
+    def dentro_del_presupuesto(self, bytes_por_habitacion: float = PRESUPUESTO_BYTES_POR_HABITACION) -> bool:
+        return self.bytes_por_habitacion <= bytes_por_habitacion
+
+    def verificar_presupuesto(self, bytes_por_habitacion: float = PRESUPUESTO_BYTES_POR_HABITACION):
+        """Lanza AssertionError con el tamaño medido si se supera el presupuesto."""
+        if not self.dentro_del_presupuesto(bytes_por_habitacion):
+            raise AssertionError(
+                f"{self.n_habitaciones} habitaciones: {self.bytes_por_habitacion:.0f} B/hab "
+                f"> presupuesto {bytes_por_habitacion:.0f}"
+            )
+
+    def reporte(self) -> str:
+        n = max(self.n_habitaciones, 1)
+        lineas = [f"{'componente':<15}{'KiB':>12}{'B/hab':>10}{'%':>7}"]
+        total = self.total_componentes or 1
+        for nombre, tam in self.componentes.items():
+            if tam:
+                lineas.append(f"{nombre:<15}{tam / 1024:>12.1f}{tam / n:>10.1f}{tam * 100 / total:>7.1f}")
+        lineas.append(f"{'suma':<15}{self.total_componentes / 1024:>12.1f}{self.total_componentes / n:>10.1f}")
+        if self.medido is not None:
+            sin_desglosar = self.medido - self.total_componentes
+            if sin_desglosar > 0:
+                lineas.append(f"{'sin desglosar':<15}{sin_desglosar / 1024:>12.1f}{sin_desglosar / n:>10.1f}")
+            lineas.append(f"{'tracemalloc':<15}{self.medido / 1024:>12.1f}{self.medido / n:>10.1f}")
+        return "\n".join(lineas)
+
+
+def _tamano(obj, vistos: set[int]) -> int:
+    """Tamaño superficial de `obj` (0 si ya se contó)."""
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+    return sys.getsizeof(obj)
+
+
+def _tamano_profundo(obj, vistos: set[int]) -> int:
+    """
+    Tamaño de `obj` y de todo lo que contiene. Pensado para contenidos e
+    inventario, que no apuntan de vuelta a las habitaciones.
+    """
+    total = 0
+    pendientes = [obj]
+    while pendientes:
+        actual = pendientes.pop()
+        if actual is None or id(actual) in vistos:
+            continue
+        total += _tamano(actual, vistos)
+        if isinstance(actual, dict):
+            pendientes.extend(actual.keys())
+            pendientes.extend(actual.values())
+        elif isinstance(actual, (list, tuple, set, frozenset)):
+            pendientes.extend(actual)
+        elif hasattr(actual, "__dataclass_fields__"):
+            # getattr y no vars(): vars() crearía el __dict__ que CPython
+            # mantiene implícito y alteraría la memoria que se quiere medir
+            pendientes.extend(getattr(actual, f) for f in actual.__dataclass_fields__)
+        elif hasattr(actual, "__slots__"):
+            pendientes.extend(getattr(actual, s, None) for s in actual.__slots__)
+    return total
+
+
+def perfilar_mapa(mapa: "Mapa", explorador: Optional["Explorador"] = None) -> PerfilMemoria:
+    """
+    Desglosa la memoria del mapa (y del explorador) por componente.
+
+    En un MapaJugador solo se cuenta el estado propio del jugador: la
+    plantilla es compartida y no crece con el número de jugadores.
+    """
+    vistos: set[int] = set()
+    componentes = dict.fromkeys(COMPONENTES, 0)
+
+    estado = getattr(mapa, "estado", None)
+    if estado is not None and getattr(mapa, "plantilla", None) is not None:
+        componentes["estado_jugador"] = _tamano_profundo(estado, vistos)
+    else:
+        componentes["indice"] = _tamano(mapa.habitaciones, vistos)
+        for pos, hab in mapa.habitaciones.items():
+            componentes["posiciones"] += _tamano_profundo(pos, vistos)
+            componentes["habitaciones"] += _tamano(hab, vistos)
+            for valor in (hab.id, hab.x, hab.y):
+                componentes["posiciones"] += _tamano(valor, vistos)
+            componentes["conexiones"] += _tamano(hab.conexiones, vistos)
+            componentes["contenido"] += _tamano_profundo(hab.contenido, vistos)
+        componentes["otros"] += _tamano_profundo(mapa.observadores, vistos)
+
+    if explorador is not None:
+        componentes["inventario"] = _tamano_profundo(explorador.inventario, vistos)
+        if explorador.visitas is not None:
+            componentes["otros"] += _tamano_profundo(explorador.visitas, vistos)
+
+    return PerfilMemoria(len(mapa.habitaciones), componentes)
+
+
+def perfilar_generacion(n_habitaciones: int, semilla: int = 0, con_explorador: bool = True) -> PerfilMemoria:
+    """
+    Genera un mapa de `n_habitaciones` con contenido bajo tracemalloc y
+    retorna su perfil con el total medido y el desglose por componente.
+    """
+    # Importar antes de empezar a medir: generar_estructura y
+    # crear_explorador_en cargan más módulos la primera vez y eso no es
+    # memoria del mapa
+    from .mapa import Mapa
+    from .visitas import crear_explorador_en
+    from . import explorador, motores, plantilla  # noqa: F401
+
+    lado = math.isqrt(2 * n_habitaciones) + 1
+    estaba_activo = tracemalloc.is_tracing()
+    gc.collect()
+    if not estaba_activo:
+        tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+
+    random.seed(semilla)
+    mapa = Mapa(ancho=lado, alto=lado)
+    resultado = mapa.generar_estructura(n_habitaciones)
+    if resultado.startswith("Error"):
+        if not estaba_activo:
+            tracemalloc.stop()
+        raise ValueError(resultado)
+    mapa.colocar_contenido()
+    explorador_mapa = crear_explorador_en(mapa) if con_explorador else None
+
+    gc.collect()
+    medido = tracemalloc.get_traced_memory()[0] - antes
+    if not estaba_activo:
+        tracemalloc.stop()
+
+    perfil = perfilar_mapa(mapa, explorador_mapa)
+    perfil.medido = medido
+    return perfil
@@ -0,0 +1,160 @@
+"""
+Instrumentación opcional de las rutas calientes: temporizadores y contadores.
+
+Se activa con la variable de entorno DUNGEON_METRICAS=1 antes de importar el
+paquete. Sin ella, `@medir` devuelve la función original sin envolver y
+`contar` retorna de inmediato, así que el coste en producción es nulo.
+
+Las métricas se acumulan en `REGISTRO` y se pueden volcar como JSON o en el
+formato de texto de Prometheus:
+
+    DUNGEON_METRICAS=1 python main.py generar ... --metricas metricas.prom
+
+Cada proceso tiene su propio registro (en `generar_lote` con varios procesos
+solo se ven las métricas del proceso principal). Dentro de un proceso el
+registro se puede actualizar desde varios hilos.
+"""
+
+import functools
+import os
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+ACTIVAS = os.environ.get("DUNGEON_METRICAS", "") not in ("", "0")
+PREFIJO_PROMETHEUS = "dungeon"
+
+
+class Temporizador:
+    """Número de llamadas, tiempo total y tiempo máximo de una operación."""
+    __slots__ = ("llamadas", "total", "maximo", "_cerrojo")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self._cerrojo = threading.Lock()
+
+    def registrar(self, segundos: float):
+        with self._cerrojo:
+            self.llamadas += 1
+            self.total += segundos
+            if segundos > self.maximo:
+                self.maximo = segundos
+
+    def a_dict(self) -> dict:
+        return {
+            "llamadas": self.llamadas,
+            "total_s": self.total,
+            "media_s": self.total / self.llamadas if self.llamadas else 0.0,
+            "maximo_s": self.maximo,
+        }
+
+
+class RegistroMetricas:
+    """Temporizadores y contadores indexados por nombre (p. ej. "mapa.generar_estructura")."""
+
+    def __init__(self):
+        self.temporizadores: dict[str, Temporizador] = {}
+        self.contadores: dict[str, int] = {}
+        self._cerrojo = threading.Lock()
+
+    def temporizador(self, nombre: str) -> Temporizador:
+        """Retorna el temporizador `nombre`, creándolo si no existe."""
+        with self._cerrojo:
+            temporizador = self.temporizadores.get(nombre)
+            if temporizador is None:
+                temporizador = self.temporizadores[nombre] = Temporizador()
+            return temporizador
+
+    def incrementar(self, nombre: str, cantidad: int = 1):
+        with self._cerrojo:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def reiniciar(self):
+        """Pone a cero todas las métricas sin olvidar los nombres registrados."""
+        # Los temporizadores se ponen a cero en su sitio: `medir` guarda la
+        # referencia al crear la envoltura
+        with self._cerrojo:
+            for temporizador in self.temporizadores.values():
+                with temporizador._cerrojo:
+                    temporizador.llamadas = 0
+                    temporizador.total = 0.0
+                    temporizador.maximo = 0.0
+            for nombre in self.contadores:
+                self.contadores[nombre] = 0
+
+    def a_dict(self) -> dict:
+        return {
+            "temporizadores": {n: t.a_dict() for n, t in sorted(self.temporizadores.items())},
+            "contadores": dict(sorted(self.contadores.items())),
+        }
+
+    def a_json(self, indent: Optional[int] = 2) -> str:
+        import json
+        return json.dumps(self.a_dict(), indent=indent, ensure_ascii=False)
+
+    def a_prometheus(self, prefijo: str = PREFIJO_PROMETHEUS) -> str:
+        """Formato de exposición de texto de Prometheus (versión 0.0.4)."""
+        lineas = []
+        for nombre, t in sorted(self.temporizadores.items()):
+            metrica = _nombre_prometheus(prefijo, nombre) + "_seconds"
+            lineas.append(f"# HELP {metrica} Tiempo empleado en {nombre}")
+            lineas.append(f"# TYPE {metrica} summary")
+            lineas.append(f"{metrica}_count {t.llamadas}")
+            lineas.append(f"{metrica}_sum {t.total:.9f}")
+            lineas.append(f"# TYPE {metrica}_max gauge")
+            lineas.append(f"{metrica}_max {t.maximo:.9f}")
+        for nombre, valor in sorted(self.contadores.items()):
+            metrica = _nombre_prometheus(prefijo, nombre) + "_total"
+            lineas.append(f"# TYPE {metrica} counter")
+            lineas.append(f"{metrica} {valor}")
+        return "\n".join(lineas) + "\n" if lineas else ""
+
+    def guardar(self, archivo: str) -> str:
+        """Vuelca las métricas a un archivo: Prometheus si termina en .prom, si no JSON."""
+        texto = self.a_prometheus() if archivo.endswith(".prom") else self.a_json()
+        try:
+            with open(archivo, "w", encoding="utf-8") as f:
+                f.write(texto)
+        except OSError as e:
+            return f"Error: {e}"
+        return f"Métricas guardadas en {archivo}"
+
+
+def _nombre_prometheus(prefijo: str, nombre: str) -> str:
+    limpio = "".join(c if c.isalnum() else "_" for c in nombre)
+    return f"{prefijo}_{limpio}" if prefijo else limpio
+
+
+REGISTRO = RegistroMetricas()
+
+
+def medir(nombre: str) -> Callable[[F], F]:
+    """
+    Decorador que mide cada llamada en el temporizador `nombre`.
+    Con las métricas desactivadas devuelve la función tal cual.
+    """
+    def decorador(funcion: F) -> F:
+        if not ACTIVAS:
+            return funcion
+        temporizador = REGISTRO.temporizador(nombre)
+        reloj = time.perf_counter
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                temporizador.registrar(reloj() - inicio)
+        return envoltura  # type: ignore[return-value]
+    return decorador
+
+
+def contar(nombre: str, cantidad: int = 1):
+    """Suma `cantidad` al contador `nombre` (no hace nada si están desactivadas)."""
+    if ACTIVAS:
+        REGISTRO.incrementar(nombre, cantidad)
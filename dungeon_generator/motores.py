@@ -0,0 +1,357 @@
+"""
+Motores de generación de la estructura del mapa, seleccionables por nombre.
+
+    mapa.generar_estructura(5000, motor="cuevas", semilla=42)
+
+- "caminata": el algoritmo original; crece desde una habitación del borde
+  añadiendo vecinas al azar.
+- "bsp": partición binaria del espacio en salas rectangulares unidas por
+  pasillos.
+- "cuevas": autómata celular (regla 4-5) que suaviza ruido aleatorio hasta
+  formar cavernas.
+
+Los motores de rejilla calculan la ocupación de todo el mapa de una vez y
+luego la convierten en habitaciones conectadas. El autómata celular guarda la
+rejilla en un único entero de Python (un bit por celda) y aplica cada paso con
+desplazamientos y operaciones bit a bit sobre el mapa completo, en lugar de
+recorrer las celdas una a una.
+
+Para añadir un motor basta con heredar de `MotorGeneracion` y registrarlo con
+`registrar_motor`.
+"""
+
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+from .models import Habitacion
+from .mapa import DIRECCIONES, OPUESTO
+
+if TYPE_CHECKING:
+    from .mapa import Mapa
+
+MOTOR_POR_DEFECTO = "caminata"
+_BITS_A_CELDAS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class MotorGeneracion(ABC):
+    """Algoritmo que rellena `mapa.habitaciones` con `n_habitaciones` conectadas."""
+    nombre: str = ""
+
+    @abstractmethod
+    def generar(self, mapa: "Mapa", n_habitaciones: int, rng: random.Random) -> str:
+        """Genera la estructura. Retorna un mensaje, que empieza por "Error" si falla."""
+
+
+MOTORES: dict[str, MotorGeneracion] = {}
+
+
+def registrar_motor(motor: MotorGeneracion) -> MotorGeneracion:
+    """Registra (o reemplaza) un motor con su nombre."""
+    MOTORES[motor.nombre] = motor
+    return motor
+
+
+def obtener_motor(nombre: str) -> Optional[MotorGeneracion]:
+    return MOTORES.get(nombre)
+
+
+class MotorCaminata(MotorGeneracion):
+    """Crecimiento aleatorio desde una habitación del borde (algoritmo original)."""
+    nombre = "caminata"
+
+    def generar(self, mapa: "Mapa", n_habitaciones: int, rng: random.Random) -> str:
+        lado = rng.choice(['norte', 'sur', 'este', 'oeste'])
+        if lado == 'norte':
+            x_inicial, y_inicial = rng.randint(0, mapa.ancho - 1), 0
+        elif lado == 'sur':
+            x_inicial, y_inicial = rng.randint(0, mapa.ancho - 1), mapa.alto - 1
+        elif lado == 'este':
+            x_inicial, y_inicial = mapa.ancho - 1, rng.randint(0, mapa.alto - 1)
+        else:
+            x_inicial, y_inicial = 0, rng.randint(0, mapa.alto - 1)
+
+        mapa.habitacion_inicial = Habitacion(
+            id=0, x=x_inicial, y=y_inicial, inicial=True
+        )
+        mapa.habitaciones[(x_inicial, y_inicial)] = mapa.habitacion_inicial
+        # Habitaciones que aún pueden crecer (alguna vecina libre)
+        posiciones = [(x_inicial, y_inicial)]
+
+        id_hab = 1
+
+        while len(mapa.habitaciones) < n_habitaciones:
+            if not posiciones:
+                return "Error: no se pudo generar"
+            indice = rng.randrange(len(posiciones))
+            pos_actual = posiciones[indice]
+            x_actual, y_actual = pos_actual
+            direcciones = list(DIRECCIONES.keys())
+            rng.shuffle(direcciones)
+
+            creada = False
+            for direccion in direcciones:
+                dx, dy = DIRECCIONES[direccion]
+                nx, ny = x_actual + dx, y_actual + dy
+
+                if 0 <= nx < mapa.ancho and 0 <= ny < mapa.alto:
+                    if (nx, ny) not in mapa.habitaciones:
+                        nueva = Habitacion(id=id_hab, x=nx, y=ny)
+                        mapa.habitaciones[(nx, ny)] = nueva
+                        posiciones.append((nx, ny))
+
+                        hab_act = mapa.habitaciones[pos_actual]
+                        hab_act.conexiones[direccion] = nueva
+                        nueva.conexiones[OPUESTO[direccion]] = hab_act
+
+                        id_hab += 1
+                        creada = True
+                        break
+
+            if not creada:
+                # Rodeada por completo: nunca podrá volver a crecer
+                posiciones[indice] = posiciones[-1]
+                posiciones.pop()
+
+        return "Estructura generada con éxito."
+
+
+# --- Motores de rejilla ---
+# La rejilla es un bytearray (1 = suelo) con índice y * paso + x, donde
+# paso = ancho + 1: la columna extra queda siempre vacía y hace de muro, así
+# que los vecinos ±1 nunca saltan de una fila a otra.
+
+class MotorRejilla(MotorGeneracion):
+    """Base de los motores que calculan primero la ocupación de todo el mapa."""
+
+    @abstractmethod
+    def rejilla(self, ancho: int, alto: int, n_habitaciones: int, rng: random.Random) -> bytearray:
+        """Retorna la ocupación (ancho + 1) * alto del mapa."""
+
+    def generar(self, mapa: "Mapa", n_habitaciones: int, rng: random.Random) -> str:
+        ocupada = self.rejilla(mapa.ancho, mapa.alto, n_habitaciones, rng)
+        return _construir_desde_rejilla(mapa, ocupada, n_habitaciones, rng)
+
+
+def _componente_mayor(ocupada: bytearray, paso: int) -> list[int]:
+    """Celdas de la mayor región conectada de suelo."""
+    etiquetada = bytearray(len(ocupada))
+    mayor: list[int] = []
+    vecinos = (1, -1, paso, -paso)
+    total = len(ocupada)
+    inicio = ocupada.find(1)
+    while inicio != -1:
+        if not etiquetada[inicio]:
+            etiquetada[inicio] = 1
+            region = [inicio]
+            for celda in region:  # La lista crece mientras se recorre (BFS)
+                for d in vecinos:
+                    v = celda + d
+                    if 0 <= v < total and ocupada[v] and not etiquetada[v]:
+                        etiquetada[v] = 1
+                        region.append(v)
+            if len(region) > len(mayor):
+                mayor = region
+        inicio = ocupada.find(1, inicio + 1)
+    return mayor
+
+
+def _construir_desde_rejilla(mapa: "Mapa", ocupada: bytearray, n_habitaciones: int,
+                             rng: random.Random) -> str:
+    """
+    Convierte la ocupación en habitaciones: toma la mayor región conectada,
+    la recorta (BFS desde una entrada al azar) o la hace crecer hasta tener
+    exactamente `n_habitaciones`, y conecta en bloque todas las celdas vecinas.
+    """
+    ancho, alto = mapa.ancho, mapa.alto
+    paso = ancho + 1
+    total = paso * alto
+    region = _componente_mayor(ocupada, paso)
+    if not region:
+        # Rejilla vacía: se empieza desde una celda cualquiera
+        region = [rng.randrange(alto) * paso + rng.randrange(ancho)]
+    en_region = bytearray(total)
+    for celda in region:
+        en_region[celda] = 1
+
+    # Orden BFS desde la entrada, limitado a la región
+    entrada = rng.choice(region)
+    elegida = bytearray(total)
+    elegida[entrada] = 1
+    orden = [entrada]
+    cola = deque(orden)
+    while cola and len(orden) < n_habitaciones:
+        celda = cola.popleft()
+        for d in (1, -1, paso, -paso):
+            v = celda + d
+            if 0 <= v < total and en_region[v] and not elegida[v]:
+                elegida[v] = 1
+                orden.append(v)
+                cola.append(v)
+                if len(orden) == n_habitaciones:
+                    break
+
+    # Si la región no basta, se crece hacia celdas libres como en "caminata"
+    frontera = list(orden)
+    while len(orden) < n_habitaciones:
+        if not frontera:
+            return "Error: no se pudo generar"
+        i = rng.randrange(len(frontera))
+        celda = frontera[i]
+        libres = [celda + d for d in (1, -1, paso, -paso)
+                  if 0 <= celda + d < total and (celda + d) % paso != ancho and not elegida[celda + d]]
+        if not libres:
+            frontera[i] = frontera[-1]
+            frontera.pop()
+            continue
+        v = rng.choice(libres)
+        elegida[v] = 1
+        orden.append(v)
+        frontera.append(v)
+
+    habitaciones = mapa.habitaciones
+    por_celda = {}
+    for id_hab, celda in enumerate(orden):
+        y, x = divmod(celda, paso)
+        hab = Habitacion(id=id_hab, x=x, y=y, inicial=(id_hab == 0))
+        habitaciones[(x, y)] = hab
+        por_celda[celda] = hab
+    mapa.habitacion_inicial = por_celda[entrada]
+
+    # Conexiones en bloque: cada celda con su vecina este y sur si existen
+    for celda, hab in por_celda.items():
+        este = por_celda.get(celda + 1)
+        if este is not None:
+            hab.conexiones["este"] = este
+            este.conexiones["oeste"] = hab
+        sur = por_celda.get(celda + paso)
+        if sur is not None:
+            hab.conexiones["sur"] = sur
+            sur.conexiones["norte"] = hab
+    return "Estructura generada con éxito."
+
+
+class MotorBSP(MotorRejilla):
+    """Partición binaria del espacio: salas rectangulares unidas por pasillos en L."""
+    nombre = "bsp"
+
+    def __init__(self, tamano_minimo: int = 6):
+        self.tamano_minimo = tamano_minimo
+
+    def rejilla(self, ancho: int, alto: int, n_habitaciones: int, rng: random.Random) -> bytearray:
+        paso = ancho + 1
+        ocupada = bytearray(paso * alto)
+        self._particionar(ocupada, paso, 0, 0, ancho, alto, rng)
+        return ocupada
+
+    def _particionar(self, ocupada: bytearray, paso: int, x: int, y: int, w: int, h: int,
+                     rng: random.Random) -> tuple[int, int]:
+        """Divide el rectángulo; retorna un punto de una sala suya para unirla con su hermana."""
+        minimo = self.tamano_minimo
+        vertical = w >= h
+        largo = w if vertical else h
+        if largo < 2 * minimo:
+            return self._tallar_sala(ocupada, paso, x, y, w, h, rng)
+
+        corte = rng.randint(minimo, largo - minimo)
+        if vertical:
+            a = self._particionar(ocupada, paso, x, y, corte, h, rng)
+            b = self._particionar(ocupada, paso, x + corte, y, w - corte, h, rng)
+        else:
+            a = self._particionar(ocupada, paso, x, y, w, corte, rng)
+            b = self._particionar(ocupada, paso, x, y + corte, w, h - corte, rng)
+        self._pasillo(ocupada, paso, a, b, rng)
+        return a if rng.random() < 0.5 else b
+
+    @staticmethod
+    def _tallar_sala(ocupada: bytearray, paso: int, x: int, y: int, w: int, h: int,
+                     rng: random.Random) -> tuple[int, int]:
+        # Se deja una fila y una columna de muro para que las salas no se toquen
+        disp_w, disp_h = max(1, w - 1), max(1, h - 1)
+        sala_w = rng.randint(max(1, disp_w // 2), disp_w)
+        sala_h = rng.randint(max(1, disp_h // 2), disp_h)
+        sx = x + rng.randint(0, disp_w - sala_w)
+        sy = y + rng.randint(0, disp_h - sala_h)
+        fila = b"\x01" * sala_w
+        for fy in range(sy, sy + sala_h):
+            inicio = fy * paso + sx
+            ocupada[inicio:inicio + sala_w] = fila
+        return sx + sala_w // 2, sy + sala_h // 2
+
+    @staticmethod
+    def _pasillo(ocupada: bytearray, paso: int, a: tuple[int, int], b: tuple[int, int],
+                 rng: random.Random):
+        (x1, y1), (x2, y2) = a, b
+        # Codo en (x2, y1) o en (x1, y2)
+        codo_x, codo_y = (x2, y1) if rng.random() < 0.5 else (x1, y2)
+        for (xa, ya), (xb, yb) in (((x1, y1), (codo_x, codo_y)), ((codo_x, codo_y), (x2, y2))):
+            if ya == yb:
+                izq, der = min(xa, xb), max(xa, xb)
+                inicio = ya * paso + izq
+                ocupada[inicio:inicio + der - izq + 1] = b"\x01" * (der - izq + 1)
+            else:
+                for fy in range(min(ya, yb), max(ya, yb) + 1):
+                    ocupada[fy * paso + xa] = 1
+
+
+class MotorCuevas(MotorRejilla):
+    """
+    Autómata celular: ruido inicial con `relleno` de suelo y `iteraciones`
+    pasos de la regla 4-5 (una celda es suelo si tiene 5 o más vecinas de
+    suelo, o 4 y ya lo era; fuera del mapa cuenta como muro).
+    """
+    nombre = "cuevas"
+
+    def __init__(self, relleno: float = 0.55, iteraciones: int = 5):
+        self.relleno = relleno
+        self.iteraciones = iteraciones
+
+    def rejilla(self, ancho: int, alto: int, n_habitaciones: int, rng: random.Random) -> bytearray:
+        paso = ancho + 1
+        # Patrón con un 1 al principio de cada fila, multiplicado por la fila llena
+        filas = ((1 << (paso * alto)) - 1) // ((1 << paso) - 1)
+        valida = filas * ((1 << ancho) - 1)
+
+        suelo = self._ruido(ancho, alto, rng)
+        for _ in range(self.iteraciones):
+            suelo = _paso_automata(suelo, paso, valida)
+
+        bits = format(suelo, "b")[::-1].ljust(paso * alto, "0")
+        return bytearray(bits.encode("ascii").translate(_BITS_A_CELDAS))
+
+    def _ruido(self, ancho: int, alto: int, rng: random.Random) -> int:
+        """Rejilla inicial como entero: cada celda es suelo con probabilidad `relleno`."""
+        umbral = int(self.relleno * 256)
+        tabla = bytes(0x31 if b < umbral else 0x30 for b in range(256))  # "1" / "0"
+        celdas = rng.randbytes(ancho * alto).translate(tabla)
+        # Cada fila lleva su columna de muro; el bit 0 es la celda (0, 0)
+        con_muro = b"0".join(celdas[y * ancho:(y + 1) * ancho] for y in range(alto)) + b"0"
+        return int(con_muro[::-1], 2)
+
+
+def _paso_automata(suelo: int, paso: int, valida: int) -> int:
+    """Un paso de la regla 4-5 sobre toda la rejilla a la vez (aritmética bit a bit)."""
+    vecinas = (
+        suelo >> 1, suelo << 1,
+        suelo >> paso, suelo << paso,
+        suelo >> (paso + 1), suelo << (paso + 1),
+        suelo >> (paso - 1), suelo << (paso - 1),
+    )
+    # Contador en binario por planos de bits: planos[i] es el bit i de la cuenta
+    planos: list[int] = []
+    for vecina in vecinas:
+        acarreo = vecina
+        for i, plano in enumerate(planos):
+            planos[i] = plano ^ acarreo
+            acarreo = plano & acarreo
+        if acarreo:
+            planos.append(acarreo)
+    b0, b1, b2, b3 = (planos + [0, 0, 0, 0])[:4]
+    al_menos_4 = b2 | b3
+    al_menos_5 = b3 | (b2 & (b1 | b0))
+    return (al_menos_5 | (suelo & al_menos_4)) & valida
+
+
+registrar_motor(MotorCaminata())
+registrar_motor(MotorBSP())
+registrar_motor(MotorCuevas())
@@ -0,0 +1,89 @@
+"""Muestreo ponderado en O(1) con tablas de alias (método de Walker/Vose)."""
+
+import random
+from typing import Callable, Generic, Sequence, TypeVar
+
+T = TypeVar("T")
+
+N_BANDAS_POR_DEFECTO = 8
+
+
+class TablaAlias:
+    """
+    Tabla de alias para elegir un índice según pesos arbitrarios.
+    Construirla cuesta O(n); cada extracción cuesta O(1).
+    """
+    __slots__ = ("probabilidad", "alias", "n")
+
+    def __init__(self, pesos: Sequence[float]):
+        n = len(pesos)
+        total = float(sum(pesos))
+        if n == 0 or total <= 0:
+            raise ValueError("Se necesita al menos un peso positivo")
+        if any(p < 0 for p in pesos):
+            raise ValueError("Los pesos no pueden ser negativos")
+
+        escalados = [p * n / total for p in pesos]
+        self.probabilidad = [1.0] * n
+        self.alias = list(range(n))
+        self.n = n
+
+        pequenos = [i for i, p in enumerate(escalados) if p < 1.0]
+        grandes = [i for i, p in enumerate(escalados) if p >= 1.0]
+        while pequenos and grandes:
+            menor = pequenos.pop()
+            mayor = grandes.pop()
+            self.probabilidad[menor] = escalados[menor]
+            self.alias[menor] = mayor
+            escalados[mayor] += escalados[menor] - 1.0
+            (pequenos if escalados[mayor] < 1.0 else grandes).append(mayor)
+        # Los restantes quedan con probabilidad 1 (errores de redondeo)
+
+    def muestrear(self, rng: random.Random = random) -> int:
+        i = int(rng.random() * self.n)
+        return i if rng.random() < self.probabilidad[i] else self.alias[i]
+
+    def muestrear_lote(self, cantidad: int, rng: random.Random = random) -> list[int]:
+        """Extrae `cantidad` índices de una vez."""
+        probabilidad, alias, n = self.probabilidad, self.alias, self.n
+        aleatorio = rng.random
+        resultado = []
+        for _ in range(cantidad):
+            i = int(aleatorio() * n)
+            resultado.append(i if aleatorio() < probabilidad[i] else alias[i])
+        return resultado
+
+
+class MuestreadorPorProfundidad(Generic[T]):
+    """
+    Elige elementos con pesos que dependen de la profundidad (0 = entrada,
+    1 = lo más lejano). La profundidad se discretiza en bandas y se construye
+    una tabla de alias por banda una sola vez.
+    """
+
+    def __init__(self, elementos: Sequence[T], peso: Callable[[T, float], float],
+                 n_bandas: int = N_BANDAS_POR_DEFECTO):
+        self.elementos = list(elementos)
+        self.n_bandas = n_bandas
+        self.tablas = [
+            TablaAlias([peso(e, (banda + 0.5) / n_bandas) for e in self.elementos])
+            for banda in range(n_bandas)
+        ]
+
+    def _banda(self, profundidad: float) -> int:
+        return min(self.n_bandas - 1, max(0, int(profundidad * self.n_bandas)))
+
+    def muestrear(self, profundidad: float, rng: random.Random = random) -> T:
+        return self.elementos[self.tablas[self._banda(profundidad)].muestrear(rng)]
+
+    def muestrear_lote(self, profundidades: Sequence[float], rng: random.Random = random) -> list[T]:
+        """Extrae un elemento por cada profundidad, agrupando por banda."""
+        resultado: list = [None] * len(profundidades)
+        por_banda: dict[int, list[int]] = {}
+        for i, profundidad in enumerate(profundidades):
+            por_banda.setdefault(self._banda(profundidad), []).append(i)
+        for banda, indices in por_banda.items():
+            elegidos = self.tablas[banda].muestrear_lote(len(indices), rng)
+            for i, elegido in zip(indices, elegidos):
+                resultado[i] = self.elementos[elegido]
+        return resultado
@@ -0,0 +1,456 @@
+"""
+Planificación de rutas para jugadores automáticos: recoger los tesoros más
+valiosos, evitar los monstruos que probablemente ganarían el combate y
+terminar en el jefe, con un presupuesto opcional de pasos.
+
+Un BFS completo desde el inicio y otro desde el jefe eligen los tesoros
+candidatos (los de más valor por paso de rodeo, hasta `max_tesoros`); las
+distancias entre ellos salen de un BFS desde cada uno que se detiene al
+encontrar a los demás o al superar el presupuesto. Solo se pisan
+habitaciones transitables, y la matriz se guarda mientras no cambie
+`Mapa.version`. El orden de visita se resuelve de forma
+exacta (Held-Karp) si hay pocos tesoros y, si no, con vecino más cercano +
+2-opt, dentro de `limite_segundos` (sin contar la matriz). Con presupuesto de pasos se
+descartan los tesoros que menos valor aportan por paso hasta que la ruta
+cabe, y después se vuelven a insertar los que quepan.
+
+    planificador = PlanificadorRutas(mapa)
+    plan = planificador.planificar(explorador, presupuesto_pasos=200)
+    print(plan.valor, plan.pasos, plan.paradas)
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+from .contenido import Tesoro, Monstruo, Jefe
+from .metricas import medir
+
+if TYPE_CHECKING:
+    from .mapa import Mapa
+    from .explorador import Explorador
+
+Posicion = tuple[int, int]
+
+# Probabilidad de que el explorador acierte cada ronda (ver contenido.py)
+PROB_GOLPE_MONSTRUO = 0.5
+PROB_GOLPE_JEFE = 2 / 6
+UMBRAL_VICTORIA = 0.5
+MAX_TESOROS = 40
+MAX_EXACTO = 10
+LIMITE_SEGUNDOS = 0.2
+MAX_PLANES_GUARDADOS = 64
+# Distancia entre tesoros que están a más pasos que el presupuesto
+INALCANZABLE = 10**9
+
+
+@dataclass
+class PlanRuta:
+    """Ruta planificada: tesoros en orden de visita y camino habitación a habitación."""
+    paradas: list[Posicion] = field(default_factory=list)  # Tesoros (y el jefe al final)
+    camino: list[Posicion] = field(default_factory=list)
+    valor: int = 0
+    pasos: int = 0
+    metodo: str = "heuristico"  # "exacto", "heuristico" o "vacio"
+    descartados: int = 0  # Tesoros alcanzables que no caben en el presupuesto
+    dentro_del_presupuesto: bool = True
+    probabilidad_jefe: Optional[float] = None
+    segundos: float = 0.0
+
+
+def probabilidad_victoria(vida: int, dano: int, monstruo: Monstruo,
+                          prob_golpe: Optional[float] = None) -> float:
+    """
+    Probabilidad de que un explorador con `vida` y `dano` gane el combate:
+    necesita ceil(vida_monstruo / dano) aciertos antes de recibir
+    ceil(vida / dano_monstruo) golpes, con `prob_golpe` por ronda.
+    """
+    if prob_golpe is None:
+        prob_golpe = PROB_GOLPE_JEFE if isinstance(monstruo, Jefe) else PROB_GOLPE_MONSTRUO
+    if monstruo.vida <= 0 or monstruo.dano <= 0:
+        return 1.0
+    if dano <= 0 or vida <= 0:
+        return 0.0
+    aciertos = math.ceil(monstruo.vida / dano)
+    golpes = math.ceil(vida / monstruo.dano)
+
+    # Binomial negativa sumada en escala logarítmica (con vidas muy grandes
+    # los coeficientes no caben en un float); se suma la cola más corta
+    def cola(necesarios: int, p: float, margen: int) -> float:
+        total = 0.0
+        for i in range(margen):
+            total += math.exp(math.lgamma(necesarios + i) - math.lgamma(i + 1) - math.lgamma(necesarios)
+                              + necesarios * math.log(p) + i * math.log1p(-p))
+        return total
+
+    if aciertos <= golpes:
+        return 1.0 - cola(golpes, 1 - prob_golpe, aciertos)
+    return cola(aciertos, prob_golpe, golpes)
+
+
+class PlanificadorRutas:
+    """Planifica rutas sobre un mapa y guarda los resultados por versión del mapa."""
+
+    def __init__(self, mapa: "Mapa", max_tesoros: int = MAX_TESOROS, max_exacto: int = MAX_EXACTO):
+        self.mapa = mapa
+        self.max_tesoros = max_tesoros
+        self.max_exacto = max_exacto
+        self._version = None
+        self._distancias: dict[tuple, tuple] = {}
+        self._planes: dict[tuple, PlanRuta] = {}
+
+    @medir("planificador.planificar")
+    def planificar(self, explorador: "Explorador", presupuesto_pasos: Optional[int] = None,
+                   limite_segundos: float = LIMITE_SEGUNDOS,
+                   umbral_victoria: float = UMBRAL_VICTORIA) -> PlanRuta:
+        """
+        Planifica la ruta desde la posición del explorador. Los monstruos
+        contra los que su probabilidad de ganar es menor que `umbral_victoria`
+        se tratan como muros.
+        """
+        if self._version != self.mapa.version:
+            self._version = self.mapa.version
+            self._distancias.clear()
+            self._planes.clear()
+        clave = (explorador.posicion, explorador.vida, explorador.dano, presupuesto_pasos, umbral_victoria)
+        plan = self._planes.get(clave)
+        if plan is not None:
+            return plan
+
+        inicio = time.perf_counter()
+        puntos, valores, distancias, pos_jefe, bloqueadas = self._matriz(
+            explorador, umbral_victoria, presupuesto_pasos
+        )
+        # El límite de tiempo es para ordenar las paradas; la matriz se
+        # calcula una vez por versión del mapa
+        limite = time.perf_counter() + limite_segundos
+        plan = self._resolver(puntos, valores, distancias, pos_jefe, presupuesto_pasos, limite)
+        plan.camino = self._camino(puntos[0], plan.paradas, bloqueadas)
+        if pos_jefe is not None:
+            plan.probabilidad_jefe = probabilidad_victoria(
+                explorador.vida, explorador.dano, self.mapa.habitaciones[pos_jefe].contenido
+            )
+        plan.segundos = time.perf_counter() - inicio
+
+        if len(self._planes) >= MAX_PLANES_GUARDADOS:
+            self._planes.pop(next(iter(self._planes)))
+        self._planes[clave] = plan
+        return plan
+
+    # --- Puntos de interés y distancias ---
+
+    def _bloqueadas(self, explorador: "Explorador", umbral: float) -> set[Posicion]:
+        """Habitaciones que no se atraviesan: monstruos peligrosos y el jefe."""
+        bloqueadas = set()
+        for pos, hab in self.mapa.habitaciones.items():
+            contenido = hab.contenido
+            if isinstance(contenido, Jefe) or (
+                    isinstance(contenido, Monstruo)
+                    and probabilidad_victoria(explorador.vida, explorador.dano, contenido) < umbral):
+                bloqueadas.add(pos)
+        bloqueadas.discard(explorador.posicion)
+        return bloqueadas
+
+    def _matriz(self, explorador: "Explorador", umbral: float, presupuesto: Optional[int]):
+        """
+        Puntos de interés (inicio, tesoros, jefe), sus valores, las distancias
+        entre ellos y las habitaciones bloqueadas.
+        """
+        clave = (explorador.posicion, explorador.vida, explorador.dano, umbral, presupuesto)
+        guardada = self._distancias.get(clave)
+        if guardada is not None:
+            return guardada
+
+        inicio = explorador.posicion
+        bloqueadas = self._bloqueadas(explorador, umbral)
+        desde_inicio = self._distancias_desde(inicio, bloqueadas)
+        tesoros = []
+        pos_jefe = None
+        for pos, hab in self.mapa.habitaciones.items():
+            if isinstance(hab.contenido, Tesoro) and pos != inicio and pos in desde_inicio:
+                tesoros.append((hab.contenido.recompensa.valor, pos))
+            elif isinstance(hab.contenido, Jefe) and pos in desde_inicio:
+                pos_jefe = pos
+        desde_jefe = self._distancias_desde(pos_jefe, bloqueadas) if pos_jefe is not None else {}
+        directo = desde_inicio[pos_jefe] if pos_jefe is not None else 0
+
+        # Se quedan los tesoros con más valor por paso de rodeo respecto al
+        # camino directo (y que quepan en el presupuesto con ese rodeo)
+        candidatos = []
+        for valor, pos in tesoros:
+            rodeo = desde_inicio[pos] + desde_jefe.get(pos, 0) - directo
+            if presupuesto is not None and directo + rodeo > presupuesto:
+                continue
+            candidatos.append((-valor / (1 + rodeo), pos, valor))
+        candidatos.sort()
+        candidatos = candidatos[:self.max_tesoros]
+
+        puntos = [inicio] + [pos for _, pos, _ in candidatos]
+        valores = [0] + [valor for _, _, valor in candidatos]
+        if pos_jefe is not None:
+            puntos.append(pos_jefe)
+            valores.append(0)
+        # La matriz es simétrica: cada BFS solo busca los puntos que le siguen.
+        # Con presupuesto, un tramo i-j solo sirve si inicio-i + i-j + j-jefe
+        # cabe, lo que acota la profundidad de cada BFS
+        n = len(puntos)
+        distancias = [[INALCANZABLE] * n for _ in range(n)]
+        for j, p in enumerate(puntos):
+            distancias[0][j] = distancias[j][0] = desde_inicio[p]
+            if pos_jefe is not None:
+                distancias[n - 1][j] = distancias[j][n - 1] = desde_jefe[p]
+        hasta_jefe = min((desde_jefe.get(p, 0) for p in puntos[1:]), default=0)
+        for i in range(1, len(candidatos) + 1):
+            maximo = None
+            if presupuesto is not None:
+                maximo = presupuesto - desde_inicio[puntos[i]] - hasta_jefe
+            desde = self._distancias_desde(puntos[i], bloqueadas, puntos[i + 1:], maximo)
+            for j in range(i + 1, len(candidatos) + 1):
+                if puntos[j] in desde:
+                    distancias[i][j] = distancias[j][i] = desde[puntos[j]]
+            distancias[i][i] = 0
+
+        resultado = (puntos, valores, distancias, pos_jefe, bloqueadas)
+        self._distancias[clave] = resultado
+        return resultado
+
+    def _distancias_desde(self, origen: Posicion, bloqueadas: set[Posicion],
+                          destinos: Optional[list[Posicion]] = None,
+                          maximo: Optional[int] = None) -> dict[Posicion, int]:
+        """
+        BFS desde `origen`, hasta encontrar todos los `destinos` (si se dan)
+        y sin pasar de `maximo` pasos. A las habitaciones bloqueadas se puede
+        llegar pero no se sigue por ellas.
+        """
+        pendientes = set(destinos) if destinos is not None else None
+        distancias = {origen: 0}
+        cola = deque([origen])
+        habitaciones = self.mapa.habitaciones
+        while cola:
+            pos = cola.popleft()
+            if pendientes is not None:
+                pendientes.discard(pos)
+                if not pendientes:
+                    break
+            if pos in bloqueadas and pos != origen:
+                continue
+            siguiente = distancias[pos] + 1
+            if maximo is not None and siguiente > maximo:
+                break
+            for vecina in habitaciones[pos].conexiones.values():
+                pos_vecina = (vecina.x, vecina.y)
+                if pos_vecina not in distancias:
+                    distancias[pos_vecina] = siguiente
+                    cola.append(pos_vecina)
+        return distancias
+
+    def _camino(self, inicio: Posicion, paradas: list[Posicion], bloqueadas: set[Posicion]) -> list[Posicion]:
+        camino = [inicio]
+        for destino in paradas:
+            camino.extend(_tramo(self.mapa, camino[-1], destino, bloqueadas)[1:])
+        return camino
+
+    # --- Orden de visita ---
+
+    def _resolver(self, puntos, valores, distancias, pos_jefe, presupuesto, limite) -> PlanRuta:
+        fin = len(puntos) - 1 if pos_jefe is not None else None
+        tesoros = [i for i in range(1, len(puntos)) if i != fin]
+
+        def coste(orden: list[int]) -> int:
+            total, anterior = 0, 0
+            for i in orden:
+                total += distancias[anterior][i]
+                anterior = i
+            return total + (distancias[anterior][fin] if fin is not None else 0)
+
+        orden = None
+        metodo = "heuristico"
+        if len(tesoros) <= self.max_exacto:
+            orden = _held_karp(tesoros, valores, distancias, fin, presupuesto, limite)
+            metodo = "exacto"
+        if orden is None:
+            orden = _vecino_mas_cercano(tesoros, distancias)
+            _dos_opt(orden, distancias, fin, limite)
+            metodo = "heuristico"
+            if presupuesto is not None:
+                _ajustar_a_presupuesto(orden, tesoros, valores, distancias, fin, presupuesto, limite)
+
+        pasos = coste(orden)
+        if not orden and not tesoros:
+            metodo = "vacio"
+        return PlanRuta(
+            paradas=[puntos[i] for i in orden] + ([puntos[fin]] if fin is not None else []),
+            valor=sum(valores[i] for i in orden),
+            pasos=pasos,
+            metodo=metodo,
+            descartados=len(tesoros) - len(orden),
+            dentro_del_presupuesto=presupuesto is None or pasos <= presupuesto,
+        )
+
+
+def _tramo(mapa: "Mapa", inicio: Posicion, fin: Posicion, bloqueadas: set[Posicion]) -> list[Posicion]:
+    """Camino mínimo de `inicio` a `fin` sin atravesar habitaciones bloqueadas."""
+    padres: dict[Posicion, Optional[Posicion]] = {inicio: None}
+    cola = deque([inicio])
+    while cola and fin not in padres:
+        pos = cola.popleft()
+        if pos in bloqueadas and pos != inicio:
+            continue
+        for vecina in mapa.habitaciones[pos].conexiones.values():
+            pos_vecina = (vecina.x, vecina.y)
+            if pos_vecina not in padres:
+                padres[pos_vecina] = pos
+                cola.append(pos_vecina)
+    if fin not in padres:
+        return [inicio]
+    camino = []
+    pos: Optional[Posicion] = fin
+    while pos is not None:
+        camino.append(pos)
+        pos = padres[pos]
+    camino.reverse()
+    return camino
+
+
+def _held_karp(tesoros, valores, distancias, fin, presupuesto, limite) -> Optional[list[int]]:
+    """
+    Programación dinámica sobre subconjuntos: para cada subconjunto y último
+    tesoro, el camino más corto desde el inicio. Retorna el orden del
+    subconjunto de más valor que cabe en el presupuesto (a igual valor, el
+    más corto), o None si se agota el tiempo.
+    """
+    k = len(tesoros)
+    infinito = math.inf
+    # mejor[mascara][j]: distancia mínima visitando `mascara` y acabando en tesoros[j]
+    mejor = [[infinito] * k for _ in range(1 << k)]
+    padre = [[-1] * k for _ in range(1 << k)]
+    for j, t in enumerate(tesoros):
+        mejor[1 << j][j] = distancias[0][t]
+    for mascara in range(1, 1 << k):
+        if time.perf_counter() > limite:
+            return None
+        fila = mejor[mascara]
+        for j in range(k):
+            actual = fila[j]
+            if actual == infinito:
+                continue
+            desde = distancias[tesoros[j]]
+            for siguiente in range(k):
+                bit = 1 << siguiente
+                if mascara & bit:
+                    continue
+                candidato = actual + desde[tesoros[siguiente]]
+                if candidato < mejor[mascara | bit][siguiente]:
+                    mejor[mascara | bit][siguiente] = candidato
+                    padre[mascara | bit][siguiente] = j
+
+    def hasta_fin(i: int) -> int:
+        return distancias[i][fin] if fin is not None else 0
+
+    # Sin tesoros: directo del inicio al final
+    elegido, ultimo = 0, -1
+    mejor_clave = (0, -hasta_fin(0))
+    if presupuesto is not None and hasta_fin(0) > presupuesto:
+        mejor_clave = (-1, -hasta_fin(0))  # Ni siquiera el camino directo cabe
+    for mascara in range(1, 1 << k):
+        valor = sum(valores[tesoros[j]] for j in range(k) if mascara >> j & 1)
+        for j in range(k):
+            total = mejor[mascara][j] + hasta_fin(tesoros[j])
+            if presupuesto is not None and total > presupuesto:
+                continue
+            clave = (valor, -total)
+            if clave > mejor_clave:
+                mejor_clave, elegido, ultimo = clave, mascara, j
+
+    orden = []
+    mascara = elegido
+    while ultimo >= 0:
+        orden.append(tesoros[ultimo])
+        mascara, ultimo = mascara & ~(1 << ultimo), padre[mascara][ultimo]
+    orden.reverse()
+    return orden
+
+
+def _vecino_mas_cercano(tesoros: list[int], distancias) -> list[int]:
+    pendientes = set(tesoros)
+    orden = []
+    actual = 0
+    while pendientes:
+        fila = distancias[actual]
+        actual = min(pendientes, key=lambda t: (fila[t], t))
+        pendientes.remove(actual)
+        orden.append(actual)
+    return orden
+
+
+def _dos_opt(orden: list[int], distancias, fin: Optional[int], limite: float):
+    """Invierte tramos de `orden` (en su sitio) mientras acorten la ruta."""
+    def d(a: Optional[int], b: Optional[int]) -> int:
+        return 0 if a is None or b is None else distancias[a][b]
+
+    n = len(orden)
+    mejora = True
+    while mejora and time.perf_counter() < limite:
+        mejora = False
+        for i in range(n - 1):
+            antes = orden[i - 1] if i > 0 else 0
+            for j in range(i + 1, n):
+                despues = orden[j + 1] if j + 1 < n else fin
+                delta = (d(antes, orden[j]) + d(orden[i], despues)
+                         - d(antes, orden[i]) - d(orden[j], despues))
+                if delta < 0:
+                    orden[i:j + 1] = reversed(orden[i:j + 1])
+                    mejora = True
+            if time.perf_counter() > limite:
+                return
+
+
+def _ajustar_a_presupuesto(orden, tesoros, valores, distancias, fin, presupuesto, limite):
+    """
+    Quita los tesoros que menos valor aportan por paso ahorrado hasta que la
+    ruta cabe y después inserta, donde menos alarguen, los que vuelvan a caber.
+    """
+    def vecinos(posicion: int) -> tuple[int, Optional[int]]:
+        antes = orden[posicion - 1] if posicion > 0 else 0
+        despues = orden[posicion + 1] if posicion + 1 < len(orden) else fin
+        return antes, despues
+
+    def d(a: Optional[int], b: Optional[int]) -> int:
+        return 0 if a is None or b is None else distancias[a][b]
+
+    def coste() -> int:
+        total = 0
+        anterior = 0
+        for i in orden:
+            total += distancias[anterior][i]
+            anterior = i
+        return total + d(anterior, fin)
+
+    total = coste()
+    while total > presupuesto and orden:
+        def rendimiento(posicion: int) -> float:
+            antes, despues = vecinos(posicion)
+            t = orden[posicion]
+            ahorro = d(antes, t) + d(t, despues) - d(antes, despues)
+            return valores[t] / ahorro if ahorro > 0 else math.inf
+        peor = min(range(len(orden)), key=rendimiento)
+        del orden[peor]
+        total = coste()
+    _dos_opt(orden, distancias, fin, limite)
+    total = coste()
+
+    fuera = sorted(set(tesoros) - set(orden), key=lambda t: -valores[t])
+    for t in fuera:
+        if time.perf_counter() > limite:
+            break
+        mejor_extra, mejor_sitio = None, None
+        for sitio in range(len(orden) + 1):
+            antes = orden[sitio - 1] if sitio > 0 else 0
+            despues = orden[sitio] if sitio < len(orden) else fin
+            extra = d(antes, t) + d(t, despues) - d(antes, despues)
+            if mejor_extra is None or extra < mejor_extra:
+                mejor_extra, mejor_sitio = extra, sitio
+        if total + mejor_extra <= presupuesto:
+            orden.insert(mejor_sitio, t)
+            total += mejor_extra
@@ -0,0 +1,283 @@
+"""
+Mapas compartidos como plantillas de solo lectura con estado por jugador.
+
+Varios jugadores pueden recorrer el mismo dungeon sin copiarlo entero: la
+estructura y el contenido inicial viven en una única plantilla (un `Mapa`
+normal que no se modifica) y cada jugador tiene un `MapaJugador` que guarda
+solo lo que ha cambiado (habitaciones visitadas y contenido vaciado o dañado).
+La memoria por jugador es proporcional a las habitaciones que ha tocado.
+
+El estado de un jugador es una pila de capas: `instantanea()` congela los
+cambios hechos hasta ese momento en una capa de solo lectura (O(1)) y los
+siguientes cambios van a una capa nueva encima. Volver a una instantánea o
+abrir otra rama a partir de ella solo descarta o crea la capa superior; las
+capas congeladas se comparten entre todas las ramas.
+"""
+
+import copy
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, TYPE_CHECKING
+from .mapa import Mapa
+from .models import Habitacion
+
+if TYPE_CHECKING:
+    from .contenido import ContenidoHabitacion
+
+# Capas por encima de la cual una instantánea aplana la cadena, para que las
+# lecturas no recorran demasiadas capas
+PROFUNDIDAD_MAXIMA = 32
+_AUSENTE = object()
+
+
+class EstadoJugador:
+    """
+    Capa de cambios de un jugador sobre la plantilla. `padre` es la capa
+    congelada de la última instantánea (compartible entre ramas); las
+    lecturas bajan por la cadena hasta encontrar el valor o llegar a la
+    plantilla.
+    """
+    __slots__ = ("visitadas", "contenidos", "padre", "profundidad")
+
+    def __init__(self, padre: Optional["EstadoJugador"] = None):
+        self.visitadas: dict[tuple[int, int], bool] = {}
+        self.contenidos: dict[tuple[int, int], Optional["ContenidoHabitacion"]] = {}
+        self.padre = padre
+        self.profundidad = padre.profundidad + 1 if padre is not None else 0
+
+    def visitada(self, pos: tuple[int, int], defecto: bool) -> bool:
+        capa = self
+        while capa is not None:
+            valor = capa.visitadas.get(pos)
+            if valor is not None:
+                return valor
+            capa = capa.padre
+        return defecto
+
+    def contenido(self, pos: tuple[int, int], defecto=_AUSENTE):
+        """Contenido propio del jugador en `pos`, o `defecto` si no lo ha tocado."""
+        capa = self
+        while capa is not None:
+            valor = capa.contenidos.get(pos, _AUSENTE)
+            if valor is not _AUSENTE:
+                return valor
+            capa = capa.padre
+        return defecto
+
+    def congelar(self) -> "EstadoJugador":
+        """
+        Mueve los cambios de esta capa a una capa congelada, que pasa a ser
+        su padre, y la retorna. Sin cambios desde la última vez retorna el
+        padre actual, así que tomar instantáneas seguidas no alarga la cadena.
+        """
+        if not self.visitadas and not self.contenidos and self.padre is not None:
+            return self.padre
+        congelada = EstadoJugador(self.padre)
+        congelada.visitadas, self.visitadas = self.visitadas, {}
+        congelada.contenidos, self.contenidos = self.contenidos, {}
+        if congelada.profundidad >= PROFUNDIDAD_MAXIMA:
+            congelada = congelada.aplanar()
+        self.padre = congelada
+        self.profundidad = congelada.profundidad + 1
+        return congelada
+
+    def aplanar(self) -> "EstadoJugador":
+        """Capa única equivalente a toda la cadena (cuesta lo que sumen sus cambios)."""
+        cadena = []
+        capa = self
+        while capa is not None:
+            cadena.append(capa)
+            capa = capa.padre
+        plana = EstadoJugador()
+        for capa in reversed(cadena):
+            plana.visitadas.update(capa.visitadas)
+            plana.contenidos.update(capa.contenidos)
+        return plana
+
+    def restaurar(self, capa: Optional["EstadoJugador"]):
+        """Descarta los cambios de esta capa y la vuelve a apoyar sobre `capa`."""
+        self.visitadas = {}
+        self.contenidos = {}
+        self.padre = capa
+        self.profundidad = capa.profundidad + 1 if capa is not None else 0
+
+    def __len__(self) -> int:
+        posiciones = set()
+        capa = self
+        while capa is not None:
+            posiciones.update(capa.visitadas.keys(), capa.contenidos.keys())
+            capa = capa.padre
+        return len(posiciones)
+
+
+class HabitacionJugador:
+    """
+    Vista ligera de una habitación de la plantilla. Las lecturas consultan
+    primero el estado del jugador; las escrituras solo modifican ese estado.
+    """
+    __slots__ = ("_base", "_estado")
+
+    def __init__(self, base: Habitacion, estado: EstadoJugador):
+        self._base = base
+        self._estado = estado
+
+    @property
+    def id(self) -> int:
+        return self._base.id
+
+    @property
+    def x(self) -> int:
+        return self._base.x
+
+    @property
+    def y(self) -> int:
+        return self._base.y
+
+    @property
+    def inicial(self) -> bool:
+        return self._base.inicial
+
+    @property
+    def visitada(self) -> bool:
+        return self._estado.visitada((self._base.x, self._base.y), self._base.visitada)
+
+    @visitada.setter
+    def visitada(self, valor: bool):
+        self._estado.visitadas[(self._base.x, self._base.y)] = valor
+
+    @property
+    def contenido(self) -> Optional["ContenidoHabitacion"]:
+        return self._estado.contenido((self._base.x, self._base.y), self._base.contenido)
+
+    @contenido.setter
+    def contenido(self, valor: Optional["ContenidoHabitacion"]):
+        self._estado.contenidos[(self._base.x, self._base.y)] = valor
+
+    @property
+    def conexiones(self) -> "ConexionesJugador":
+        return ConexionesJugador(self._base.conexiones, self._estado)
+
+    def __hash__(self):
+        return hash(self._base.id)
+
+    def __eq__(self, otra) -> bool:
+        if not isinstance(otra, HabitacionJugador):
+            return NotImplemented
+        return self._base is otra._base and self._estado is otra._estado
+
+    def __repr__(self) -> str:
+        return f"HabitacionJugador(id={self.id}, x={self.x}, y={self.y}, visitada={self.visitada})"
+
+
+class ConexionesJugador(Mapping):
+    """Conexiones de una habitación que devuelven vistas del mismo jugador."""
+    __slots__ = ("_conexiones", "_estado")
+
+    def __init__(self, conexiones: dict[str, Habitacion], estado: EstadoJugador):
+        self._conexiones = conexiones
+        self._estado = estado
+
+    def __getitem__(self, direccion: str) -> HabitacionJugador:
+        return HabitacionJugador(self._conexiones[direccion], self._estado)
+
+    def __contains__(self, direccion) -> bool:
+        return direccion in self._conexiones
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._conexiones)
+
+    def __len__(self) -> int:
+        return len(self._conexiones)
+
+
+class HabitacionesJugador(Mapping):
+    """Diccionario de habitaciones de solo lectura que devuelve vistas por jugador."""
+    __slots__ = ("_habitaciones", "_estado")
+
+    def __init__(self, habitaciones: dict[tuple[int, int], Habitacion], estado: EstadoJugador):
+        self._habitaciones = habitaciones
+        self._estado = estado
+
+    def __getitem__(self, pos: tuple[int, int]) -> HabitacionJugador:
+        return HabitacionJugador(self._habitaciones[pos], self._estado)
+
+    def __contains__(self, pos) -> bool:
+        return pos in self._habitaciones
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return iter(self._habitaciones)
+
+    def __len__(self) -> int:
+        return len(self._habitaciones)
+
+
+@dataclass
+class MapaJugador(Mapa):
+    """Mapa de un jugador construido sobre una plantilla compartida."""
+    plantilla: Optional[Mapa] = None
+    estado: EstadoJugador = field(default_factory=EstadoJugador, repr=False, compare=False)
+
+    @classmethod
+    def desde_plantilla(cls, plantilla: Mapa, capa: Optional[EstadoJugador] = None) -> "MapaJugador":
+        """Mapa de un jugador nuevo; con `capa` parte del estado de esa instantánea."""
+        estado = EstadoJugador(capa)
+        inicial = plantilla.habitacion_inicial
+        return cls(
+            ancho=plantilla.ancho,
+            alto=plantilla.alto,
+            habitaciones=HabitacionesJugador(plantilla.habitaciones, estado),
+            habitacion_inicial=HabitacionJugador(inicial, estado) if inicial else None,
+            plantilla=plantilla,
+            estado=estado,
+        )
+
+    def tomar_contenido(self, pos: tuple[int, int]) -> Optional["ContenidoHabitacion"]:
+        """
+        Copia el contenido de la plantilla al estado del jugador la primera
+        vez que interactúa con él (copy-on-write), para que el combate no
+        modifique la plantilla compartida. También se copia el contenido de
+        las capas congeladas, que comparten otras ramas.
+        """
+        if pos not in self.habitaciones:
+            return None
+        contenidos = self.estado.contenidos
+        if pos not in contenidos:
+            original = self.estado.contenido(pos, self.plantilla.habitaciones[pos].contenido)
+            contenidos[pos] = copy.copy(original) if original else None
+        return contenidos[pos]
+
+    def instantanea(self) -> EstadoJugador:
+        """Congela el estado actual del jugador en O(1) y retorna su capa."""
+        return self.estado.congelar()
+
+    def restaurar(self, capa: EstadoJugador):
+        """Vuelve al estado de la instantánea `capa`, descartando los cambios posteriores."""
+        self.estado.restaurar(capa)
+        self.version += 1
+
+    def ramificar(self, capa: Optional[EstadoJugador] = None) -> "MapaJugador":
+        """
+        Otro MapaJugador sobre la misma plantilla que parte de la instantánea
+        `capa` (por defecto, del estado actual). Las dos ramas comparten las
+        capas congeladas y cada una escribe en la suya.
+        """
+        if capa is None:
+            capa = self.instantanea()
+        return MapaJugador.desde_plantilla(self.plantilla, capa)
+
+    @property
+    def habitaciones_tocadas(self) -> int:
+        """Número de habitaciones con estado propio del jugador."""
+        return len(self.estado)
+
+    def generar_estructura(self, n_habitaciones: int, *args, **kwargs) -> str:
+        return "Error: la plantilla es de solo lectura"
+
+    def colocar_contenido(self, *args, **kwargs):
+        return "Error: la plantilla es de solo lectura"
+
+    def conectar(self, *args, **kwargs) -> str:
+        return "Error: la plantilla es de solo lectura"
+
+    def desconectar(self, *args, **kwargs) -> str:
+        return "Error: la plantilla es de solo lectura"
@@ -0,0 +1,135 @@
+"""Gestor de partidas guardadas en múltiples ranuras con un índice de metadatos."""
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+from .explorador import Explorador
+from .serializacion import guardar_partida, cargar_partida
+from .utils import calcular_valor_total_inventario, contar_habitaciones_visitadas
+
+ARCHIVO_INDICE = "indice.json"
+
+
+@dataclass
+class MetadatosPartida:
+    """Resumen de una partida guardada, almacenado en el índice."""
+    nombre: str
+    archivo: str
+    fecha: float
+    ancho: int
+    alto: int
+    total_habitaciones: int
+    habitaciones_visitadas: int
+    valor_inventario: int
+    vida: int
+
+    @property
+    def progreso(self) -> float:
+        """Porcentaje de habitaciones visitadas."""
+        if self.total_habitaciones == 0:
+            return 0.0
+        return self.habitaciones_visitadas / self.total_habitaciones * 100
+
+
+class GestorPartidas:
+    """
+    Administra varias ranuras de guardado dentro de un directorio.
+
+    Cada guardado actualiza un pequeño archivo de índice con los metadatos
+    de la partida, de modo que listar las ranuras no requiere abrir ni
+    parsear los archivos de partida.
+    """
+
+    def __init__(self, directorio: str = "partidas", extension: str = ".json.gz"):
+        self.directorio = directorio
+        self.extension = extension
+        self._indice: Optional[dict[str, MetadatosPartida]] = None
+
+    @property
+    def ruta_indice(self) -> str:
+        return os.path.join(self.directorio, ARCHIVO_INDICE)
+
+    def _ruta_ranura(self, nombre: str) -> str:
+        """
+        Construye un nombre de archivo seguro para la ranura. El resumen del
+        nombre exacto evita que dos ranuras ("a b" y "a_b") compartan archivo.
+        """
+        seguro = re.sub(r"[^\w\-]", "_", nombre)[:40] or "partida"
+        resumen = hashlib.sha256(nombre.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directorio, f"{seguro}-{resumen}{self.extension}")
+
+    def _cargar_indice(self) -> dict[str, MetadatosPartida]:
+        if self._indice is None:
+            self._indice = {}
+            try:
+                with open(self.ruta_indice, 'r', encoding='utf-8') as f:
+                    for entrada in json.load(f):
+                        self._indice[entrada["nombre"]] = MetadatosPartida(**entrada)
+            except FileNotFoundError:
+                pass
+        return self._indice
+
+    def _escribir_indice(self):
+        """Escribe el índice de forma atómica (archivo temporal + reemplazo)."""
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = self.ruta_indice + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump([asdict(m) for m in self._cargar_indice().values()],
+                      f, indent=2, ensure_ascii=False)
+        os.replace(temporal, self.ruta_indice)
+
+    def guardar(self, explorador: Explorador, nombre: str) -> str:
+        """Guarda la partida en la ranura indicada y actualiza el índice."""
+        os.makedirs(self.directorio, exist_ok=True)
+        archivo = self._ruta_ranura(nombre)
+        guardar_partida(explorador, archivo)
+
+        habitaciones = explorador.mapa.habitaciones
+        self._cargar_indice()[nombre] = MetadatosPartida(
+            nombre=nombre,
+            archivo=os.path.basename(archivo),
+            fecha=time.time(),
+            ancho=explorador.mapa.ancho,
+            alto=explorador.mapa.alto,
+            total_habitaciones=len(habitaciones),
+            habitaciones_visitadas=contar_habitaciones_visitadas(explorador),
+            valor_inventario=calcular_valor_total_inventario(explorador),
+            vida=explorador.vida,
+        )
+        self._escribir_indice()
+        return f"Partida guardada en la ranura '{nombre}'"
+
+    def cargar(self, nombre: str) -> Optional[Explorador]:
+        """Carga la partida de una ranura. Retorna None si no existe."""
+        metadatos = self._cargar_indice().get(nombre)
+        if metadatos is None:
+            return None
+        return cargar_partida(os.path.join(self.directorio, metadatos.archivo))
+
+    def listar(self, orden: str = "fecha", descendente: bool = True) -> list[MetadatosPartida]:
+        """
+        Lista las ranuras usando solo el índice.
+        `orden` puede ser cualquier campo de MetadatosPartida o 'progreso'.
+        """
+        return sorted(
+            self._cargar_indice().values(),
+            key=lambda m: getattr(m, orden),
+            reverse=descendente
+        )
+
+    def eliminar(self, nombre: str) -> bool:
+        """Elimina una ranura y su entrada del índice."""
+        indice = self._cargar_indice()
+        metadatos = indice.pop(nombre, None)
+        if metadatos is None:
+            return False
+        try:
+            os.remove(os.path.join(self.directorio, metadatos.archivo))
+        except FileNotFoundError:
+            pass
+        self._escribir_indice()
+        return True
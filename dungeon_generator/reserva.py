@@ -0,0 +1,224 @@
+"""
+Reserva de mapas pregenerados: una cola caliente por perfil de tamaño que se
+rellena en segundo plano con un pool de procesos.
+
+Pedir un mapa a la reserva solo saca uno ya construido de la cola, así que
+crear una partida nueva deja de esperar a la generación. Cada vez que se saca
+un mapa se encarga otro; si la cola está vacía (más demanda que procesos) el
+mapa se genera en el momento y cuenta como fallo.
+
+Los procesos devuelven los mapas empaquetados con `empaquetar_mapa` y se
+desempaquetan en el hilo que recibe los resultados, fuera del camino de
+`obtener`.
+
+    with ReservaMapas({"normal": PerfilMapa(10, 10, 20)}, profundidad=16) as reserva:
+        mapa = reserva.obtener("normal")
+        print(reserva.estadisticas())
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from .mapa import Mapa
+from .metricas import contar
+
+PROFUNDIDAD_POR_DEFECTO = 8
+# Entregas recientes con las que se calcula la tasa de relleno
+VENTANA_RELLENO = 100
+
+
+@dataclass(frozen=True)
+class PerfilMapa:
+    """Parámetros de generación de los mapas de una cola."""
+    ancho: int
+    alto: int
+    habitaciones: int
+    motor: str = "caminata"
+    catalogo: Optional[str] = None
+
+
+def _generar_empaquetado(perfil: PerfilMapa, semilla: int) -> bytes:
+    """Genera un mapa del perfil en un proceso del pool y lo retorna empaquetado."""
+    from .lote import generar_mapa
+    from .cache_mapas import empaquetar_mapa
+
+    mapa = generar_mapa(perfil.ancho, perfil.alto, perfil.habitaciones, semilla,
+                        perfil.catalogo, perfil.motor)
+    return empaquetar_mapa(mapa)
+
+
+class _Cola:
+    """Mapas listos de un perfil y sus contadores."""
+    __slots__ = ("perfil", "mapas", "pendientes", "servidos", "fallos", "errores", "entregas")
+
+    def __init__(self, perfil: PerfilMapa):
+        self.perfil = perfil
+        self.mapas: deque[Mapa] = deque()
+        self.pendientes = 0
+        self.servidos = 0
+        self.fallos = 0
+        self.errores = 0
+        self.entregas: deque[float] = deque(maxlen=VENTANA_RELLENO)
+
+    @property
+    def tasa_relleno(self) -> float:
+        """Mapas por segundo que llegaron a la cola en las últimas entregas."""
+        if len(self.entregas) < 2:
+            return 0.0
+        intervalo = self.entregas[-1] - self.entregas[0]
+        return (len(self.entregas) - 1) / intervalo if intervalo > 0 else 0.0
+
+
+class ReservaMapas:
+    """Colas de mapas listos por perfil, rellenadas por procesos en segundo plano."""
+
+    def __init__(self, perfiles: dict[str, PerfilMapa], profundidad: int = PROFUNDIDAD_POR_DEFECTO,
+                 procesos: int = 1):
+        if profundidad < 1:
+            raise ValueError("profundidad debe ser al menos 1")
+        self.profundidad = profundidad
+        self._colas = {nombre: _Cola(perfil) for nombre, perfil in perfiles.items()}
+        self._cerrojo = threading.Lock()
+        # Las semillas salen de otro RNG: generar_mapa reinicia el global
+        self._semillas = random.SystemRandom()
+        self._pool = ProcessPoolExecutor(max_workers=max(1, procesos))
+        self._cerrada = False
+        for nombre in self._colas:
+            self._rellenar(nombre)
+
+    def __enter__(self) -> "ReservaMapas":
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @property
+    def perfiles(self) -> dict[str, PerfilMapa]:
+        return {nombre: cola.perfil for nombre, cola in self._colas.items()}
+
+    def buscar_perfil(self, ancho: int, alto: int, habitaciones: int) -> Optional[str]:
+        """Nombre del primer perfil con esas dimensiones, si existe."""
+        for nombre, cola in self._colas.items():
+            perfil = cola.perfil
+            if (perfil.ancho, perfil.alto, perfil.habitaciones) == (ancho, alto, habitaciones):
+                return nombre
+        return None
+
+    def obtener(self, nombre: str) -> Mapa:
+        """
+        Retorna un mapa nuevo del perfil `nombre`: de la cola si hay alguno
+        listo o, si no, generado en el momento. Lanza KeyError si el perfil
+        no existe y ValueError si sus parámetros no permiten generar el mapa.
+        """
+        cola = self._colas[nombre]
+        with self._cerrojo:
+            mapa = cola.mapas.popleft() if cola.mapas else None
+            if mapa is not None:
+                cola.servidos += 1
+            else:
+                cola.fallos += 1
+        self._rellenar(nombre)
+        if mapa is not None:
+            contar("reserva.servidos")
+            return mapa
+
+        from .lote import generar_mapa
+        contar("reserva.fallos")
+        perfil = cola.perfil
+        return generar_mapa(perfil.ancho, perfil.alto, perfil.habitaciones,
+                            self._semillas.randrange(2**32), perfil.catalogo, perfil.motor)
+
+    def esperar_llena(self, tiempo_maximo: float = 60.0) -> bool:
+        """
+        Espera a que todas las colas estén llenas (sin contar las de perfiles
+        que fallan al generarse). Retorna False si se agota el tiempo.
+        """
+        limite = time.monotonic() + tiempo_maximo
+        while time.monotonic() < limite:
+            with self._cerrojo:
+                if all(len(c.mapas) >= self.profundidad or (c.errores and not c.pendientes)
+                       for c in self._colas.values()):
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def _rellenar(self, nombre: str):
+        """Encarga mapas hasta que la cola más lo pendiente llegue a la profundidad."""
+        cola = self._colas[nombre]
+        with self._cerrojo:
+            if self._cerrada:
+                return
+            faltan = self.profundidad - len(cola.mapas) - cola.pendientes
+            cola.pendientes += max(0, faltan)
+        for encargados in range(faltan):
+            try:
+                futuro = self._pool.submit(_generar_empaquetado, cola.perfil,
+                                           self._semillas.randrange(2**32))
+            except RuntimeError:
+                # Se cerró la reserva mientras tanto
+                with self._cerrojo:
+                    cola.pendientes -= faltan - encargados
+                return
+            futuro.add_done_callback(lambda f, nombre=nombre: self._recibir(nombre, f))
+
+    def _recibir(self, nombre: str, futuro: Future):
+        """Callback del pool: desempaqueta el mapa y lo añade a su cola."""
+        from .cache_mapas import desempaquetar_mapa
+
+        cola = self._colas[nombre]
+        try:
+            if futuro.cancelled():
+                raise RuntimeError("encargo cancelado")
+            mapa = desempaquetar_mapa(futuro.result())
+        except Exception:
+            # Perfil imposible o pool cerrado: no se vuelve a encargar
+            with self._cerrojo:
+                cola.pendientes -= 1
+                cola.errores += 1
+            return
+        with self._cerrojo:
+            cola.pendientes -= 1
+            cola.mapas.append(mapa)
+            cola.entregas.append(time.monotonic())
+        self._rellenar(nombre)
+
+    def estadisticas(self) -> dict[str, dict]:
+        with self._cerrojo:
+            return {
+                nombre: {
+                    "profundidad": len(cola.mapas),
+                    "pendientes": cola.pendientes,
+                    "servidos": cola.servidos,
+                    "fallos": cola.fallos,
+                    "errores": cola.errores,
+                    "relleno_por_segundo": round(cola.tasa_relleno, 2),
+                }
+                for nombre, cola in self._colas.items()
+            }
+
+    def a_prometheus(self, prefijo: str = "dungeon") -> str:
+        """Estado de las colas en el formato de texto de Prometheus."""
+        metricas = (
+            ("reserva_profundidad", "gauge", "profundidad"),
+            ("reserva_pendientes", "gauge", "pendientes"),
+            ("reserva_relleno_por_segundo", "gauge", "relleno_por_segundo"),
+            ("reserva_servidos_total", "counter", "servidos"),
+            ("reserva_fallos_total", "counter", "fallos"),
+        )
+        estadisticas = self.estadisticas()
+        lineas = []
+        for metrica, tipo, clave in metricas:
+            lineas.append(f"# TYPE {prefijo}_{metrica} {tipo}")
+            for nombre, valores in estadisticas.items():
+                lineas.append(f'{prefijo}_{metrica}{{perfil="{nombre}"}} {valores[clave]}')
+        return "\n".join(lineas) + "\n"
+
+    def cerrar(self):
+        """Detiene el relleno y libera los procesos (los mapas en cola se descartan)."""
+        with self._cerrojo:
+            self._cerrada = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,344 @@
+"""
+Caminos en mapas muy grandes con búsqueda jerárquica (al estilo de HPA*).
+
+La rejilla se divide en bloques de `tamano_bloque` x `tamano_bloque` casillas.
+Cada pasillo que cruza el borde entre dos bloques es una entrada; las
+entradas contiguas de un mismo borde se agrupan y solo el centro del grupo
+(o sus dos extremos, si es largo) queda como portal. El grafo abstracto une
+los portales por su pasillo entre bloques (coste 1) y por su distancia BFS
+dentro de cada bloque.
+
+Una consulta busca primero en el grafo abstracto (A* con distancia
+Manhattan) y después refina cada tramo con un BFS limitado a un bloque, así
+que solo recorre las habitaciones de los bloques del camino elegido. El
+camino es válido pero puede ser algo más largo que el mínimo. Si el grafo
+abstracto no encuentra ruta (una habitación que dentro de su bloque no llega
+a ningún portal elegido), se recurre al BFS de `generar_camino_minimo`.
+
+Los datos de cada bloque se calculan la primera vez que se usan y se
+descartan cuando cambian los pasillos de alguna de sus habitaciones:
+`Mapa.conectar` y `Mapa.desconectar` avisan a los observadores y el índice
+compara la máscara de pasillos que guardó de esa habitación. Si se modifica
+`conexiones` a mano hay que llamar a `invalidar`.
+
+    rutas = RutasJerarquicas(mapa)
+    camino = rutas.camino((0, 0), (900, 850))
+"""
+
+import heapq
+from collections import deque
+from typing import TYPE_CHECKING, Iterable, Optional
+from .metricas import medir, contar
+
+if TYPE_CHECKING:
+    from .mapa import Mapa
+
+Posicion = tuple[int, int]
+Bloque = tuple[int, int]
+
+TAMANO_BLOQUE_POR_DEFECTO = 16
+# Los grupos de entradas contiguas de este largo o más aportan dos portales
+LARGO_ENTRADA_DOBLE = 6
+
+_BITS_DIRECCION = {"norte": 1, "sur": 2, "este": 4, "oeste": 8}
+_SIN_MASCARA = 0xFF  # Habitación de la que no depende ningún dato calculado
+
+
+class RutasJerarquicas:
+    """Índice jerárquico de caminos sobre un mapa, calculado por bloques bajo demanda."""
+
+    def __init__(self, mapa: "Mapa", tamano_bloque: int = TAMANO_BLOQUE_POR_DEFECTO,
+                 observar: bool = True):
+        if tamano_bloque < 2:
+            raise ValueError("tamano_bloque debe ser al menos 2")
+        self.mapa = mapa
+        self.tamano_bloque = tamano_bloque
+        # Portales de cada borde: ("E", cx, cy) separa (cx, cy) de (cx + 1, cy)
+        # y ("S", cx, cy) separa (cx, cy) de (cx, cy + 1)
+        self._bordes: dict[tuple[str, int, int], list[tuple[Posicion, Posicion]]] = {}
+        # Portal -> portales vecinos al otro lado del borde, por bloque
+        self._portales: dict[Bloque, dict[Posicion, list[Posicion]]] = {}
+        # Portal -> [(otro portal del bloque, distancia)], por bloque
+        self._aristas: dict[Bloque, dict[Posicion, list[tuple[Posicion, int]]]] = {}
+        # Máscara de pasillos de cada habitación leída al calcular algún bloque
+        self._mascaras = bytearray([_SIN_MASCARA]) * (mapa.ancho * mapa.alto)
+        if observar:
+            mapa.registrar_observador(self._al_cambiar)
+
+    # --- Consultas ---
+
+    @medir("rutas.camino")
+    def camino(self, inicio: Posicion, fin: Posicion) -> list[Posicion]:
+        """
+        Retorna un camino de `inicio` a `fin` (ambos incluidos) o una lista
+        vacía si no existe.
+        """
+        habitaciones = self.mapa.habitaciones
+        if inicio not in habitaciones or fin not in habitaciones:
+            return []
+        if inicio == fin:
+            return [inicio]
+
+        # Enlaces provisionales de inicio y fin con los portales de su bloque
+        bloque_inicio, bloque_fin = self._bloque(inicio), self._bloque(fin)
+        distancias = self._distancias_en_bloque(inicio, bloque_inicio)
+        desde_inicio = [(p, distancias[p]) for p in self._portales_de(bloque_inicio) if p in distancias]
+        if fin in distancias:
+            desde_inicio.append((fin, distancias[fin]))
+        distancias = self._distancias_en_bloque(fin, bloque_fin)
+        hacia_fin = {p: distancias[p] for p in self._portales_de(bloque_fin) if p in distancias}
+
+        abstracto = self._buscar_abstracto(inicio, fin, desde_inicio, hacia_fin)
+        if abstracto is None:
+            from .utils import generar_camino_minimo
+            contar("rutas.recurso_bfs")
+            return generar_camino_minimo(self.mapa, inicio, fin)
+        return self._refinar(abstracto)
+
+    def distancia(self, inicio: Posicion, fin: Posicion) -> Optional[int]:
+        """Número de pasos del camino encontrado, o None si no hay camino."""
+        camino = self.camino(inicio, fin)
+        return len(camino) - 1 if camino else None
+
+    def precalcular(self) -> int:
+        """Calcula todos los bloques de una vez. Retorna el número de portales."""
+        t = self.tamano_bloque
+        for cy in range((self.mapa.alto + t - 1) // t):
+            for cx in range((self.mapa.ancho + t - 1) // t):
+                self._aristas_de((cx, cy))
+        return sum(len(portales) for portales in self._portales.values())
+
+    def estadisticas(self) -> dict:
+        return {
+            "tamano_bloque": self.tamano_bloque,
+            "bloques_calculados": len(self._aristas),
+            "portales": sum(len(portales) for portales in self._portales.values()),
+            "aristas": sum(len(v) for aristas in self._aristas.values() for v in aristas.values()),
+        }
+
+    # --- Invalidación ---
+
+    def invalidar(self, pos: Posicion):
+        """Descarta los datos que dependen de los pasillos de la habitación en `pos`."""
+        cx, cy = self._bloque(pos)
+        for clave in (("E", cx, cy), ("E", cx - 1, cy), ("S", cx, cy), ("S", cx, cy - 1)):
+            self._bordes.pop(clave, None)
+        # Los portales (y con ellos las aristas) de los vecinos salen de los bordes comunes
+        for bloque in ((cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+            self._portales.pop(bloque, None)
+            self._aristas.pop(bloque, None)
+        x, y = pos
+        if 0 <= x < self.mapa.ancho and 0 <= y < self.mapa.alto:
+            self._mascaras[y * self.mapa.ancho + x] = _SIN_MASCARA
+        contar("rutas.invalidaciones")
+
+    def _al_cambiar(self, pos: Posicion):
+        """Observador del mapa: invalida solo si cambiaron los pasillos de `pos`."""
+        x, y = pos
+        if not (0 <= x < self.mapa.ancho and 0 <= y < self.mapa.alto):
+            return
+        guardada = self._mascaras[y * self.mapa.ancho + x]
+        if guardada != _SIN_MASCARA and guardada != self._mascara(pos):
+            self.invalidar(pos)
+
+    def _mascara(self, pos: Posicion) -> int:
+        hab = self.mapa.habitaciones.get(pos)
+        if hab is None:
+            return 0
+        mascara = 0
+        for direccion in hab.conexiones:
+            mascara |= _BITS_DIRECCION[direccion]
+        return mascara
+
+    def _recordar(self, posiciones: Iterable[Posicion]):
+        ancho = self.mapa.ancho
+        for pos in posiciones:
+            self._mascaras[pos[1] * ancho + pos[0]] = self._mascara(pos)
+
+    # --- Bloques ---
+
+    def _bloque(self, pos: Posicion) -> Bloque:
+        return pos[0] // self.tamano_bloque, pos[1] // self.tamano_bloque
+
+    def _borde(self, lado: str, cx: int, cy: int) -> list[tuple[Posicion, Posicion]]:
+        """Portales del borde este o sur del bloque (cx, cy): pares (dentro, fuera)."""
+        clave = (lado, cx, cy)
+        portales = self._bordes.get(clave)
+        if portales is not None:
+            return portales
+
+        t = self.tamano_bloque
+        portales = []
+        if cx >= 0 and cy >= 0:
+            if lado == "E":
+                x = cx * t + t - 1
+                celdas = [(x, y) for y in range(cy * t, min(cy * t + t, self.mapa.alto))]
+                direccion = "este"
+            else:
+                y = cy * t + t - 1
+                celdas = [(x, y) for x in range(cx * t, min(cx * t + t, self.mapa.ancho))]
+                direccion = "sur"
+            habitaciones = self.mapa.habitaciones
+            leidas = []
+            grupo: list[tuple[Posicion, Posicion]] = []
+            for pos in celdas:
+                hab = habitaciones.get(pos)
+                vecina = hab.conexiones.get(direccion) if hab is not None else None
+                if hab is not None:
+                    leidas.append(pos)
+                if vecina is not None:
+                    grupo.append((pos, (vecina.x, vecina.y)))
+                elif grupo:
+                    _elegir_portales(grupo, portales)
+                    grupo = []
+            if grupo:
+                _elegir_portales(grupo, portales)
+            self._recordar(leidas)
+        self._bordes[clave] = portales
+        return portales
+
+    def _portales_de(self, bloque: Bloque) -> dict[Posicion, list[Posicion]]:
+        """Portales del bloque con sus vecinos en los bloques contiguos."""
+        portales = self._portales.get(bloque)
+        if portales is not None:
+            return portales
+
+        cx, cy = bloque
+        portales = {}
+        for lado, bx, by, propio in (("E", cx, cy, 0), ("S", cx, cy, 0),
+                                     ("E", cx - 1, cy, 1), ("S", cx, cy - 1, 1)):
+            for par in self._borde(lado, bx, by):
+                portales.setdefault(par[propio], []).append(par[1 - propio])
+        self._portales[bloque] = portales
+        return portales
+
+    def _aristas_de(self, bloque: Bloque) -> dict[Posicion, list[tuple[Posicion, int]]]:
+        """Distancias dentro del bloque entre cada par de portales que se alcanzan."""
+        aristas = self._aristas.get(bloque)
+        if aristas is not None:
+            return aristas
+
+        portales = self._portales_de(bloque)
+        aristas = {}
+        for portal in portales:
+            distancias = self._distancias_en_bloque(portal, bloque)
+            aristas[portal] = [(p, distancias[p]) for p in portales if p != portal and p in distancias]
+            self._recordar(distancias)
+        self._aristas[bloque] = aristas
+        return aristas
+
+    def _limites(self, bloque: Bloque) -> tuple[int, int, int, int]:
+        t = self.tamano_bloque
+        return bloque[0] * t, bloque[1] * t, bloque[0] * t + t, bloque[1] * t + t
+
+    def _distancias_en_bloque(self, origen: Posicion, bloque: Bloque) -> dict[Posicion, int]:
+        """BFS desde `origen` sin salir del bloque."""
+        x0, y0, x1, y1 = self._limites(bloque)
+        habitaciones = self.mapa.habitaciones
+        distancias = {origen: 0}
+        cola = deque([origen])
+        while cola:
+            pos = cola.popleft()
+            siguiente = distancias[pos] + 1
+            for vecina in habitaciones[pos].conexiones.values():
+                pos_vecina = (vecina.x, vecina.y)
+                if (x0 <= vecina.x < x1 and y0 <= vecina.y < y1
+                        and pos_vecina not in distancias):
+                    distancias[pos_vecina] = siguiente
+                    cola.append(pos_vecina)
+        return distancias
+
+    def _camino_en_bloque(self, inicio: Posicion, fin: Posicion, bloque: Bloque) -> list[Posicion]:
+        """Camino mínimo de `inicio` a `fin` sin salir del bloque."""
+        x0, y0, x1, y1 = self._limites(bloque)
+        habitaciones = self.mapa.habitaciones
+        padres: dict[Posicion, Optional[Posicion]] = {inicio: None}
+        cola = deque([inicio])
+        while cola and fin not in padres:
+            pos = cola.popleft()
+            for vecina in habitaciones[pos].conexiones.values():
+                pos_vecina = (vecina.x, vecina.y)
+                if (x0 <= vecina.x < x1 and y0 <= vecina.y < y1
+                        and pos_vecina not in padres):
+                    padres[pos_vecina] = pos
+                    cola.append(pos_vecina)
+        return _reconstruir(padres, fin)
+
+    # --- Búsqueda ---
+
+    def _buscar_abstracto(self, inicio: Posicion, fin: Posicion,
+                          desde_inicio: list[tuple[Posicion, int]],
+                          hacia_fin: dict[Posicion, int]) -> Optional[list[Posicion]]:
+        """A* sobre los portales. Retorna los nodos del camino abstracto o None."""
+        fx, fy = fin
+        costes = {inicio: 0}
+        padres: dict[Posicion, Optional[Posicion]] = {inicio: None}
+        abiertos = [(abs(inicio[0] - fx) + abs(inicio[1] - fy), 0, inicio)]
+        while abiertos:
+            _, coste, pos = heapq.heappop(abiertos)
+            if pos == fin:
+                return _reconstruir(padres, fin)
+            if coste > costes[pos]:
+                continue
+
+            bloque = self._bloque(pos)
+            vecinos = [(p, 1) for p in self._portales_de(bloque).get(pos, ())]
+            vecinos.extend(self._aristas_de(bloque).get(pos, ()))
+            if pos == inicio:
+                vecinos.extend(desde_inicio)
+            if pos in hacia_fin:
+                vecinos.append((fin, hacia_fin[pos]))
+
+            for vecino, paso in vecinos:
+                nuevo = coste + paso
+                if nuevo < costes.get(vecino, nuevo + 1):
+                    costes[vecino] = nuevo
+                    padres[vecino] = pos
+                    estimado = nuevo + abs(vecino[0] - fx) + abs(vecino[1] - fy)
+                    heapq.heappush(abiertos, (estimado, nuevo, vecino))
+        return None
+
+    def _refinar(self, abstracto: list[Posicion]) -> list[Posicion]:
+        """Sustituye cada tramo dentro de un bloque por su camino real."""
+        camino = [abstracto[0]]
+        for anterior, siguiente in zip(abstracto, abstracto[1:]):
+            bloque = self._bloque(anterior)
+            if bloque == self._bloque(siguiente):
+                camino.extend(self._camino_en_bloque(anterior, siguiente, bloque)[1:])
+            else:
+                camino.append(siguiente)  # Pasillo entre bloques
+        return _quitar_ciclos(camino)
+
+
+def _elegir_portales(grupo: list[tuple[Posicion, Posicion]], portales: list):
+    if len(grupo) < LARGO_ENTRADA_DOBLE:
+        portales.append(grupo[len(grupo) // 2])
+    else:
+        portales.append(grupo[0])
+        portales.append(grupo[-1])
+
+
+def _reconstruir(padres: dict[Posicion, Optional[Posicion]], fin: Posicion) -> list[Posicion]:
+    if fin not in padres:
+        return []
+    camino = []
+    pos: Optional[Posicion] = fin
+    while pos is not None:
+        camino.append(pos)
+        pos = padres[pos]
+    camino.reverse()
+    return camino
+
+
+def _quitar_ciclos(camino: list[Posicion]) -> list[Posicion]:
+    """Quita los bucles que aparecen cuando dos tramos refinados se solapan."""
+    indices: dict[Posicion, int] = {}
+    resultado: list[Posicion] = []
+    for pos in camino:
+        if pos in indices:
+            del resultado[indices[pos] + 1:]
+            indices = {p: i for i, p in enumerate(resultado)}
+        else:
+            indices[pos] = len(resultado)
+            resultado.append(pos)
+    return resultado
@@ -1,15 +1,92 @@
 """Módulo para serializar y deserializar el estado del juego."""
 
+import importlib
+import io
 import json
-from typing import Optional
+from typing import IO, Optional
 from .models import Habitacion, Objeto
 from .contenido import Tesoro, Monstruo, Jefe, Evento
 from .mapa import Mapa
 from .explorador import Explorador
+from .visitas import RegistroVisitas
+from .metricas import medir
 
 
-def guardar_partida(explorador: Explorador, archivo: str = "partida.json") -> str:
-    """Guarda el estado actual del juego en un archivo JSON."""
+# Códecs de compresión soportados (módulos de la librería estándar, que
+# se importan solo cuando se usan)
+CODECS = {
+    "gzip": "gzip",
+    "bz2": "bz2",
+    "lzma": "lzma",
+}
+
+# Extensión del archivo -> códec
+EXTENSIONES_CODEC = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+}
+
+# Cabeceras (magic bytes) para detectar el códec al cargar
+_CABECERAS_CODEC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "lzma"),
+)
+
+
+def detectar_codec(archivo: str) -> Optional[str]:
+    """Deduce el códec de compresión a partir de la extensión del archivo."""
+    nombre = archivo.lower()
+    for extension, codec in EXTENSIONES_CODEC.items():
+        if nombre.endswith(extension):
+            return codec
+    return None
+
+
+def _codec_por_cabecera(archivo: str) -> Optional[str]:
+    """Deduce el códec leyendo los primeros bytes del archivo."""
+    with open(archivo, 'rb') as f:
+        cabecera = f.read(6)
+    for magic, codec in _CABECERAS_CODEC:
+        if cabecera.startswith(magic):
+            return codec
+    return None
+
+
+def _abrir(archivo: str, modo: str, codec: Optional[str], nivel: Optional[int] = None) -> IO[str]:
+    """Abre el archivo en modo texto, comprimiendo/descomprimiendo al vuelo."""
+    if codec is None:
+        return open(archivo, modo, encoding='utf-8')
+    if codec not in CODECS:
+        raise ValueError(f"Códec desconocido: {codec}. Opciones: {', '.join(CODECS)}")
+    
+    kwargs = {}
+    if 'w' in modo and nivel is not None:
+        kwargs["preset" if codec == "lzma" else "compresslevel"] = nivel
+    modulo = importlib.import_module(CODECS[codec])
+    binario = modulo.open(archivo, modo.replace('t', '') + 'b', **kwargs)
+    return io.TextIOWrapper(binario, encoding='utf-8')
+
+
+@medir("serializacion.guardar_partida")
+def guardar_partida(
+    explorador: Explorador,
+    archivo: str = "partida.json",
+    codec: Optional[str] = None,
+    nivel: Optional[int] = None
+) -> str:
+    """
+    Guarda el estado actual del juego en un archivo JSON.
+    
+    Si `codec` no se indica se deduce de la extensión (.gz, .bz2, .xz/.lzma).
+    Los archivos comprimidos se escriben en streaming y sin indentación.
+    """
+    if codec is None:
+        codec = detectar_codec(archivo)
+
     datos = {
         "explorador": {
             "vida": explorador.vida,
@@ -18,7 +95,8 @@ def guardar_partida(explorador: Explorador, archivo: str = "partida.json") -> st
             "inventario": [
                 {"nombre": obj.nombre, "descripcion": obj.descripcion, "valor": obj.valor}
                 for obj in explorador.inventario
-            ]
+            ],
+            "visitas": explorador.visitas.a_hex() if explorador.visitas is not None else None
         },
         "mapa": {
             "ancho": explorador.mapa.ancho,
@@ -84,16 +162,27 @@ def guardar_partida(explorador: Explorador, archivo: str = "partida.json") -> st
         
         datos["mapa"]["habitaciones"].append(hab_datos)
     
-    with open(archivo, 'w', encoding='utf-8') as f:
-        json.dump(datos, f, indent=2, ensure_ascii=False)
+    with _abrir(archivo, 'w', codec, nivel) as f:
+        if codec is None:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+        else:
+            json.dump(datos, f, separators=(',', ':'), ensure_ascii=False)
     
     return f"Partida guardada en {archivo}"
 
 
-def cargar_partida(archivo: str = "partida.json") -> Optional[Explorador]:
-    """Carga una partida guardada desde un archivo JSON."""
+@medir("serializacion.cargar_partida")
+def cargar_partida(archivo: str = "partida.json", codec: Optional[str] = None) -> Optional[Explorador]:
+    """
+    Carga una partida guardada desde un archivo JSON.
+    
+    Los archivos comprimidos se detectan por su cabecera, aunque también
+    puede forzarse el códec con el parámetro `codec`.
+    """
     try:
-        with open(archivo, 'r', encoding='utf-8') as f:
+        if codec is None:
+            codec = _codec_por_cabecera(archivo)
+        with _abrir(archivo, 'r', codec) as f:
             datos = json.load(f)
         
         # Crear el mapa
@@ -173,6 +262,8 @@ def cargar_partida(archivo: str = "partida.json") -> Optional[Explorador]:
             mapa=mapa,
             inventario=[Objeto(**obj) for obj in datos["explorador"]["inventario"]]
         )
+        if datos["explorador"].get("visitas") is not None:
+            explorador.visitas = RegistroVisitas.desde_hex(datos["explorador"]["visitas"])
         
         return explorador
         
@@ -1,7 +1,11 @@
 """Utilidades y funciones auxiliares para el dungeon generator."""
 
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, Optional, Union
 from collections import deque
+from dataclasses import dataclass, field
+import io
+import time
+from .metricas import medir, contar
 
 if TYPE_CHECKING:
     from .mapa import Mapa
@@ -12,22 +16,21 @@ if TYPE_CHECKING:
 
 def generar_monstruos_desde_yaml(archivo: str) -> list["Monstruo"]:
     """
-    Genera una lista de monstruos desde un archivo YAML.
-    Nota: Esta es una función de ejemplo. Requiere PyYAML instalado.
+    Genera una lista de monstruos desde un catálogo YAML (ver catalogo.py),
+    uno por cada tipo de monstruo con sus estadísticas base.
+    El catálogo compilado se cachea junto al archivo.
     """
     from .contenido import Monstruo
+    from .catalogo import cargar_catalogo
     
-    monstruos_predefinidos = [
-        Monstruo(id=1, nombre="Goblin", vida=15, dano=3),
-        Monstruo(id=2, nombre="Orco", vida=25, dano=5),
-        Monstruo(id=3, nombre="Esqueleto", vida=20, dano=4),
-        Monstruo(id=4, nombre="Zombi", vida=30, dano=6),
-        Monstruo(id=5, nombre="Araña Gigante", vida=18, dano=4),
+    catalogo = cargar_catalogo(archivo)
+    return [
+        Monstruo(id=i, nombre=plantilla.nombre, vida=plantilla.vida_min, dano=plantilla.dano_min)
+        for i, plantilla in enumerate(catalogo.monstruos, 1)
     ]
-    
-    return monstruos_predefinidos
 
 
+@medir("utils.mostrar_mapa_simple")
 def mostrar_mapa_simple(mapa: "Mapa", explorador: "Explorador" = None) -> str:
     """
     Genera una representación simple del mapa en formato texto.
@@ -65,6 +68,86 @@ def mostrar_mapa_simple(mapa: "Mapa", explorador: "Explorador" = None) -> str:
     return "\n".join(lineas) + leyenda
 
 
+# Tabla tipo de contenido -> glifo ASCII (un byte) usada por exportar_mapa_texto
+GLIFOS_ASCII = {
+    "Jefe Final": ord("J"),
+    "Monstruo": ord("M"),
+    "Cofre del Tesoro": ord("T"),
+    "Evento": ord("!"),
+}
+GLIFO_VACIO = ord(".")
+GLIFO_ENTRADA = ord("E")
+GLIFO_EXPLORADOR = ord("@")
+FILAS_POR_BLOQUE = 256
+
+
+def exportar_mapa_texto(
+    mapa: "Mapa",
+    destino: Union[str, IO, None] = None,
+    explorador: "Explorador" = None,
+    compacto: bool = False
+) -> Optional[str]:
+    """
+    Exporta el mapa como texto ASCII, pensado para mapas muy grandes.
+    
+    Rellena un búfer de bytes preasignado recorriendo solo las habitaciones
+    existentes. Con `compacto=True` usa un carácter por celda (útil para
+    diffs y archivado); si no, usa el mismo formato de 3 caracteres que
+    `mostrar_mapa_simple` (con '.' para las vacías).
+    
+    Si `destino` es una ruta o un archivo, el resultado se escribe por
+    bloques de filas y se retorna None; si no, se retorna el texto.
+    """
+    ancho_celda = 1 if compacto else 3
+    margen = 0 if compacto else 1
+    ancho_fila = mapa.ancho * ancho_celda + 1
+    
+    buffer = bytearray(b" ") * (ancho_fila * mapa.alto)
+    buffer[ancho_fila - 1::ancho_fila] = b"\n" * mapa.alto
+    
+    for (x, y), hab in mapa.habitaciones.items():
+        if hab.inicial:
+            glifo = GLIFO_ENTRADA
+        elif hab.contenido:
+            glifo = GLIFOS_ASCII.get(hab.contenido.tipo, GLIFO_VACIO)
+        else:
+            glifo = GLIFO_VACIO
+        buffer[y * ancho_fila + x * ancho_celda + margen] = glifo
+    
+    if explorador and explorador.posicion in mapa.habitaciones:
+        x, y = explorador.posicion
+        buffer[y * ancho_fila + x * ancho_celda + margen] = GLIFO_EXPLORADOR
+    
+    if destino is None:
+        return buffer.decode("ascii")
+    
+    if isinstance(destino, str):
+        with open(destino, "wb") as f:
+            _escribir_por_bloques(buffer, ancho_fila, f)
+    else:
+        _escribir_por_bloques(buffer, ancho_fila, destino)
+    return None
+
+
+def _escribir_por_bloques(buffer: bytearray, ancho_fila: int, destino: IO):
+    """Escribe el búfer en bloques de filas, sin copiarlo entero a un str."""
+    vista = memoryview(buffer)
+    texto = isinstance(destino, io.TextIOBase)
+    paso = ancho_fila * FILAS_POR_BLOQUE
+    for inicio in range(0, len(buffer), paso):
+        bloque = vista[inicio:inicio + paso]
+        destino.write(str(bloque, "ascii") if texto else bloque)
+
+
+def calcular_percentil(valores: list[float], p: float) -> float:
+    """Percentil `p` (0-100) por el método del rango más cercano."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
 def calcular_valor_total_inventario(explorador: "Explorador") -> int:
     """Calcula el valor total de todos los objetos en el inventario."""
     return sum(obj.valor for obj in explorador.inventario)
@@ -106,6 +189,7 @@ def contar_habitaciones_por_tipo(mapa: "Mapa") -> dict[str, int]:
     return conteo
 
 
+@medir("bfs.verificar_conectividad")
 def verificar_conectividad_mapa(mapa: "Mapa") -> bool:
     """
     Verifica si todas las habitaciones del mapa están conectadas
@@ -130,9 +214,11 @@ def verificar_conectividad_mapa(mapa: "Mapa") -> bool:
                 visitadas.add(pos_vecina)
                 cola.append(hab_vecina)
     
+    contar("bfs.nodos_visitados", len(visitadas))
     return len(visitadas) == len(mapa.habitaciones)
 
 
+@medir("bfs.camino_minimo")
 def generar_camino_minimo(mapa: "Mapa", inicio: tuple[int, int], fin: tuple[int, int]) -> list[tuple[int, int]]:
     """
     Genera el camino más corto entre dos habitaciones usando BFS.
@@ -164,6 +250,207 @@ def generar_camino_minimo(mapa: "Mapa", inicio: tuple[int, int], fin: tuple[int,
     return []
 
 
+# Tandas de orígenes por proceso al repartir un lote en un pool
+TANDAS_POR_PROCESO = 4
+
+
+@dataclass
+class ResultadoConsultas:
+    """Respuestas de un lote de consultas, en el mismo orden que las consultas."""
+    resultados: list = field(default_factory=list)
+    recorridos: int = 0
+    segundos: float = 0.0
+
+    @property
+    def consultas_por_segundo(self) -> float:
+        if self.segundos == 0:
+            return 0.0
+        return len(self.resultados) / self.segundos
+
+
+def _grafo_indexado(mapa: "Mapa") -> tuple[list[tuple[int, int]], dict[tuple[int, int], int], list[list[int]]]:
+    """Posiciones, índice por posición y listas de adyacencia por índice."""
+    posiciones = list(mapa.habitaciones)
+    indice = {pos: i for i, pos in enumerate(posiciones)}
+    adyacencia = [
+        [indice[(vecina.x, vecina.y)] for vecina in hab.conexiones.values()]
+        for hab in mapa.habitaciones.values()
+    ]
+    return posiciones, indice, adyacencia
+
+
+def _agrupar_consultas(
+    indice: dict[tuple[int, int], int],
+    consultas: list[tuple[tuple[int, int], tuple[int, int]]]
+) -> tuple[dict[int, list[tuple[int, int]]], bool]:
+    """
+    Agrupa las consultas válidas por origen: {origen: [(destino, n_consulta)]}.
+    Los pasillos van en ambos sentidos, así que si hay menos destinos
+    distintos que orígenes se agrupa por destino (y se indica con True) para
+    hacer menos recorridos.
+    """
+    pares = [
+        (n, indice[a], indice[b]) for n, (a, b) in enumerate(consultas)
+        if a in indice and b in indice
+    ]
+    invertido = len({b for _, _, b in pares}) < len({a for _, a, _ in pares})
+    grupos: dict[int, list[tuple[int, int]]] = {}
+    for n, a, b in pares:
+        if invertido:
+            a, b = b, a
+        grupos.setdefault(a, []).append((b, n))
+    return grupos, invertido
+
+
+def _caminos_desde(adyacencia: list[list[int]], origen: int,
+                   destinos: list[tuple[int, int]]) -> list[tuple[int, list[int]]]:
+    """BFS desde `origen` que para al alcanzar todos los destinos del grupo."""
+    padres = {origen: -1}
+    faltan = {d for d, _ in destinos} - {origen}
+    cola = deque([origen])
+    while cola and faltan:
+        actual = cola.popleft()
+        for vecina in adyacencia[actual]:
+            if vecina not in padres:
+                padres[vecina] = actual
+                faltan.discard(vecina)
+                cola.append(vecina)
+
+    respuestas = []
+    for destino, n in destinos:
+        camino = []
+        if destino in padres:
+            nodo = destino
+            while nodo != -1:
+                camino.append(nodo)
+                nodo = padres[nodo]
+            camino.reverse()
+        respuestas.append((n, camino))
+    return respuestas
+
+
+def _distancias_desde(adyacencia: list[list[int]], origen: int,
+                      destinos: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """BFS por niveles desde `origen`, sin padres, hasta alcanzar todos los destinos."""
+    esperando: dict[int, list[int]] = {}
+    for destino, n in destinos:
+        esperando.setdefault(destino, []).append(n)
+    respuestas = [(n, 0) for n in esperando.pop(origen, ())]
+    vistos = {origen}
+    frontera = [origen]
+    nivel = 0
+    while frontera and esperando:
+        nivel += 1
+        siguiente = []
+        for nodo in frontera:
+            for vecina in adyacencia[nodo]:
+                if vecina not in vistos:
+                    vistos.add(vecina)
+                    siguiente.append(vecina)
+                    alcanzadas = esperando.pop(vecina, None)
+                    if alcanzadas:
+                        respuestas.extend((n, nivel) for n in alcanzadas)
+        frontera = siguiente
+    return respuestas
+
+
+# Grafo del mapa en cada proceso del pool (se envía una vez, al crearlo)
+# Solo la usan los procesos del pool; en el propio proceso la adyacencia se
+# pasa como argumento para que varios hilos puedan consultar a la vez
+_ADYACENCIA_TRABAJADOR: list[list[int]] = []
+
+
+def _iniciar_trabajador(adyacencia: list[list[int]]):
+    global _ADYACENCIA_TRABAJADOR
+    _ADYACENCIA_TRABAJADOR = adyacencia
+
+
+def _trabajo_caminos(grupos: list[tuple[int, list[tuple[int, int]]]],
+                     adyacencia: Optional[list[list[int]]] = None) -> list[tuple[int, list[int]]]:
+    if adyacencia is None:
+        adyacencia = _ADYACENCIA_TRABAJADOR
+    respuestas = []
+    for origen, destinos in grupos:
+        respuestas.extend(_caminos_desde(adyacencia, origen, destinos))
+    return respuestas
+
+
+def _trabajo_distancias(grupos: list[tuple[int, list[tuple[int, int]]]],
+                        adyacencia: Optional[list[list[int]]] = None) -> list[tuple[int, int]]:
+    if adyacencia is None:
+        adyacencia = _ADYACENCIA_TRABAJADOR
+    respuestas = []
+    for origen, destinos in grupos:
+        respuestas.extend(_distancias_desde(adyacencia, origen, destinos))
+    return respuestas
+
+
+def _repartir(adyacencia: list[list[int]], grupos: dict[int, list[tuple[int, int]]],
+              trabajo, procesos: int) -> list:
+    """Ejecuta `trabajo` sobre los grupos de consultas, repartidos en un pool si `procesos` > 1."""
+    lista = list(grupos.items())
+    n_tandas = max(1, min(len(lista), procesos * TANDAS_POR_PROCESO if procesos > 1 else 1))
+    if procesos <= 1 or n_tandas <= 1:
+        return trabajo(lista, adyacencia)
+
+    tandas = [lista[i::n_tandas] for i in range(n_tandas)]
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(procesos, len(tandas)),
+                             initializer=_iniciar_trabajador, initargs=(adyacencia,)) as pool:
+        return [r for respuestas in pool.map(trabajo, tandas) for r in respuestas]
+
+
+@medir("bfs.lote_caminos")
+def calcular_caminos_lote(
+    mapa: "Mapa",
+    consultas: list[tuple[tuple[int, int], tuple[int, int]]],
+    procesos: int = 1
+) -> ResultadoConsultas:
+    """
+    Resuelve muchas consultas de camino mínimo (inicio, fin) sobre el mismo
+    mapa con una sola BFS por origen distinto (o por destino, si hay menos),
+    que termina en cuanto alcanza todos sus destinos. Cada resultado es un
+    camino mínimo en el formato de `generar_camino_minimo` (vacío si no hay
+    camino). Con `procesos` > 1 los orígenes se reparten en un pool.
+    """
+    inicio_reloj = time.perf_counter()
+    posiciones, indice, adyacencia = _grafo_indexado(mapa)
+    grupos, invertido = _agrupar_consultas(indice, consultas)
+
+    caminos: list[list[tuple[int, int]]] = [[] for _ in consultas]
+    for n, camino in _repartir(adyacencia, grupos, _trabajo_caminos, procesos):
+        if invertido:
+            camino.reverse()
+        caminos[n] = [posiciones[i] for i in camino]
+
+    contar("bfs.consultas", len(consultas))
+    return ResultadoConsultas(caminos, len(grupos), time.perf_counter() - inicio_reloj)
+
+
+@medir("bfs.lote_distancias")
+def calcular_distancias_lote(
+    mapa: "Mapa",
+    consultas: list[tuple[tuple[int, int], tuple[int, int]]],
+    procesos: int = 1
+) -> ResultadoConsultas:
+    """
+    Como `calcular_caminos_lote` pero solo con la longitud de cada camino
+    (en pasos; -1 si no hay camino). Sin caminos que reconstruir, cada BFS
+    avanza por niveles sin guardar padres.
+    """
+    inicio_reloj = time.perf_counter()
+    _, indice, adyacencia = _grafo_indexado(mapa)
+    grupos, _ = _agrupar_consultas(indice, consultas)
+
+    distancias = [-1] * len(consultas)
+    for n, distancia in _repartir(adyacencia, grupos, _trabajo_distancias, procesos):
+        distancias[n] = distancia
+
+    contar("bfs.consultas", len(consultas))
+    return ResultadoConsultas(distancias, len(grupos), time.perf_counter() - inicio_reloj)
+
+
 def crear_mapa_ejemplo() -> "Mapa":
     """Crea un mapa de ejemplo para pruebas rápidas."""
     from .mapa import Mapa
@@ -224,9 +511,19 @@ def obtener_estadisticas_explorador(explorador: "Explorador") -> dict:
     }
 
 
+def contar_habitaciones_visitadas(explorador: "Explorador") -> int:
+    """
+    Cuenta las habitaciones visitadas por el explorador. Si tiene registro
+    de visitas propio se usa su contador; si no, el indicador global del mapa.
+    """
+    if explorador.visitas is not None:
+        return len(explorador.visitas)
+    return sum(1 for hab in explorador.mapa.habitaciones.values() if hab.visitada)
+
+
 def generar_reporte_exploracion(explorador: "Explorador") -> str:
     """Genera un reporte detallado de la exploración."""
-    habitaciones_visitadas = sum(1 for hab in explorador.mapa.habitaciones.values() if hab.visitada)
+    habitaciones_visitadas = contar_habitaciones_visitadas(explorador)
     total_habitaciones = len(explorador.mapa.habitaciones)
     progreso = (habitaciones_visitadas / total_habitaciones * 100) if total_habitaciones > 0 else 0
     
@@ -284,15 +581,21 @@ def calcular_dificultad_habitacion(mapa: "Mapa", posicion: tuple[int, int]) -> s
         return "Segura"
 
 
-def obtener_habitaciones_sin_visitar(mapa: "Mapa") -> list[tuple[int, int]]:
-    """Retorna una lista de posiciones de habitaciones no visitadas."""
+def obtener_habitaciones_sin_visitar(mapa: "Mapa", explorador: "Explorador" = None) -> list[tuple[int, int]]:
+    """
+    Retorna una lista de posiciones de habitaciones no visitadas.
+    Si se indica un explorador con registro de visitas, se usa su progreso.
+    """
+    if explorador is not None and explorador.visitas is not None:
+        visitas = explorador.visitas
+        return [pos for pos, hab in mapa.habitaciones.items() if hab.id not in visitas]
     return [pos for pos, hab in mapa.habitaciones.items() if not hab.visitada]
 
 
 def calcular_porcentaje_completado(explorador: "Explorador") -> float:
     """Calcula el porcentaje de completado del dungeon."""
     total = len(explorador.mapa.habitaciones)
-    visitadas = sum(1 for hab in explorador.mapa.habitaciones.values() if hab.visitada)
+    visitadas = contar_habitaciones_visitadas(explorador)
     
     if total == 0:
         return 0.0
@@ -0,0 +1,146 @@
+"""Registro de habitaciones visitadas por explorador, como conjunto de bits."""
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .mapa import Mapa
+    from .explorador import Explorador
+
+
+# Raíz de todos los diarios de marcas
+DIARIO_VACIO = (0, -1, None)
+
+
+class RegistroVisitas:
+    """
+    Conjunto de bits indexado por `Habitacion.id`. Permite que varios
+    exploradores recorran el mismo mapa sin pisarse el progreso: cada uno
+    ocupa un bit por habitación.
+    """
+    __slots__ = ("bits", "_marcadas", "diario")
+
+    def __init__(self, n_habitaciones: int = 0):
+        self.bits = bytearray((n_habitaciones + 7) // 8)
+        self._marcadas = 0
+        # Con instantáneas activas, último nodo del diario de marcas: tuplas
+        # (longitud, id, nodo anterior) que comparten las ramas
+        self.diario: Optional[tuple] = None
+
+    @classmethod
+    def para_mapa(cls, mapa: "Mapa") -> "RegistroVisitas":
+        """Crea un registro con espacio para todos los ids del mapa."""
+        max_id = max((hab.id for hab in mapa.habitaciones.values()), default=-1)
+        return cls(max_id + 1)
+
+    @classmethod
+    def desde_hex(cls, texto: str) -> "RegistroVisitas":
+        registro = cls()
+        registro.bits = bytearray.fromhex(texto)
+        registro._marcadas = registro.contar()
+        return registro
+
+    def a_hex(self) -> str:
+        return self.bits.hex()
+
+    def marcar(self, id_habitacion: int) -> bool:
+        """Marca la habitación como visitada. Retorna True si es nueva."""
+        byte, bit = divmod(id_habitacion, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte - len(self.bits) + 1))
+        mascara = 1 << bit
+        if self.bits[byte] & mascara:
+            return False
+        self.bits[byte] |= mascara
+        self._marcadas += 1
+        if self.diario is not None:
+            self.diario = (self.diario[0] + 1, id_habitacion, self.diario)
+        return True
+
+    def desmarcar(self, id_habitacion: int) -> bool:
+        """Quita la marca de visitada. Retorna True si estaba marcada."""
+        byte, bit = divmod(id_habitacion, 8)
+        mascara = 1 << bit
+        if byte >= len(self.bits) or not self.bits[byte] & mascara:
+            return False
+        self.bits[byte] &= ~mascara
+        self._marcadas -= 1
+        return True
+
+    def copiar(self) -> "RegistroVisitas":
+        registro = RegistroVisitas()
+        registro.bits = bytearray(self.bits)
+        registro._marcadas = self._marcadas
+        registro.diario = self.diario
+        return registro
+
+    def activar_diario(self):
+        """Empieza a anotar las marcas nuevas para poder volver atrás con `volver_a`."""
+        if self.diario is None:
+            self.diario = DIARIO_VACIO
+
+    def volver_a(self, nodo: tuple):
+        """
+        Deja el registro como estaba en el nodo `nodo` de su diario (o de una
+        rama del mismo diario): desmarca lo anotado desde el ancestro común y
+        vuelve a marcar lo que falte, en tiempo proporcional a esos cambios.
+        """
+        actual, destino = self.diario, nodo
+        rehacer = []
+        while actual is not destino:
+            if actual[0] >= destino[0]:
+                self.desmarcar(actual[1])
+                actual = actual[2]
+            else:
+                rehacer.append(destino[1])
+                destino = destino[2]
+        self.diario = None
+        for id_habitacion in rehacer:
+            self.marcar(id_habitacion)
+        self.diario = nodo
+
+    def __contains__(self, id_habitacion: int) -> bool:
+        byte, bit = divmod(id_habitacion, 8)
+        return byte < len(self.bits) and bool(self.bits[byte] >> bit & 1)
+
+    def __len__(self) -> int:
+        """Número de habitaciones visitadas (contador mantenido en O(1))."""
+        return self._marcadas
+
+    def contar(self) -> int:
+        """Cuenta los bits activos recorriendo el búfer (popcount)."""
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def union(self, otro: "RegistroVisitas") -> "RegistroVisitas":
+        """Habitaciones visitadas por cualquiera de los dos (progreso del grupo)."""
+        largo = max(len(self.bits), len(otro.bits))
+        a = int.from_bytes(self.bits, "little")
+        b = int.from_bytes(otro.bits, "little")
+        resultado = RegistroVisitas()
+        resultado.bits = bytearray((a | b).to_bytes(largo, "little"))
+        resultado._marcadas = resultado.contar()
+        return resultado
+
+
+def crear_explorador_en(
+    mapa: "Mapa",
+    contenido_compartido: bool = True,
+    **kwargs
+) -> "Explorador":
+    """
+    Crea un explorador con su propio registro de visitas, situado en la
+    entrada de un mapa que puede compartir con otros exploradores.
+
+    Con `contenido_compartido=True` los tesoros recogidos y monstruos
+    derrotados desaparecen para todos; con False cada explorador interactúa
+    con su propia copia del contenido (mediante un MapaJugador sobre `mapa`).
+    """
+    from .explorador import Explorador
+    from .plantilla import MapaJugador
+
+    mapa_explorador = mapa if contenido_compartido else MapaJugador.desde_plantilla(mapa)
+    explorador = Explorador(mapa=mapa_explorador, visitas=RegistroVisitas.para_mapa(mapa), **kwargs)
+    inicial = mapa_explorador.habitacion_inicial
+    if inicial is not None:
+        explorador.posicion = (inicial.x, inicial.y)
+        explorador.marcar_visita(inicial)
+    return explorador
@@ -1,43 +1,348 @@
 """Módulo para visualización del mapa en la terminal."""
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 from rich.console import Console
-from rich.table import Table
+from rich.control import Control
+from rich.measure import Measurement
+from rich.segment import ControlType, Segment
 from rich.panel import Panel
 from rich.text import Text
+from .metricas import medir
 
 if TYPE_CHECKING:
     from .mapa import Mapa
     from .explorador import Explorador
 
 
+ANCHO_CELDA = 4
+CELDA_VACIA = Text("   ", style="dim")
+TAMANO_MINIMAPA = (24, 8)
+# Líneas libres bajo el mapa que necesita la pantalla en vivo para los mensajes
+LINEAS_MENSAJES_EN_VIVO = 12
+
+
+class _FilasRenderizadas:
+    """Filas del mapa ya convertidas en segmentos: Rich las emite sin recomponerlas."""
+    
+    def __init__(self, filas: list[list[Segment]], ancho: int):
+        self.filas = filas
+        self.ancho = ancho
+    
+    def __rich_console__(self, console: Console, options):
+        salto = Segment.line()
+        for fila in self.filas:
+            yield from fila
+            yield salto
+    
+    def __rich_measure__(self, console: Console, options) -> Measurement:
+        return Measurement(self.ancho, self.ancho)
+
+
 class Visualizador:
     """Clase para visualizar el mapa del dungeon en la terminal."""
     
-    def __init__(self, mapa: "Mapa"):
+    def __init__(self, mapa: "Mapa", console: Optional[Console] = None):
         self.mapa = mapa
-        self.console = Console()
+        self.console = console or Console()
+        # Caché de celdas ya renderizadas y celdas pendientes de actualizar
+        self._cache_celdas: dict[tuple[int, int], Text] = {}
+        # Filas completas del mapa ya renderizadas (se rehacen solo las que cambian)
+        self._cache_filas: dict[int, list[Segment]] = {}
+        self._celdas_sucias: set[tuple[int, int]] = set()
+        self._pos_explorador: Optional[tuple[int, int]] = None
+        self._con_explorador = False
+        self._pantalla_dibujada = False
+        self._en_pantalla = False
+        # Contadores del minimapa por bloque (se crean al usar la vista)
+        self._bloque_minimapa: Optional[tuple[int, int]] = None
+        self._total_bloques: dict[tuple[int, int], int] = {}
+        self._visitadas_bloques: dict[tuple[int, int], int] = {}
+        self._visitadas: set[tuple[int, int]] = set()
+        # Explorador del último render: sus visitas deciden la niebla y el minimapa
+        self._explorador: Optional["Explorador"] = None
+        mapa.registrar_observador(self.marcar_celda_sucia)
     
-    def mostrar_mapa_completo(self, explorador: "Explorador" = None):
-        """Muestra el mapa completo con todos los detalles."""
-        tabla = Table(show_header=False, show_edge=True, padding=(0, 1))
+    def __enter__(self) -> "Visualizador":
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
+    
+    def cerrar(self):
+        """
+        Sale de la pantalla alternativa y deja de observar el mapa. Sin esto
+        el mapa mantiene vivo al visualizador (y su caché de celdas).
+        """
+        self.terminar_pantalla()
+        self.mapa.eliminar_observador(self.marcar_celda_sucia)
+    
+    def marcar_celda_sucia(self, pos: tuple[int, int]):
+        """Marca una celda para que se vuelva a renderizar."""
+        self._celdas_sucias.add(pos)
+        if self._bloque_minimapa is not None:
+            self._contar_visita(pos)
+    
+    def invalidar_cache(self):
+        """Descarta todas las celdas cacheadas (p. ej. tras modificar el mapa a mano)."""
+        self._cache_celdas.clear()
+        self._cache_filas.clear()
+        self._celdas_sucias.clear()
+        self._pantalla_dibujada = False
+        self._bloque_minimapa = None
+    
+    def _actualizar_cache(self, explorador: "Explorador" = None) -> set[tuple[int, int]]:
+        """
+        Recalcula solo las celdas que cambiaron desde el último render.
+        Retorna el conjunto de posiciones actualizadas.
+        """
+        con_explorador = explorador is not None
+        if con_explorador != self._con_explorador:
+            # Cambia la niebla de guerra de todas las celdas
+            self._cache_celdas.clear()
+            self._cache_filas.clear()
+            self._con_explorador = con_explorador
         
-        for _ in range(self.mapa.ancho):
-            tabla.add_column(justify="center")
+        if explorador is not self._explorador:
+            # Otro explorador tiene otras visitas: cambian la niebla y el minimapa
+            self._explorador = explorador
+            self._cache_celdas.clear()
+            self._cache_filas.clear()
+            self._bloque_minimapa = None
         
+        nueva_pos = explorador.posicion if explorador else None
+        if nueva_pos != self._pos_explorador:
+            self._celdas_sucias.add(self._pos_explorador)
+            self._celdas_sucias.add(nueva_pos)
+            self._pos_explorador = nueva_pos
+        self._celdas_sucias.discard(None)
+        
+        actualizadas = self._celdas_sucias
+        self._celdas_sucias = set()
+        for pos in actualizadas:
+            self._cache_celdas.pop(pos, None)
+            self._cache_filas.pop(pos[1], None)
+        return actualizadas
+    
+    def _celda(self, x: int, y: int, explorador: "Explorador" = None) -> Text:
+        """Retorna la celda cacheada, creándola si hace falta."""
+        pos = (x, y)
+        celda = self._cache_celdas.get(pos)
+        if celda is None:
+            celda = self._crear_celda(x, y, explorador)
+            self._cache_celdas[pos] = celda
+        return celda
+    
+    def cabe_en_pantalla(self) -> bool:
+        """Indica si el mapa completo cabe en la terminal actual."""
+        ancho_term, alto_term = self.console.size
+        return (self.mapa.ancho * ANCHO_CELDA + 4 <= ancho_term
+                and self.mapa.alto + 4 <= alto_term)
+    
+    @medir("visualizador.mostrar_mapa_completo")
+    def mostrar_mapa_completo(self, explorador: "Explorador" = None):
+        """
+        Muestra el mapa completo con todos los detalles. Las filas se
+        renderizan una vez y se guardan; en cada llamada solo se rehacen las
+        filas con alguna celda modificada. Escribir el panel sigue siendo
+        proporcional al tamaño del mapa: el coste O(celdas cambiadas) es el
+        de `refrescar_pantalla` en la pantalla alternativa.
+        """
+        self._actualizar_cache(explorador)
+        self.console.print(Panel(
+            self._filas_renderizadas(explorador),
+            title="[bold cyan]🗺️  MAPA DEL DUNGEON[/bold cyan]",
+            border_style="cyan",
+            expand=False
+        ))
+    
+    def _filas_renderizadas(self, explorador: "Explorador" = None) -> _FilasRenderizadas:
+        """Todas las filas del mapa, renderizando solo las que no están en caché."""
+        ancho = self.mapa.ancho * ANCHO_CELDA
+        opciones = None
+        filas = []
         for y in range(self.mapa.alto):
-            fila = []
-            for x in range(self.mapa.ancho):
-                celda = self._crear_celda(x, y, explorador)
-                fila.append(celda)
-            tabla.add_row(*fila)
+            fila = self._cache_filas.get(y)
+            if fila is None:
+                if opciones is None:
+                    opciones = self.console.options.update(width=ancho, no_wrap=True, overflow="crop")
+                texto = Text()
+                for x in range(self.mapa.ancho):
+                    texto.append_text(self._celda_fija(x, y, explorador))
+                fila = self._cache_filas[y] = self.console.render_lines(texto, opciones, pad=False)[0]
+            filas.append(fila)
+        return _FilasRenderizadas(filas, ancho)
+    
+    @medir("visualizador.mostrar_vista")
+    def mostrar_vista(self, explorador: "Explorador", ancho: int = None, alto: int = None):
+        """
+        Muestra solo una ventana del mapa centrada en el explorador, ajustada
+        al tamaño de la terminal, junto a un minimapa del dungeon completo.
+        Solo se recorren las habitaciones dentro de la ventana.
+        """
+        self._actualizar_cache(explorador)
+        ancho_term, alto_term = self.console.size
+        if ancho is None:
+            ancho = max(3, (ancho_term - 4) // ANCHO_CELDA)
+        if alto is None:
+            alto = max(3, alto_term - TAMANO_MINIMAPA[1] - 10)
+        ancho = min(ancho, self.mapa.ancho)
+        alto = min(alto, self.mapa.alto)
         
-        panel = Panel(
-            tabla,
+        x0, y0 = self._origen_vista(explorador.posicion, ancho, alto)
+        filas = Text()
+        for y in range(y0, y0 + alto):
+            for x in range(x0, x0 + ancho):
+                filas.append_text(self._celda_fija(x, y, explorador))
+            if y < y0 + alto - 1:
+                filas.append("\n")
+        
+        self.console.print(Panel(
+            filas,
             title="[bold cyan]🗺️  MAPA DEL DUNGEON[/bold cyan]",
-            border_style="cyan"
-        )
-        self.console.print(panel)
+            subtitle=f"({x0},{y0})-({x0 + ancho - 1},{y0 + alto - 1}) de {self.mapa.ancho}x{self.mapa.alto}",
+            border_style="cyan",
+            expand=False
+        ))
+        self.console.print(Panel(
+            self._crear_minimapa(explorador.posicion, (x0, y0, ancho, alto)),
+            title="[bold cyan]MINIMAPA[/bold cyan]",
+            border_style="dim cyan",
+            expand=False
+        ))
+    
+    def _origen_vista(self, centro: tuple[int, int], ancho: int, alto: int) -> tuple[int, int]:
+        """Esquina superior izquierda de la ventana, sin salirse del mapa."""
+        x0 = min(max(0, centro[0] - ancho // 2), self.mapa.ancho - ancho)
+        y0 = min(max(0, centro[1] - alto // 2), self.mapa.alto - alto)
+        return x0, y0
+    
+    def _preparar_minimapa(self):
+        """Calcula una única vez cuántas habitaciones hay en cada bloque."""
+        columnas = min(TAMANO_MINIMAPA[0], self.mapa.ancho)
+        filas = min(TAMANO_MINIMAPA[1], self.mapa.alto)
+        self._bloque_minimapa = (-(-self.mapa.ancho // columnas), -(-self.mapa.alto // filas))
+        self._total_bloques.clear()
+        self._visitadas_bloques.clear()
+        self._visitadas.clear()
+        for pos in self.mapa.habitaciones:
+            bloque = self._bloque_de(pos)
+            self._total_bloques[bloque] = self._total_bloques.get(bloque, 0) + 1
+            self._contar_visita(pos)
+    
+    def _bloque_de(self, pos: tuple[int, int]) -> tuple[int, int]:
+        return pos[0] // self._bloque_minimapa[0], pos[1] // self._bloque_minimapa[1]
+    
+    def _contar_visita(self, pos: tuple[int, int]):
+        """Actualiza el contador de visitas del bloque si la habitación es nueva."""
+        hab = self.mapa.habitaciones.get(pos)
+        if hab is not None and pos not in self._visitadas and self._visitada(hab):
+            self._visitadas.add(pos)
+            bloque = self._bloque_de(pos)
+            self._visitadas_bloques[bloque] = self._visitadas_bloques.get(bloque, 0) + 1
+    
+    def _visitada(self, hab) -> bool:
+        if self._explorador is not None:
+            return self._explorador.ha_visitado(hab)
+        return hab.visitada
+    
+    def _crear_minimapa(self, pos_explorador: tuple[int, int], ventana: tuple[int, int, int, int]) -> Text:
+        """Resumen del mapa por bloques: explorados, sin explorar y vacíos."""
+        if self._bloque_minimapa is None:
+            self._preparar_minimapa()
+        
+        bx, by = self._bloque_minimapa
+        x0, y0, ancho, alto = ventana
+        bloque_explorador = self._bloque_de(pos_explorador)
+        columnas = -(-self.mapa.ancho // bx)
+        filas = -(-self.mapa.alto // by)
+        
+        texto = Text()
+        for fila in range(filas):
+            for col in range(columnas):
+                bloque = (col, fila)
+                en_ventana = (x0 // bx <= col <= (x0 + ancho - 1) // bx
+                              and y0 // by <= fila <= (y0 + alto - 1) // by)
+                fondo = " on grey23" if en_ventana else ""
+                total = self._total_bloques.get(bloque, 0)
+                if bloque == bloque_explorador:
+                    texto.append("@", style="bold yellow" + fondo)
+                elif total == 0:
+                    texto.append(" ", style=fondo.strip())
+                elif self._visitadas_bloques.get(bloque, 0):
+                    texto.append("█", style="cyan" + fondo)
+                else:
+                    texto.append("░", style="dim" + fondo)
+            if fila < filas - 1:
+                texto.append("\n")
+        return texto
+    
+    @property
+    def pantalla_activa(self) -> bool:
+        return self._en_pantalla
+    
+    def cabe_en_pantalla_en_vivo(self) -> bool:
+        """Indica si el mapa completo y el área de mensajes caben en la terminal."""
+        ancho_term, alto_term = self.console.size
+        return (self.console.is_terminal
+                and self.mapa.ancho * ANCHO_CELDA <= ancho_term
+                and self.mapa.alto + LINEAS_MENSAJES_EN_VIVO + 3 <= alto_term)
+    
+    def iniciar_pantalla(self):
+        """Activa la pantalla alternativa para el render incremental del mapa."""
+        self.console.set_alt_screen(True)
+        self._en_pantalla = True
+        self._pantalla_dibujada = False
+    
+    def terminar_pantalla(self):
+        """Vuelve a la pantalla normal de la terminal."""
+        if self._en_pantalla:
+            self.console.set_alt_screen(False)
+            self._en_pantalla = False
+        self._pantalla_dibujada = False
+    
+    @medir("visualizador.refrescar_pantalla")
+    def refrescar_pantalla(self, explorador: "Explorador" = None):
+        """
+        Dibuja el mapa en la pantalla alternativa. La primera vez se dibuja
+        completo; después solo se reescriben las celdas que cambiaron, por lo
+        que el coste por turno es proporcional a las celdas modificadas.
+        """
+        actualizadas = self._actualizar_cache(explorador)
+        
+        if not self._pantalla_dibujada:
+            self.console.clear()
+            self.console.print(self._filas_renderizadas(explorador), no_wrap=True, crop=True)
+            self._pantalla_dibujada = True
+            return
+        
+        for x, y in actualizadas:
+            if 0 <= x < self.mapa.ancho and 0 <= y < self.mapa.alto:
+                self.console.control(Control.move_to(x * ANCHO_CELDA, y))
+                self.console.print(self._celda_fija(x, y, explorador), end="")
+        self.console.control(Control.move_to(0, self.mapa.alto))
+    
+    def mostrar_mensajes(self, texto: str):
+        """
+        Escribe la salida del último comando bajo el mapa de la pantalla
+        alternativa, recortada a las líneas libres para que el mapa no se
+        desplace y las celdas sigan en su sitio.
+        """
+        _, alto_term = self.console.size
+        primera = self.mapa.alto + 1
+        libres = max(1, alto_term - primera - 2)  # Dos líneas para el prompt
+        for y in range(primera, alto_term):
+            self.console.control(Control.move_to(0, y), Control((ControlType.ERASE_IN_LINE, 2)))
+        self.console.control(Control.move_to(0, primera))
+        for linea in texto.rstrip("\n").split("\n")[-libres:]:
+            self.console.print(Text.from_ansi(linea), no_wrap=True, crop=True)
+    
+    def _celda_fija(self, x: int, y: int, explorador: "Explorador" = None) -> Text:
+        """Celda con ancho fijo en columnas, para poder posicionar el cursor."""
+        celda = self._celda(x, y, explorador)
+        relleno = ANCHO_CELDA - celda.cell_len
+        if relleno <= 0:
+            return celda
+        return Text.assemble(celda, " " * relleno)
     
     def _crear_celda(self, x: int, y: int, explorador: "Explorador" = None) -> Text:
         """Crea el contenido de una celda del mapa."""
@@ -45,7 +350,7 @@ class Visualizador:
         
         # Celda vacía
         if pos not in self.mapa.habitaciones:
-            return Text("   ", style="dim")
+            return CELDA_VACIA
         
         hab = self.mapa.habitaciones[pos]
         simbolo = "·"
@@ -77,7 +382,7 @@ class Visualizador:
             color = "white"
         
         # Marcar si está visitada
-        if not hab.visitada and explorador:
+        if explorador and not explorador.ha_visitado(hab):
             color = f"dim {color}"
         
         return Text(f" {simbolo} ", style=color)
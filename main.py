@@ -5,12 +5,31 @@ Dungeon Generator - Sistema de generación y exploración de dungeons
 
 from dungeon_generator import (
     Mapa, Explorador, Visualizador,
-    guardar_partida, cargar_partida,
+    GestorPartidas, cargar_partida,
     generar_reporte_exploracion
 )
 from rich.console import Console
 from rich.prompt import Prompt, IntPrompt, Confirm
+from rich.table import Table
+from datetime import datetime
+from typing import Iterable, Optional
+import argparse
+import os
 import sys
+import tempfile
+import time
+
+RANURA_POR_DEFECTO = "partida"
+MAX_LADO_MAPA = 1000
+# Comandos que piden algo al usuario y no pueden ejecutarse con la salida capturada
+COMANDOS_INTERACTIVOS = {"ayuda", "help", "salir", "quit"}
+# Nombre con el que se agrupan las latencias de cada comando en la reproducción
+COMANDOS_CANONICOS = {
+    "norte": "mover", "n": "mover", "sur": "mover", "s": "mover",
+    "este": "mover", "e": "mover", "oeste": "mover", "o": "mover",
+    "ex": "explorar", "m": "mapa", "inv": "inventario",
+    "help": "ayuda", "quit": "salir",
+}
 
 
 def menu_principal(console: Console):
@@ -43,7 +62,7 @@ def mostrar_instrucciones(console: Console):
     • stats - Ver tus estadísticas
     • inventario / inv - Ver tu inventario
     • ayuda / help - Ver esta ayuda
-    • guardar - Guardar la partida actual
+    • guardar [nombre] - Guardar la partida actual en una ranura
     • salir / quit - Salir del juego
     
     [bold yellow]Tipos de contenido:[/bold yellow]
@@ -77,10 +96,10 @@ def configurar_nueva_partida(console: Console) -> tuple[Mapa, Explorador]:
         console.print("[red]El mapa debe ser al menos 3x3[/red]")
         ancho, alto = 10, 10
     
-    if ancho > 20 or alto > 20:
-        console.print("[yellow]⚠️  Mapa muy grande, limitando a 20x20[/yellow]")
-        ancho = min(ancho, 20)
-        alto = min(alto, 20)
+    if ancho > MAX_LADO_MAPA or alto > MAX_LADO_MAPA:
+        console.print(f"[yellow]⚠️  Mapa muy grande, limitando a {MAX_LADO_MAPA}x{MAX_LADO_MAPA}[/yellow]")
+        ancho = min(ancho, MAX_LADO_MAPA)
+        alto = min(alto, MAX_LADO_MAPA)
     
     # Solicitar número de habitaciones
     max_habitaciones = ancho * alto
@@ -109,7 +128,7 @@ def configurar_nueva_partida(console: Console) -> tuple[Mapa, Explorador]:
     explorador = Explorador(mapa=mapa)
     if mapa.habitacion_inicial is not None:
         explorador.posicion = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
-        mapa.habitacion_inicial.visitada = True
+        explorador.marcar_visita(mapa.habitacion_inicial)
     else:
         console.print("[red]Error: No se pudo inicializar la habitación inicial del mapa.[/red]")
         sys.exit(1)
@@ -130,12 +149,51 @@ def configurar_nueva_partida(console: Console) -> tuple[Mapa, Explorador]:
     return mapa, explorador
 
 
-def procesar_comando(comando: str, explorador: Explorador, visualizador: Visualizador, console: Console) -> bool:
+def elegir_partida(console: Console, gestor: GestorPartidas) -> Optional[Explorador]:
+    """Lista las ranuras guardadas (solo desde el índice) y carga la elegida."""
+    ranuras = gestor.listar()
+    if not ranuras:
+        # Compatibilidad con el antiguo archivo único
+        return cargar_partida()
+    
+    tabla = Table(title="💾 Partidas guardadas")
+    for columna in ["#", "Nombre", "Fecha", "Mapa", "Progreso", "Botín", "Vida"]:
+        tabla.add_column(columna)
+    for i, meta in enumerate(ranuras, 1):
+        tabla.add_row(
+            str(i), meta.nombre,
+            datetime.fromtimestamp(meta.fecha).strftime("%Y-%m-%d %H:%M"),
+            f"{meta.ancho}x{meta.alto}",
+            f"{meta.progreso:.0f}%",
+            f"{meta.valor_inventario} oro",
+            str(meta.vida)
+        )
+    console.print(tabla)
+    
+    opcion = IntPrompt.ask("Elige una partida", default=1)
+    if not 1 <= opcion <= len(ranuras):
+        return None
+    return gestor.cargar(ranuras[opcion - 1].nombre)
+
+
+def procesar_comando(
+    comando: str,
+    explorador: Explorador,
+    visualizador: Visualizador,
+    console: Console,
+    gestor: Optional[GestorPartidas] = None,
+    interactivo: bool = True
+) -> bool:
     """
     Procesa un comando del jugador.
     Retorna True si el juego debe continuar, False si debe terminar.
+    Con `interactivo=False` nunca se pide confirmación al usuario.
     """
-    comando = comando.lower().strip()
+    # Solo el verbo se pasa a minúsculas: el argumento (p. ej. el nombre de
+    # la ranura) se respeta tal cual
+    comando, _, argumento = comando.strip().partition(" ")
+    comando = comando.lower()
+    argumento = argumento.strip()
     
     # Comandos de movimiento
     if comando in ['norte', 'n']:
@@ -177,7 +235,13 @@ def procesar_comando(comando: str, explorador: Explorador, visualizador: Visuali
             return False
     
     elif comando in ['mapa', 'm']:
-        visualizador.mostrar_mapa_completo(explorador)
+        if visualizador.pantalla_activa:
+            # El mapa ya está en pantalla y se actualiza al final del turno
+            console.print("[dim]El mapa se muestra arriba y se actualiza en cada turno.[/dim]")
+        elif visualizador.cabe_en_pantalla():
+            visualizador.mostrar_mapa_completo(explorador)
+        else:
+            visualizador.mostrar_vista(explorador)
     
     elif comando == 'stats':
         visualizador.mostrar_estadisticas_explorador(explorador)
@@ -195,15 +259,16 @@ def procesar_comando(comando: str, explorador: Explorador, visualizador: Visuali
             console.print("[dim]Tu inventario está vacío.[/dim]")
     
     elif comando in ['ayuda', 'help']:
-        mostrar_instrucciones(console)
+        if interactivo:
+            mostrar_instrucciones(console)
     
     elif comando == 'guardar':
-        resultado = guardar_partida(explorador)
+        resultado = (gestor or GestorPartidas()).guardar(explorador, argumento or RANURA_POR_DEFECTO)
         console.print(f"[green]{resultado}[/green]")
     
     elif comando in ['salir', 'quit']:
-        if Confirm.ask("¿Deseas guardar antes de salir?"):
-            guardar_partida(explorador)
+        if interactivo and Confirm.ask("¿Deseas guardar antes de salir?"):
+            (gestor or GestorPartidas()).guardar(explorador, RANURA_POR_DEFECTO)
             console.print("[green]Partida guardada.[/green]")
         console.print("[cyan]¡Hasta pronto, aventurero![/cyan]")
         return False
@@ -214,8 +279,32 @@ def procesar_comando(comando: str, explorador: Explorador, visualizador: Visuali
     return True
 
 
-def bucle_juego(explorador: Explorador, visualizador: Visualizador, console: Console):
+def _hay_jefe(habitaciones_jefe: list) -> bool:
+    return any(hab.contenido and hab.contenido.tipo == "Jefe Final" for hab in habitaciones_jefe)
+
+
+def _mostrar_victoria(console: Console, explorador: Explorador):
+    console.print("\n" + "=" * 60)
+    console.print("[bold yellow]🎉 ¡FELICIDADES! ¡HAS COMPLETADO EL DUNGEON! 🎉[/bold yellow]")
+    console.print("=" * 60)
+    console.print(generar_reporte_exploracion(explorador))
+
+
+def bucle_juego(explorador: Explorador, visualizador: Visualizador, console: Console,
+                gestor: Optional[GestorPartidas] = None):
     """Bucle principal del juego."""
+    # Un único gestor para toda la partida: su índice se lee una sola vez
+    gestor = gestor or GestorPartidas()
+    # Las habitaciones con jefe se localizan una sola vez; luego basta con
+    # comprobar esas posiciones en cada turno
+    habitaciones_jefe = [
+        hab for hab in explorador.mapa.habitaciones.values()
+        if hab.contenido and hab.contenido.tipo == "Jefe Final"
+    ]
+    if visualizador.cabe_en_pantalla_en_vivo():
+        _bucle_en_vivo(explorador, visualizador, console, gestor, habitaciones_jefe)
+        return
+    
     visualizador.limpiar_pantalla()
     visualizador.mostrar_titulo()
     
@@ -228,44 +317,79 @@ def bucle_juego(explorador: Explorador, visualizador: Visualizador, console: Con
     while explorador.esta_vivo:
         comando = Prompt.ask("\n[bold cyan]¿Qué deseas hacer?[/bold cyan]")
         
-        if not procesar_comando(comando, explorador, visualizador, console):
+        if not procesar_comando(comando, explorador, visualizador, console, gestor):
             break
         
-        # Verificar victoria
-        hay_jefe = False
-        for hab in explorador.mapa.habitaciones.values():
-            if hab.contenido and hab.contenido.tipo == "Jefe Final":
-                hay_jefe = True
-                break
-        
-        if not hay_jefe and explorador.esta_vivo:
-            console.print("\n" + "=" * 60)
-            console.print("[bold yellow]🎉 ¡FELICIDADES! ¡HAS COMPLETADO EL DUNGEON! 🎉[/bold yellow]")
-            console.print("=" * 60)
-            console.print(generar_reporte_exploracion(explorador))
+        if not _hay_jefe(habitaciones_jefe) and explorador.esta_vivo:
+            _mostrar_victoria(console, explorador)
             break
 
 
+def _bucle_en_vivo(explorador: Explorador, visualizador: Visualizador, console: Console,
+                   gestor: Optional[GestorPartidas], habitaciones_jefe: list):
+    """
+    Bucle con el mapa fijo en la pantalla alternativa. El mapa se dibuja una
+    vez y en cada turno solo se reescriben las celdas que cambiaron; la salida
+    del comando se captura y se muestra debajo del mapa.
+    """
+    with console.capture() as captura:
+        console.print("[bold green]¡Bienvenido al dungeon![/bold green] "
+                      "[dim]Escribe 'ayuda' para ver los comandos disponibles.[/dim]")
+        visualizador.mostrar_habitacion_actual(explorador)
+    salida_final = None
+    visualizador.iniciar_pantalla()
+    try:
+        visualizador.refrescar_pantalla(explorador)
+        visualizador.mostrar_mensajes(captura.get())
+        while explorador.esta_vivo:
+            comando = Prompt.ask("[bold cyan]¿Qué deseas hacer?[/bold cyan]", console=console)
+            
+            if comando.strip().lower().split(" ")[0] in COMANDOS_INTERACTIVOS:
+                # Piden confirmación o esperan a Enter: se ejecutan fuera de la pantalla en vivo
+                visualizador.terminar_pantalla()
+                if not procesar_comando(comando, explorador, visualizador, console, gestor):
+                    return
+                visualizador.iniciar_pantalla()
+                visualizador.refrescar_pantalla(explorador)
+                continue
+            
+            with console.capture() as captura:
+                continuar = procesar_comando(comando, explorador, visualizador, console, gestor)
+            if not continuar or not explorador.esta_vivo or not _hay_jefe(habitaciones_jefe):
+                salida_final = captura.get()
+                break
+            visualizador.refrescar_pantalla(explorador)
+            visualizador.mostrar_mensajes(captura.get())
+    finally:
+        visualizador.terminar_pantalla()
+    
+    if salida_final is not None:
+        console.file.write(salida_final)
+        if explorador.esta_vivo and not _hay_jefe(habitaciones_jefe):
+            _mostrar_victoria(console, explorador)
+
+
 def main():
     """Función principal del juego."""
     console = Console()
+    gestor = GestorPartidas()
     
     while True:
         opcion = menu_principal(console)
         
         if opcion == "1":  # Nueva partida
             mapa, explorador = configurar_nueva_partida(console)
-            visualizador = Visualizador(mapa)
-            bucle_juego(explorador, visualizador, console)
+            with Visualizador(mapa, console) as visualizador:
+                bucle_juego(explorador, visualizador, console, gestor)
         
         elif opcion == "2":  # Cargar partida
             console.print("\n[cyan]📂 Cargando partida...[/cyan]")
-            explorador = cargar_partida()
+            explorador = elegir_partida(console, gestor)
             
             if explorador:
                 console.print("[green]✅ Partida cargada exitosamente.[/green]")
-                visualizador = Visualizador(explorador.mapa)
-                bucle_juego(explorador, visualizador, console)
+                with Visualizador(explorador.mapa, console) as visualizador:
+                    bucle_juego(explorador, visualizador, console, gestor)
             else:
                 console.print("[red]❌ No se encontró ninguna partida guardada.[/red]")
                 Prompt.ask("Presiona Enter para continuar", default="")
@@ -278,7 +402,189 @@ def main():
             sys.exit(0)
 
 
+def reproducir_comandos(
+    comandos: Iterable[str],
+    explorador: Explorador,
+    visualizador: Visualizador,
+    console: Console,
+    gestor: Optional[GestorPartidas] = None
+) -> dict[str, list[float]]:
+    """
+    Ejecuta una secuencia de comandos con el mismo procesador que el juego,
+    sin pedir nada al usuario. Retorna las latencias (segundos) agrupadas por
+    comando, con los alias y las direcciones unificados (`n` y `norte`
+    cuentan como `mover`). Se detiene si el juego termina (muerte, victoria
+    o 'salir').
+    """
+    gestor = gestor or GestorPartidas()
+    habitaciones_jefe = [
+        hab for hab in explorador.mapa.habitaciones.values()
+        if hab.contenido and hab.contenido.tipo == "Jefe Final"
+    ]
+    latencias: dict[str, list[float]] = {}
+    for linea in comandos:
+        linea = linea.strip()
+        if not linea or linea.startswith("#"):
+            continue
+        nombre = linea.split()[0].lower()
+        nombre = COMANDOS_CANONICOS.get(nombre, nombre)
+        inicio = time.perf_counter()
+        continuar = procesar_comando(linea, explorador, visualizador, console, gestor,
+                                     interactivo=False)
+        latencias.setdefault(nombre, []).append(time.perf_counter() - inicio)
+        if not continuar or not explorador.esta_vivo:
+            break
+        if habitaciones_jefe and not _hay_jefe(habitaciones_jefe):
+            _mostrar_victoria(console, explorador)
+            break
+    return latencias
+
+
+def reporte_latencias(latencias: dict[str, list[float]]) -> str:
+    """Tabla de texto con las estadísticas de latencia por comando."""
+    from dungeon_generator import calcular_percentil
+    
+    lineas = [f"{'comando':<12} {'n':>7} {'media ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8}"]
+    todas = []
+    for nombre, valores in sorted(latencias.items()):
+        todas.extend(valores)
+        lineas.append(
+            f"{nombre:<12} {len(valores):>7} {sum(valores) / len(valores) * 1000:>9.3f} "
+            f"{calcular_percentil(valores, 50) * 1000:>8.3f} "
+            f"{calcular_percentil(valores, 99) * 1000:>8.3f} {max(valores) * 1000:>8.3f}"
+        )
+    if todas:
+        lineas.append(
+            f"{'TOTAL':<12} {len(todas):>7} {sum(todas) / len(todas) * 1000:>9.3f} "
+            f"{calcular_percentil(todas, 50) * 1000:>8.3f} "
+            f"{calcular_percentil(todas, 99) * 1000:>8.3f} {max(todas) * 1000:>8.3f}"
+        )
+    return "\n".join(lineas)
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """Parser de la línea de comandos para el modo no interactivo."""
+    from dungeon_generator.motores import MOTORES
+    
+    parser = argparse.ArgumentParser(
+        description="Dungeon Generator. Sin argumentos inicia el juego interactivo."
+    )
+    subcomandos = parser.add_subparsers(dest="comando")
+    
+    generar = subcomandos.add_parser(
+        "generar", aliases=["generate"],
+        help="Genera, valida y exporta dungeons por lotes"
+    )
+    generar.add_argument("--ancho", "--width", type=int, default=10)
+    generar.add_argument("--alto", "--height", type=int, default=10)
+    generar.add_argument("--habitaciones", "--rooms", type=int, default=20)
+    generar.add_argument("--cantidad", "--count", type=int, default=1)
+    generar.add_argument("--semilla", "--seed", type=int, default=0)
+    generar.add_argument("--procesos", "--workers", type=int, default=1)
+    generar.add_argument("--salida", "--out", default=None,
+                         help="Directorio de salida (si se omite no se escriben archivos)")
+    generar.add_argument("--formato", "--format", default="json.gz",
+                         choices=["json", "json.gz", "txt", "png"])
+    generar.add_argument("--catalogo", "--catalog", default=None,
+                         help="Catálogo YAML de monstruos, jefes, tesoros y eventos")
+    generar.add_argument("--motor", "--engine", default="caminata",
+                         choices=list(MOTORES),
+                         help="Algoritmo de generación de la estructura")
+    generar.add_argument("--cache", default=None,
+                         help="Directorio de caché: los mapas ya generados se leen de ahí")
+    
+    reproducir = subcomandos.add_parser(
+        "reproducir", aliases=["replay"],
+        help="Ejecuta comandos desde un archivo o stdin y mide su latencia"
+    )
+    reproducir.add_argument("comandos", nargs="?", default="-",
+                            help="Archivo con un comando por línea ('-' para stdin)")
+    reproducir.add_argument("--partida", default=None,
+                            help="Partida guardada a cargar (si se omite se genera un mapa)")
+    reproducir.add_argument("--ancho", "--width", type=int, default=10)
+    reproducir.add_argument("--alto", "--height", type=int, default=10)
+    reproducir.add_argument("--habitaciones", "--rooms", type=int, default=20)
+    reproducir.add_argument("--semilla", "--seed", type=int, default=0)
+    reproducir.add_argument("--vida", type=int, default=None,
+                            help="Vida inicial del explorador (útil para pruebas de carga largas)")
+    reproducir.add_argument("--render", default=os.devnull,
+                            help="Archivo donde escribir la salida del juego (por defecto se descarta)")
+    
+    for subparser in (generar, reproducir):
+        subparser.add_argument("--metricas", "--metrics", default=None,
+                               help="Archivo de métricas (.prom para Prometheus, si no JSON); "
+                                    "requiere DUNGEON_METRICAS=1")
+    return parser
+
+
+def main_cli(argv: list[str]) -> int:
+    """Punto de entrada no interactivo. Retorna el código de salida."""
+    args = crear_parser().parse_args(argv)
+    
+    from dungeon_generator import metricas
+    # Sin subcomando no existe la opción --metricas
+    archivo_metricas = getattr(args, "metricas", None)
+    if archivo_metricas and not metricas.ACTIVAS:
+        print("Aviso: las métricas están desactivadas; ejecuta con DUNGEON_METRICAS=1",
+              file=sys.stderr)
+    codigo = ejecutar_subcomando(args)
+    if archivo_metricas:
+        print(metricas.REGISTRO.guardar(archivo_metricas), file=sys.stderr)
+    return codigo
+
+
+def ejecutar_subcomando(args: argparse.Namespace) -> int:
+    """Ejecuta el subcomando ya parseado por `crear_parser`."""
+    if args.comando in ("generar", "generate"):
+        from dungeon_generator.lote import generar_lote
+        resumen = generar_lote(
+            ancho=args.ancho, alto=args.alto, n_habitaciones=args.habitaciones,
+            cantidad=args.cantidad, semilla=args.semilla, procesos=args.procesos,
+            salida=args.salida, formato=args.formato, catalogo=args.catalogo,
+            motor=args.motor, cache=args.cache
+        )
+        for resultado in resumen.resultados:
+            if resultado.error or not resultado.conectado:
+                print(f"Mapa {resultado.indice} (semilla {resultado.semilla}): "
+                      f"{resultado.error or 'no conectado'}", file=sys.stderr)
+        print(resumen.reporte(con_cache=bool(args.cache)))
+        return 0 if resumen.correctos == len(resumen.resultados) else 1
+    
+    if args.comando in ("reproducir", "replay"):
+        if args.partida:
+            explorador = cargar_partida(args.partida)
+            if explorador is None:
+                print(f"No se pudo cargar la partida {args.partida}", file=sys.stderr)
+                return 1
+        else:
+            from dungeon_generator.lote import generar_mapa
+            mapa = generar_mapa(args.ancho, args.alto, args.habitaciones, args.semilla)
+            explorador = Explorador(mapa=mapa)
+            explorador.posicion = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+            explorador.marcar_visita(mapa.habitacion_inicial)
+        if args.vida is not None:
+            explorador.vida = args.vida
+        
+        with open(args.render, "w", encoding="utf-8") as salida, \
+                tempfile.TemporaryDirectory() as directorio:
+            console = Console(file=salida, width=120)
+            gestor = GestorPartidas(directorio)
+            with Visualizador(explorador.mapa, console) as visualizador:
+                if args.comandos == "-":
+                    latencias = reproducir_comandos(sys.stdin, explorador, visualizador, console, gestor)
+                else:
+                    with open(args.comandos, encoding="utf-8") as f:
+                        latencias = reproducir_comandos(f, explorador, visualizador, console, gestor)
+        
+        print(reporte_latencias(latencias))
+        return 0
+    
+    return 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main_cli(sys.argv[1:]))
     try:
         main()
     except KeyboardInterrupt:
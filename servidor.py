@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Servidor asyncio multi-sesión para el Dungeon Generator.
+
+Cada conexión es una sesión independiente con su propio Mapa y Explorador.
+Los comandos de texto se procesan con el mismo `procesar_comando` que el
+juego interactivo y la salida se devuelve en texto plano.
+
+Protocolo (una línea por mensaje):
+    nueva [ancho] [alto] [habitaciones]   -> crea una sesión
+    reanudar <id>                         -> retoma una sesión existente
+    servidor                              -> estadísticas del servidor
+    reserva                               -> estado de la reserva de mapas
+    metricas                              -> métricas en formato Prometheus
+                                             (con DUNGEON_METRICAS=1)
+    <cualquier comando del juego>
+Cada respuesta termina con una línea que contiene solo FIN_RESPUESTA.
+Los identificadores de sesión son aleatorios (no se pueden adivinar) y
+cada sesión guarda sus ranuras en su propio subdirectorio, así que
+`guardar <nombre>` nunca toca las partidas de otra sesión. Las sesiones
+inactivas se guardan en disco y se liberan de memoria; `reanudar` las
+vuelve a cargar. La generación de mapas, `guardar` (que escribe el mapa
+entero) y los accesos a disco se hacen en hilos para no bloquear el bucle
+de eventos.
+
+Con `--reserva N` el servidor mantiene N mapas pregenerados por cada perfil
+de `--perfiles` (ANCHOxALTOxHABITACIONES), rellenados por procesos en
+segundo plano, y `nueva` con esas dimensiones no espera a la generación.
+
+Uso: python servidor.py [--host 127.0.0.1] [--puerto 8765 | --socket ruta]
+                        [--reserva 16 --perfiles 10x10x20 50x50x1000]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import random
+import re
+import secrets
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from rich.console import Console
+from dungeon_generator import (
+    Explorador, Visualizador, GestorPartidas,
+    calcular_percentil
+)
+from dungeon_generator.lote import generar_mapa
+from dungeon_generator.metricas import REGISTRO
+from main import procesar_comando
+
+if TYPE_CHECKING:
+    from dungeon_generator.reserva import ReservaMapas
+
+FIN_RESPUESTA = "."
+MAX_LADO_SESION = 1000
+MAX_LATENCIAS = 100_000
+# Ranura (dentro del directorio de la sesión) donde se guarda al desalojar
+RANURA_DESALOJO = "desalojo"
+# Comandos que pueden tardar segundos (escriben el mapa entero) y se ejecutan
+# en un hilo; el resto es tan barato que el salto a un hilo costaría más
+COMANDOS_EN_HILO = {"guardar"}
+PATRON_ID_SESION = re.compile(r"[\w\-]{16,64}")
+
+
+@dataclass
+class Sesion:
+    """Estado de un jugador conectado al servidor."""
+    id: str
+    explorador: Explorador
+    visualizador: Visualizador
+    console: Console
+    salida: io.StringIO
+    gestor: GestorPartidas
+    ultimo_uso: float = field(default_factory=time.monotonic)
+    # Un solo comando a la vez por sesión (aunque la compartan dos conexiones)
+    cerrojo: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @classmethod
+    def crear(cls, id_sesion: str, explorador: Explorador, gestor: GestorPartidas) -> "Sesion":
+        salida = io.StringIO()
+        console = Console(file=salida, width=100, color_system=None, force_terminal=False)
+        visualizador = Visualizador(explorador.mapa, console)
+        return cls(id_sesion, explorador, visualizador, console, salida, gestor)
+
+    def cerrar(self):
+        """Libera el visualizador (deja de observar el mapa)."""
+        self.visualizador.cerrar()
+
+    def leer_salida(self) -> str:
+        """Retorna y vacía la salida acumulada de la sesión."""
+        texto = self.salida.getvalue()
+        self.salida.seek(0)
+        self.salida.truncate()
+        return texto
+
+
+class ServidorJuego:
+    """Aloja muchas sesiones de juego independientes en un solo proceso."""
+
+    def __init__(self, directorio: str = "sesiones", inactividad: float = 300.0,
+                 reserva: Optional["ReservaMapas"] = None):
+        self.directorio = directorio
+        self.inactividad = inactividad
+        self.reserva = reserva
+        self.sesiones: dict[str, Sesion] = {}
+        self.latencias: list[float] = []
+        self.comandos_procesados = 0
+        self.sesiones_desalojadas = 0
+        # Sesiones que se están guardando en disco: reanudarlas espera al guardado
+        self._desalojos: dict[str, asyncio.Future] = {}
+        # generar_mapa reinicia el RNG global, así que las semillas salen de otro
+        self._semillas = random.SystemRandom()
+
+    # --- Gestión de sesiones ---
+
+    def _gestor_sesion(self, id_sesion: str) -> GestorPartidas:
+        """Ranuras de guardado propias de la sesión (su propio subdirectorio)."""
+        return GestorPartidas(os.path.join(self.directorio, id_sesion))
+
+    def _generar_mapa(self, ancho: int, alto: int, n_habitaciones: int):
+        perfil = self.reserva.buscar_perfil(ancho, alto, n_habitaciones) if self.reserva else None
+        if perfil is not None:
+            return self.reserva.obtener(perfil)
+        return generar_mapa(ancho, alto, n_habitaciones, self._semillas.randrange(2**32))
+
+    async def nueva_sesion(self, ancho: int = 10, alto: int = 10, n_habitaciones: int = 20) -> Sesion:
+        ancho = max(3, min(ancho, MAX_LADO_SESION))
+        alto = max(3, min(alto, MAX_LADO_SESION))
+        n_habitaciones = max(5, min(n_habitaciones, ancho * alto))
+        # Tanto la generación como la reserva (que genera si no tiene mapas
+        # listos) pueden tardar segundos: se ejecutan fuera del bucle de eventos
+        mapa = await asyncio.to_thread(self._generar_mapa, ancho, alto, n_habitaciones)
+        explorador = Explorador(mapa=mapa)
+        explorador.posicion = (mapa.habitacion_inicial.x, mapa.habitacion_inicial.y)
+        explorador.marcar_visita(mapa.habitacion_inicial)
+
+        id_sesion = secrets.token_urlsafe(18)
+        sesion = Sesion.crear(id_sesion, explorador, self._gestor_sesion(id_sesion))
+        self.sesiones[id_sesion] = sesion
+        return sesion
+
+    async def reanudar_sesion(self, id_sesion: str) -> Optional[Sesion]:
+        """Retorna la sesión en memoria o la recarga desde disco."""
+        if not PATRON_ID_SESION.fullmatch(id_sesion):
+            return None
+        desalojo = self._desalojos.get(id_sesion)
+        if desalojo is not None:
+            await asyncio.wait([desalojo])
+        sesion = self.sesiones.get(id_sesion)
+        if sesion is None:
+            gestor = self._gestor_sesion(id_sesion)
+            explorador = await asyncio.to_thread(gestor.cargar, RANURA_DESALOJO)
+            if explorador is None:
+                return None
+            # Otra conexión pudo recargarla mientras se leía el archivo
+            sesion = self.sesiones.setdefault(id_sesion, Sesion.crear(id_sesion, explorador, gestor))
+        sesion.ultimo_uso = time.monotonic()
+        return sesion
+
+    async def desalojar_inactivas(self) -> int:
+        """Guarda en disco y libera las sesiones que superaron la inactividad."""
+        limite = time.monotonic() - self.inactividad
+        inactivas = [s for s in self.sesiones.values()
+                     if s.ultimo_uso < limite and not s.cerrojo.locked()]
+        desalojadas = 0
+        for sesion in inactivas:
+            # Fuera de `sesiones` nadie puede modificarla mientras se guarda
+            del self.sesiones[sesion.id]
+            self._desalojos[sesion.id] = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.to_thread(sesion.gestor.guardar, sesion.explorador, RANURA_DESALOJO)
+            except OSError:
+                self.sesiones[sesion.id] = sesion
+            else:
+                sesion.cerrar()
+                desalojadas += 1
+            finally:
+                self._desalojos.pop(sesion.id).set_result(None)
+        self.sesiones_desalojadas += desalojadas
+        return desalojadas
+
+    def estadisticas(self) -> dict:
+        return {
+            "sesiones_activas": len(self.sesiones),
+            "sesiones_desalojadas": self.sesiones_desalojadas,
+            "comandos_procesados": self.comandos_procesados,
+            "latencia_p50_ms": round(calcular_percentil(self.latencias, 50) * 1000, 3),
+            "latencia_p99_ms": round(calcular_percentil(self.latencias, 99) * 1000, 3),
+        }
+
+    # --- Procesamiento de comandos ---
+
+    async def ejecutar(self, sesion: Sesion, comando: str) -> tuple[str, bool]:
+        """
+        Ejecuta un comando del juego. Los de COMANDOS_EN_HILO van a un hilo
+        para que guardar un mapa grande no frene al resto de sesiones.
+        Retorna (respuesta, continuar).
+        """
+        argumentos = (comando, sesion.explorador, sesion.visualizador,
+                      sesion.console, sesion.gestor)
+        en_hilo = comando.split(maxsplit=1)[0].lower() in COMANDOS_EN_HILO
+        async with sesion.cerrojo:
+            sesion.ultimo_uso = time.monotonic()
+            inicio = time.perf_counter()
+            try:
+                if en_hilo:
+                    continuar = await asyncio.to_thread(procesar_comando, *argumentos,
+                                                        interactivo=False)
+                else:
+                    continuar = procesar_comando(*argumentos, interactivo=False)
+            except OSError as e:
+                sesion.console.print(f"Error: no se pudo completar el comando ({e})")
+                continuar = True
+            continuar = continuar and sesion.explorador.esta_vivo
+            self._registrar_latencia(time.perf_counter() - inicio)
+            sesion.ultimo_uso = time.monotonic()
+            respuesta = sesion.leer_salida()
+        if not continuar:
+            self.sesiones.pop(sesion.id, None)
+            sesion.cerrar()
+        return respuesta, continuar
+
+    def _registrar_latencia(self, segundos: float):
+        self.comandos_procesados += 1
+        if len(self.latencias) >= MAX_LATENCIAS:
+            # Ventana deslizante para que la memoria no crezca sin límite
+            del self.latencias[:MAX_LATENCIAS // 2]
+        self.latencias.append(segundos)
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende una conexión de cliente hasta que se cierra o termina la partida."""
+        sesion: Optional[Sesion] = None
+
+        async def responder(texto: str):
+            writer.write((texto.rstrip("\n") + f"\n{FIN_RESPUESTA}\n").encode("utf-8"))
+            await writer.drain()
+
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                comando = linea.decode("utf-8", errors="replace").strip()
+                if not comando:
+                    continue
+                partes = comando.split()
+                orden = partes[0].lower()
+
+                if orden == "servidor":
+                    await responder("\n".join(f"{k}: {v}" for k, v in self.estadisticas().items()))
+                elif orden == "reserva":
+                    if self.reserva is None:
+                        await responder("Reserva de mapas desactivada (usa --reserva).")
+                    else:
+                        await responder("\n".join(
+                            f"{perfil}: " + ", ".join(f"{k}={v}" for k, v in valores.items())
+                            for perfil, valores in self.reserva.estadisticas().items()
+                        ))
+                elif orden == "metricas":
+                    texto = REGISTRO.a_prometheus()
+                    if self.reserva is not None:
+                        texto += self.reserva.a_prometheus()
+                    await responder(texto or "Métricas desactivadas.")
+                elif orden == "nueva":
+                    try:
+                        dimensiones = [int(p) for p in partes[1:4]]
+                    except ValueError:
+                        await responder("Uso: nueva [ancho] [alto] [habitaciones]")
+                        continue
+                    sesion = await self.nueva_sesion(*dimensiones)
+                    await responder(f"Sesión {sesion.id} creada.")
+                elif orden == "reanudar" and len(partes) > 1:
+                    sesion = await self.reanudar_sesion(partes[1])
+                    await responder(f"Sesión {partes[1]} reanudada." if sesion
+                                    else f"No existe la sesión {partes[1]}.")
+                elif sesion is None:
+                    await responder("Primero usa 'nueva' o 'reanudar <id>'.")
+                else:
+                    if sesion.id not in self.sesiones:
+                        # Fue desalojada mientras la conexión seguía abierta
+                        sesion = await self.reanudar_sesion(sesion.id) or sesion
+                        self.sesiones[sesion.id] = sesion
+                    respuesta, continuar = await self.ejecutar(sesion, comando)
+                    await responder(respuesta)
+                    if not continuar:
+                        break
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def _bucle_desalojo(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.inactividad / 4))
+            await self.desalojar_inactivas()
+
+    async def iniciar(self, host: str = "127.0.0.1", puerto: int = 8765,
+                      socket_unix: Optional[str] = None) -> asyncio.AbstractServer:
+        """Arranca el servidor TCP (o de socket Unix) y el desalojo periódico."""
+        if socket_unix:
+            servidor = await asyncio.start_unix_server(self.atender, path=socket_unix)
+        else:
+            servidor = await asyncio.start_server(self.atender, host, puerto)
+        self._tarea_desalojo = asyncio.create_task(self._bucle_desalojo())
+        return servidor
+
+
+def _perfil(texto: str) -> tuple[int, int, int]:
+    """Convierte "ANCHOxALTOxHABITACIONES" en una tupla de enteros."""
+    try:
+        ancho, alto, habitaciones = (int(p) for p in texto.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"perfil inválido '{texto}' (formato 10x10x20)")
+    return ancho, alto, habitaciones
+
+
+async def _main(args: argparse.Namespace):
+    reserva = None
+    if args.reserva:
+        from dungeon_generator.reserva import ReservaMapas, PerfilMapa
+        reserva = ReservaMapas(
+            {f"{a}x{b}x{n}": PerfilMapa(a, b, n) for a, b, n in args.perfiles},
+            profundidad=args.reserva, procesos=args.procesos_reserva
+        )
+    juego = ServidorJuego(args.directorio, args.inactividad, reserva)
+    servidor = await juego.iniciar(args.host, args.puerto, args.socket)
+    direcciones = ", ".join(str(s.getsockname()) for s in servidor.sockets)
+    print(f"Servidor escuchando en {direcciones}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        if reserva is not None:
+            reserva.cerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor multi-sesión del Dungeon Generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Ruta de socket Unix (en lugar de TCP)")
+    parser.add_argument("--directorio", default="sesiones",
+                        help="Directorio donde se guardan las sesiones desalojadas")
+    parser.add_argument("--inactividad", type=float, default=300.0,
+                        help="Segundos sin comandos antes de desalojar una sesión")
+    parser.add_argument("--reserva", type=int, default=0,
+                        help="Mapas pregenerados por perfil (0 = sin reserva)")
+    parser.add_argument("--perfiles", type=_perfil, nargs="+", default=[(10, 10, 20)],
+                        help="Perfiles de la reserva como ANCHOxALTOxHABITACIONES")
+    parser.add_argument("--procesos-reserva", type=int, default=1,
+                        help="Procesos que rellenan la reserva")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        sys.exit(0)